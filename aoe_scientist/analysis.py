@@ -0,0 +1,165 @@
+"""Vectorized review statistics: bootstrap CIs, inter-rater reliability and rater bias.
+
+Every function takes a long review table (one row per idea and review LLM, as in
+data/reviews.csv) and returns a tidy DataFrame with one row per group and metric.
+"""
+import numpy as np
+import pandas as pd
+
+METRICS = ['technical_merit', 'novelty', 'feasibility', 'impact', 'clarity', 'overall_score']
+UNIT_COLUMNS = ['researcher', 'generate_llm', 'title']
+
+# Largest number of random draws materialized at once
+_MAX_DRAWS = 20_000_000
+
+
+def _bootstrap_means(values, codes, num_groups, n_boot, rng):
+    """Bootstrap means of every group at once, shape (n_boot, num_groups).
+
+    Resampling n rows of a group with replacement is the same as drawing the counts of
+    its distinct values from a multinomial, so review scores (few distinct values) need
+    n_boot * groups * values draws instead of n_boot * rows. Tables with many distinct
+    values fall back to resampling row indices, chunked over bootstrap replicates.
+    """
+    sizes = np.bincount(codes, minlength=num_groups)
+    uniques, value_codes = np.unique(values, return_inverse=True)
+    if n_boot * num_groups * len(uniques) <= _MAX_DRAWS:
+        counts = np.bincount(codes * len(uniques) + value_codes, minlength=num_groups * len(uniques))
+        probs = counts.reshape(num_groups, len(uniques)) / np.maximum(sizes, 1)[:, None]
+        draws = rng.multinomial(sizes, probs, size=(n_boot, num_groups))
+        return draws @ uniques / np.maximum(sizes, 1)
+
+    order = np.argsort(codes, kind='stable')
+    sorted_values, sorted_codes = values[order], codes[order]
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    chunk = max(1, _MAX_DRAWS // len(values))
+    means = np.empty((n_boot, num_groups))
+    for first in range(0, n_boot, chunk):
+        reps = min(chunk, n_boot - first)
+        picks = starts[sorted_codes] + (rng.random((reps, len(values))) * sizes[sorted_codes]).astype(np.int64)
+        sums = np.stack([np.bincount(sorted_codes, weights=sorted_values[p], minlength=num_groups) for p in picks])
+        means[first:first + reps] = sums / np.maximum(sizes, 1)
+    return means
+
+
+def bootstrap_ci(reviews, group_cols, metrics=METRICS, n_boot=1000, confidence=0.95, seed=0):
+    """Percentile bootstrap CI of the mean of each metric within each group.
+
+    Returns:
+        pd.DataFrame: group_cols + [metric, mean, ci_low, ci_high, n], groups in order of appearance
+    """
+    rng = np.random.default_rng(seed)
+    alpha = (1 - confidence) / 2
+    frames = []
+    for metric in metrics:
+        data = reviews.dropna(subset=[metric])
+        grouped = data.groupby(group_cols, sort=False, dropna=False)
+        codes = grouped.ngroup().to_numpy()
+        values = data[metric].to_numpy(dtype=float)
+        keys = grouped.size()
+        means = _bootstrap_means(values, codes, len(keys), n_boot, rng)
+        low, high = np.quantile(means, [alpha, 1 - alpha], axis=0)
+        frame = keys.index.to_frame(index=False)
+        frame['metric'] = metric
+        frame['mean'] = np.bincount(codes, weights=values, minlength=len(keys)) / keys.to_numpy()
+        frame['ci_low'] = low
+        frame['ci_high'] = high
+        frame['n'] = keys.to_numpy()
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _unit_codes(reviews, unit_cols):
+    return reviews.groupby(unit_cols, sort=False, dropna=False).ngroup().to_numpy()
+
+
+def krippendorff_alpha(reviews, unit_cols=UNIT_COLUMNS, metrics=METRICS):
+    """Krippendorff's alpha (interval metric) of the review LLMs' scores per metric.
+
+    Units are ideas identified by unit_cols; only units scored by at least two reviewers count.
+    """
+    units = _unit_codes(reviews, unit_cols)
+    rows = []
+    for metric in metrics:
+        values = reviews[metric].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        u, v = units[valid], values[valid]
+        m = np.bincount(u)
+        pairable = m[u] >= 2
+        u, v = u[pairable], v[pairable]
+        m_u = np.bincount(u)
+        s1, s2 = np.bincount(u, weights=v), np.bincount(u, weights=v * v)
+        scored = m_u >= 2
+        n = m_u.sum()
+        # Sum over ordered pairs within a unit of (v_i - v_j)^2 is 2 (m Σv² - (Σv)²)
+        observed = np.sum(2 * (m_u[scored] * s2[scored] - s1[scored] ** 2) / (m_u[scored] - 1)) / n if n else np.nan
+        expected = 2 * (n * v.dot(v) - v.sum() ** 2) / (n * (n - 1)) if n > 1 else np.nan
+        rows.append({
+            'metric': metric,
+            'alpha': 1 - observed / expected if expected else np.nan,
+            'units': int(scored.sum()),
+            'values': int(n)
+        })
+    return pd.DataFrame(rows)
+
+
+def icc(reviews, unit_cols=UNIT_COLUMNS, rater_col='review_llm', metrics=METRICS):
+    """Two-way random-effects, absolute-agreement ICC(2,1) and ICC(2,k) per metric.
+
+    Uses the ideas scored by every rater (repeated reviews by one rater are averaged).
+    """
+    units = _unit_codes(reviews, unit_cols)
+    raters, rater_names = pd.factorize(reviews[rater_col])
+    k = len(rater_names)
+    rows = []
+    for metric in metrics:
+        values = reviews[metric].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        cell = units[valid] * k + raters[valid]
+        num_cells = (units.max() + 1) * k if len(units) else 0
+        sums = np.bincount(cell, weights=values[valid], minlength=num_cells).reshape(-1, k)
+        counts = np.bincount(cell, minlength=num_cells).reshape(-1, k)
+        complete = (counts > 0).all(axis=1)
+        x = sums[complete] / counts[complete]
+        n = len(x)
+        if n < 2 or k < 2:
+            rows.append({'metric': metric, 'icc2_1': np.nan, 'icc2_k': np.nan, 'units': n, 'raters': k})
+            continue
+        grand = x.mean()
+        ms_rows = k * ((x.mean(axis=1) - grand) ** 2).sum() / (n - 1)
+        ms_cols = n * ((x.mean(axis=0) - grand) ** 2).sum() / (k - 1)
+        residual = x - x.mean(axis=1, keepdims=True) - x.mean(axis=0, keepdims=True) + grand
+        ms_err = (residual ** 2).sum() / ((n - 1) * (k - 1))
+        rows.append({
+            'metric': metric,
+            'icc2_1': (ms_rows - ms_err) / (ms_rows + (k - 1) * ms_err + k * (ms_cols - ms_err) / n),
+            'icc2_k': (ms_rows - ms_err) / (ms_rows + (ms_cols - ms_err) / n),
+            'units': n,
+            'raters': k
+        })
+    return pd.DataFrame(rows)
+
+
+def rater_bias(reviews, unit_cols=UNIT_COLUMNS, rater_col='review_llm', metrics=METRICS):
+    """How far each rater's scores sit from the other raters' mean for the same idea.
+
+    Returns:
+        pd.DataFrame: [rater_col, metric, bias, std, n] where bias > 0 means a lenient rater
+    """
+    units = _unit_codes(reviews, unit_cols)
+    frames = []
+    for metric in metrics:
+        values = reviews[metric].to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        u, v = units[valid], values[valid]
+        m = np.bincount(u)
+        total = np.bincount(u, weights=v)
+        # Leave-one-out mean of the other reviews of the same idea
+        shared = m[u] >= 2
+        others = (total[u[shared]] - v[shared]) / (m[u[shared]] - 1)
+        deviation = pd.Series(v[shared] - others)
+        grouped = deviation.groupby(reviews[rater_col].to_numpy()[valid][shared])
+        frame = grouped.agg(['mean', 'std', 'size']).rename(columns={'mean': 'bias', 'size': 'n'})
+        frame.index.name = rater_col
+        frames.append(frame.reset_index().assign(metric=metric))
+    return pd.concat(frames, ignore_index=True)[[rater_col, 'metric', 'bias', 'std', 'n']]
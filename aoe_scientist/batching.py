@@ -0,0 +1,100 @@
+"""Client-side micro-batching of concurrent LLM requests for local model servers."""
+from concurrent.futures import Future, ThreadPoolExecutor
+import queue
+import threading
+import time
+
+
+class MicroBatchingChat:
+    """Coalesce concurrent invoke calls into batches sent to the server together.
+
+    Local OpenAI-compatible servers (llama.cpp with parallel slots, vLLM) batch the
+    requests that are in flight at the same time. Requests arriving within
+    batch_window_ms of each other are grouped, up to max_batch_size, and dispatched
+    as one batch so each round fills the server's batch slots instead of trickling in.
+    Batches run on a thread pool while the dispatcher goes on collecting the next one, so
+    requests never wait for a batch already in flight (servers with continuous batching
+    add them to the running batch). Everything other than invoke is delegated to the
+    wrapped chat model; structured-output variants share this wrapper's queue, dispatcher
+    thread and pool.
+    """
+
+    def __init__(self, runnable, max_batch_size=8, batch_window_ms=20, parent=None):
+        self.runnable = runnable
+        self.max_batch_size = max_batch_size
+        self.batch_window_ms = batch_window_ms
+        self.structured = {}
+        self.lock = threading.Lock()
+        if parent is not None:
+            # Structured-output variants feed the parent's queue, so their requests are
+            # batched with everyone else's and no extra dispatcher thread is started
+            self.requests, self.dispatcher, self.executor = parent.requests, parent.dispatcher, parent.executor
+            return
+        self.requests = queue.Queue()
+        self.executor = ThreadPoolExecutor(thread_name_prefix="micro-batch")
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.dispatcher.start()
+
+    def invoke(self, input, config=None):
+        future = Future()
+        self.requests.put((self.runnable, input, future))
+        return future.result()
+
+    def with_structured_output(self, *args, **kwargs):
+        """The wrapped model's structured variant, created once per schema and options.
+
+        Schemas given as dicts (JSON schema) cannot be cache keys; those variants are
+        created on every call, still sharing the queue and dispatcher.
+        """
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return MicroBatchingChat(self.runnable.with_structured_output(*args, **kwargs),
+                                     self.max_batch_size, self.batch_window_ms, parent=self)
+        with self.lock:
+            if key not in self.structured:
+                self.structured[key] = MicroBatchingChat(
+                    self.runnable.with_structured_output(*args, **kwargs),
+                    self.max_batch_size, self.batch_window_ms, parent=self
+                )
+            return self.structured[key]
+
+    def __getattr__(self, name):
+        return getattr(self.runnable, name)
+
+    def _collect_batch(self):
+        """Block for the first request, then gather more until the window closes or the batch is full."""
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.batch_window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _run_batch(runnable, batch):
+        inputs = [item for item, _ in batch]
+        try:
+            outputs = runnable.batch(inputs, config={"max_concurrency": len(inputs)}, return_exceptions=True)
+        except Exception as e:
+            outputs = [e] * len(inputs)
+        for (_, future), output in zip(batch, outputs):
+            if isinstance(output, Exception):
+                future.set_exception(output)
+            else:
+                future.set_result(output)
+
+    def _dispatch_loop(self):
+        while True:
+            # One batch call per runnable (plain or structured variant), all in flight together
+            groups = {}
+            for runnable, item, future in self._collect_batch():
+                groups.setdefault(id(runnable), (runnable, []))[1].append((item, future))
+            for runnable, batch in groups.values():
+                self.executor.submit(self._run_batch, runnable, batch)
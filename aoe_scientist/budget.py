@@ -0,0 +1,160 @@
+"""Per-run limits on tokens, dollars and wall time, tracked from LLM usage metadata."""
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from langchain_core.callbacks import BaseCallbackHandler
+from aoe_scientist.tracing import span, record_span
+import threading
+import time
+
+# USD per million (input, output) tokens; override or extend with cfg['budget']['prices']
+PRICES = {
+    "deepseek": (0.27, 1.10),
+    "anthropic": (3.00, 15.00),
+    "openai": (2.50, 10.00),
+    "local": (0.0, 0.0),
+    "mock": (0.0, 0.0)
+}
+
+_active = None
+
+
+class Budget:
+    """Spend of one run against its limits.
+
+    Limits left as None are not enforced. max_usd is a per-provider limit, either one
+    number for every provider or a {provider: usd} mapping. Once the most consumed limit
+    passes degrade_after, reflection rounds and concurrency shrink linearly towards their
+    minimum at 100%, and callers stop scheduling new work when the budget is exhausted.
+    """
+
+    def __init__(self, max_tokens=None, max_usd=None, max_wall_time_s=None, degrade_after=0.5, prices=None):
+        self.max_tokens = max_tokens
+        self.max_usd = max_usd
+        self.max_wall_time_s = max_wall_time_s
+        self.degrade_after = degrade_after
+        self.prices = {**PRICES, **{k: tuple(v) for k, v in (prices or {}).items()}}
+        self.start = time.monotonic()
+        self.tokens = 0
+        self.usd = {}
+        self.lock = threading.Lock()
+
+    def record(self, provider, input_tokens, output_tokens):
+        input_price, output_price = self.prices.get(provider, (0.0, 0.0))
+        cost = (input_tokens * input_price + output_tokens * output_price) / 1e6
+        with self.lock:
+            self.tokens += input_tokens + output_tokens
+            self.usd[provider] = self.usd.get(provider, 0.0) + cost
+
+    def _usd_limit(self, provider):
+        if isinstance(self.max_usd, dict):
+            return self.max_usd.get(provider)
+        return self.max_usd
+
+    def spent_fraction(self):
+        """Fraction used of the most consumed limit."""
+        fractions = [0.0]
+        with self.lock:
+            if self.max_tokens:
+                fractions.append(self.tokens / self.max_tokens)
+            for provider, usd in self.usd.items():
+                limit = self._usd_limit(provider)
+                if limit:
+                    fractions.append(usd / limit)
+        if self.max_wall_time_s:
+            fractions.append((time.monotonic() - self.start) / self.max_wall_time_s)
+        return max(fractions)
+
+    def exhausted(self):
+        return self.spent_fraction() >= 1.0
+
+    def _scale(self, value, minimum):
+        fraction = self.spent_fraction()
+        if fraction <= self.degrade_after:
+            return value
+        remaining = max(0.0, 1.0 - fraction) / (1.0 - self.degrade_after)
+        return max(minimum, round(value * remaining))
+
+    def reflections(self, num_reflections):
+        """Reflection rounds to use for the next item."""
+        return self._scale(num_reflections, 0)
+
+    def concurrency(self, max_workers):
+        """Number of requests to keep in flight."""
+        return self._scale(max_workers, 1)
+
+    def report(self):
+        with self.lock:
+            usd = {k: round(v, 4) for k, v in self.usd.items()}
+            tokens = self.tokens
+        return {
+            'tokens': tokens,
+            'usd': usd,
+            'wall_time_s': round(time.monotonic() - self.start, 1),
+            'spent_fraction': round(self.spent_fraction(), 3)
+        }
+
+
+class UsageCallback(BaseCallbackHandler):
+    """Charge the token usage of every response of one provider's client to the active budget."""
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    def on_llm_end(self, response, **kwargs):
+        budget = _active
+        if budget is None:
+            return
+        for generations in response.generations:
+            # Completions sampled in one request (n > 1) each carry the whole request's usage
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or {}
+                if usage:
+                    budget.record(self.provider, usage.get('input_tokens', 0), usage.get('output_tokens', 0))
+                    break
+
+
+def start_budget(cfg):
+    """Make the run's budget from cfg['budget'] the active one (None if no limit is set)."""
+    global _active
+    bcfg = cfg.get('budget') or {}
+    limits = {k: bcfg.get(k) for k in ['max_tokens', 'max_usd', 'max_wall_time_s']}
+    if all(v is None for v in limits.values()):
+        _active = None
+    else:
+        _active = Budget(**limits, degrade_after=bcfg.get('degrade_after', 0.5), prices=bcfg.get('prices'))
+    return _active
+
+
+def active_budget():
+    return _active
+
+
+def run_within_budget(fn, items, max_workers, budget=None):
+    """Map fn over items with up to max_workers in flight, throttled by the budget.
+
+    New items stop being scheduled once the budget is exhausted; results of items that
+    already ran are returned in input order, so completed work can still be saved.
+    """
+    def run(item, submitted_ns):
+        # Time spent waiting for a free worker shows up as a queued span
+        record_span("queued", submitted_ns, time.perf_counter_ns())
+        with span("request"):
+            return fn(item)
+
+    results = {}
+    pending = set()
+    items = list(enumerate(items))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while items or pending:
+            limit = max_workers if budget is None else budget.concurrency(max_workers)
+            while items and len(pending) < limit and not (budget is not None and budget.exhausted()):
+                i, item = items.pop(0)
+                future = pool.submit(run, item, time.perf_counter_ns())
+                future.index = i
+                pending.add(future)
+            if not pending:
+                print(f"Budget exhausted, skipping {len(items)} remaining requests: {budget.report()}")
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[future.index] = future.result()
+    return [results[i] for i in sorted(results)]
@@ -0,0 +1,228 @@
+"""Sentence embeddings for ideas and papers.
+
+Two interchangeable backends produce the same L2-normalized vectors:
+- torch: the sentence-transformers model, full precision (default)
+- onnx: the same transformer exported once to ONNX (optionally int8-quantized) and run with
+  ONNX Runtime, batching texts of similar token length together to minimize padding
+"""
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+BACKENDS = ('torch', 'onnx')
+
+# Process-wide settings, changed with configure()
+_settings = {
+    'backend': 'torch',
+    'threads': None,  # CPU threads per encoder (None = library default)
+    'quantize': True,  # onnx: int8 dynamic quantization of the weights
+    'max_batch_tokens': 8192,  # onnx: padded tokens per batch
+    'cache_dir': 'data/onnx'  # onnx: exported models
+}
+
+
+def configure(**settings):
+    """Set the embedding backend and its options, e.g. from cfg['embeddings']."""
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown embedding settings: {sorted(unknown)}")
+    if settings.get('backend', _settings['backend']) not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {settings['backend']!r}, expected one of {BACKENDS}")
+    _settings.update(settings)
+
+
+def settings():
+    """Current settings, to hand to worker processes."""
+    return dict(_settings)
+
+
+@lru_cache(maxsize=None)
+def load_model(model_name=DEFAULT_MODEL):
+    """Load a sentence transformer once per process (CPU only)."""
+    # Imported here: sentence_transformers pulls in torch, which dominates startup time
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device='cpu')
+
+
+class Encoder(ABC):
+    """Common interface of the backends: texts -> L2-normalized float32 array (len(texts), dim)."""
+
+    @abstractmethod
+    def encode(self, texts):
+        ...
+
+
+class TorchEncoder(Encoder):
+    """The sentence-transformers model run by PyTorch."""
+
+    def __init__(self, model_name=DEFAULT_MODEL, threads=None):
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = load_model(model_name)
+
+    def encode(self, texts):
+        embeddings = self.model.encode(list(texts), show_progress_bar=False, normalize_embeddings=True)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+def length_batches(lengths, max_batch_tokens=8192, max_batch_size=256):
+    """Group text indices into batches of similar length.
+
+    Texts are sorted by token count and a batch grows until its padded size
+    (batch size x longest text) would exceed max_batch_tokens.
+    """
+    order = np.argsort(lengths, kind='stable')
+    batches, batch = [], []
+    for i in order:
+        # Sorted ascending, so the text being added is the longest in the batch
+        if batch and ((len(batch) + 1) * lengths[i] > max_batch_tokens or len(batch) == max_batch_size):
+            batches.append(batch)
+            batch = []
+        batch.append(int(i))
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def export_onnx(model_name=DEFAULT_MODEL, output_dir=None, quantize=True):
+    """Export the model's transformer to ONNX next to its tokenizer and pooling settings.
+
+    The files are written to a temporary directory and moved into output_dir one by one,
+    the ONNX model last, so a reader that finds the model finds the complete export.
+
+    Returns:
+        str: Path of the ONNX file (model-int8.onnx when quantized)
+    """
+    output_dir = output_dir or os.path.join(_settings['cache_dir'], model_name.replace('/', '--'))
+    model = load_model(model_name)
+    transformer, tokenizer = model[0].auto_model, model.tokenizer
+    pooling = next((m.get_pooling_mode_str() for m in model if hasattr(m, 'get_pooling_mode_str')), 'mean')
+    if pooling not in ('mean', 'cls'):
+        raise ValueError(f"{model_name} uses {pooling} pooling; the onnx backend supports mean and cls")
+
+    os.makedirs(output_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix='.export-', dir=output_dir)
+    try:
+        model_file = _export_files(model, transformer, tokenizer, pooling, staging_dir, quantize)
+        for name in sorted(os.listdir(staging_dir), key=lambda name: name == model_file):
+            os.replace(os.path.join(staging_dir, name), os.path.join(output_dir, name))
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return os.path.join(output_dir, model_file)
+
+
+def _export_files(model, transformer, tokenizer, pooling, output_dir, quantize):
+    """Write the export into output_dir; returns the file name of the ONNX model to load."""
+    import torch
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, 'encoder.json'), 'w') as f:
+        json.dump({'max_seq_length': model.max_seq_length, 'pooling': pooling}, f)
+
+    input_names = list(tokenizer.model_input_names)
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs))).last_hidden_state
+
+    dummy = tokenizer(["an example sentence", "a second, somewhat longer example sentence"], padding=True,
+                      return_tensors='pt')
+    fp32_path = os.path.join(output_dir, 'model.onnx')
+    # The TorchScript exporter needs no extra packages (newer torch defaults to dynamo)
+    kwargs = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+    transformer.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(transformer), tuple(dummy[name] for name in input_names), fp32_path,
+            input_names=input_names, output_names=['last_hidden_state'],
+            dynamic_axes={**{name: {0: 'batch', 1: 'sequence'} for name in input_names},
+                          'last_hidden_state': {0: 'batch', 1: 'sequence'}},
+            opset_version=14, **kwargs
+        )
+    if not quantize:
+        return 'model.onnx'
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(fp32_path, os.path.join(output_dir, 'model-int8.onnx'), weight_type=QuantType.QInt8)
+    return 'model-int8.onnx'
+
+
+class OnnxEncoder(Encoder):
+    """The model's transformer run by ONNX Runtime, with pooling and normalization in numpy.
+
+    The model is exported on first use to cache_dir/<model_name>/.
+    """
+
+    def __init__(self, model_name=DEFAULT_MODEL, threads=None, quantize=True, max_batch_tokens=8192,
+                 cache_dir='data/onnx'):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+        model_dir = os.path.join(cache_dir, model_name.replace('/', '--'))
+        model_path = os.path.join(model_dir, 'model-int8.onnx' if quantize else 'model.onnx')
+        if not os.path.exists(model_path):
+            print(f"Exporting {model_name} to {model_path}...")
+            export_onnx(model_name, model_dir, quantize)
+        with open(os.path.join(model_dir, 'encoder.json')) as f:
+            config = json.load(f)
+        self.max_seq_length = config['max_seq_length']
+        self.pooling = config['pooling']
+        self.max_batch_tokens = max_batch_tokens
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def encode(self, texts):
+        texts = list(texts)
+        dim = self.session.get_outputs()[0].shape[-1]
+        if not texts:
+            return np.zeros((0, dim if isinstance(dim, int) else 0), dtype=np.float32)
+        tokens = self.tokenizer(texts, truncation=True, max_length=self.max_seq_length)
+        lengths = np.array([len(ids) for ids in tokens['input_ids']])
+        embeddings = [None] * len(texts)
+        for batch in length_batches(lengths, self.max_batch_tokens):
+            width = lengths[batch].max()
+            inputs = {}
+            for name in self.input_names:
+                pad = self.tokenizer.pad_token_id if name == 'input_ids' else 0
+                padded = np.full((len(batch), width), pad, dtype=np.int64)
+                for row, i in enumerate(batch):
+                    padded[row, :lengths[i]] = tokens[name][i]
+                inputs[name] = padded
+            hidden = self.session.run(None, inputs)[0]
+            if self.pooling == 'cls':
+                pooled = hidden[:, 0]
+            else:
+                mask = inputs['attention_mask'][:, :, None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            for row, i in enumerate(batch):
+                embeddings[i] = pooled[row]
+        return np.stack(embeddings).astype(np.float32)
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model_name=DEFAULT_MODEL, backend='torch', threads=None, quantize=True, max_batch_tokens=8192,
+                cache_dir='data/onnx'):
+    """One encoder per model and settings per process."""
+    if backend == 'onnx':
+        return OnnxEncoder(model_name, threads, quantize, max_batch_tokens, cache_dir)
+    return TorchEncoder(model_name, threads)
+
+
+def encode(texts, model_name=DEFAULT_MODEL):
+    """Embed texts into L2-normalized float32 vectors with the configured backend."""
+    return get_encoder(model_name, **_settings).encode(texts)
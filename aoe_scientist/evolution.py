@@ -0,0 +1,317 @@
+"""Evolutionary optimization of a population of research ideas (NSGA-II)."""
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import SystemMessage, HumanMessage
+from aoe_scientist.idea_generator import create_idea_parser, generate_research_idea
+from aoe_scientist.idea_reviewer import create_review_chain
+from aoe_scientist.budget import active_budget
+import numpy as np
+import pandas as pd
+import hashlib
+import threading
+import json
+import os
+
+EVOLUTION_SYSTEM_TEMPLATE = """You are an expert AI researcher evolving a population of research ideas in the field of {topic}. \
+New ideas are created by recombining or mutating existing ideas that reviewers scored highly. Every new idea must be \
+technically coherent on its own, not a list of the parents' features.
+
+{format_instructions}"""
+
+CROSSOVER_PROMPT = """Combine the two parent research ideas below into a single new research idea in {topic}.
+
+Parent A:
+Title: {title_a}
+Details: {details_a}
+
+Parent B:
+Title: {title_b}
+Details: {details_b}
+
+### Requirements:
+1. Inherit the strongest technical element of each parent.
+2. The result must be one coherent method, not two ideas glued together.
+3. Must be novel with respect to both parents.
+4. Feasible using current technology.
+
+### Response Format:
+1. First provide your thought process and analysis in the Thought field
+2. Give a concise name in lowercase with underscores in the Name field
+3. Write a clear title in the Title field
+4. Provide exactly 3 technical sentences in the Details field
+
+Respond in the format specified in the system message."""
+
+MUTATION_PROMPT = """Mutate the research idea below into a new research idea in {topic}.
+
+Title: {title}
+Details: {details}
+
+### Requirements:
+1. Change one substantial aspect: the core technique, the problem setting, or the evaluation regime.
+2. Keep what makes the idea technically sound.
+3. Must be meaningfully different from the original, not a rewording.
+4. Feasible using current technology.
+
+### Response Format:
+1. First provide your thought process and analysis in the Thought field
+2. Give a concise name in lowercase with underscores in the Name field
+3. Write a clear title in the Title field
+4. Provide exactly 3 technical sentences in the Details field
+
+Respond in the format specified in the system message."""
+
+
+def non_dominated_sort(scores):
+    """Assign a Pareto front rank to each individual (0 is the best front).
+
+    Args:
+        scores: Array of shape (n_individuals, n_objectives), higher is better
+
+    Returns:
+        np.ndarray: Integer front rank per individual
+    """
+    scores = np.asarray(scores, dtype=float)
+    # dominates[i, j] is True when individual i Pareto-dominates individual j
+    geq = (scores[:, None, :] >= scores[None, :, :]).all(axis=2)
+    gt = (scores[:, None, :] > scores[None, :, :]).any(axis=2)
+    dominates = geq & gt
+
+    domination_count = dominates.sum(axis=0)
+    ranks = np.full(len(scores), -1, dtype=int)
+    remaining = np.ones(len(scores), dtype=bool)
+    front = 0
+    while remaining.any():
+        current = remaining & (domination_count == 0)
+        ranks[current] = front
+        remaining &= ~current
+        domination_count = domination_count - dominates[current].sum(axis=0)
+        front += 1
+    return ranks
+
+
+def crowding_distance(scores, ranks):
+    """Compute the NSGA-II crowding distance of each individual within its front.
+
+    Boundary individuals of every front get an infinite distance so they are always kept.
+    """
+    scores = np.asarray(scores, dtype=float)
+    distance = np.zeros(len(scores))
+    for front in np.unique(ranks):
+        idx = np.flatnonzero(ranks == front)
+        if len(idx) <= 2:
+            distance[idx] = np.inf
+            continue
+
+        front_scores = scores[idx]
+        order = np.argsort(front_scores, axis=0, kind="stable")
+        sorted_scores = np.take_along_axis(front_scores, order, axis=0)
+        span = sorted_scores[-1] - sorted_scores[0]
+        span[span == 0] = 1.0
+
+        gaps = np.empty_like(sorted_scores)
+        gaps[1:-1] = (sorted_scores[2:] - sorted_scores[:-2]) / span
+        gaps[[0, -1]] = np.inf
+
+        front_distance = np.empty_like(front_scores)
+        np.put_along_axis(front_distance, order, gaps, axis=0)
+        distance[idx] = front_distance.sum(axis=1)
+    return distance
+
+
+def select_survivors(ranks, crowding, num_survivors):
+    """Return indices of the best individuals ordered by front rank, then crowding distance."""
+    order = np.lexsort((-crowding, ranks))
+    return order[:num_survivors]
+
+
+def tournament_select(ranks, crowding, num_winners, rng):
+    """Binary tournament selection using the crowded-comparison operator."""
+    contenders = rng.integers(0, len(ranks), size=(num_winners, 2))
+    a, b = contenders[:, 0], contenders[:, 1]
+    a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] >= crowding[b]))
+    return np.where(a_wins, a, b)
+
+
+class FitnessCache:
+    """Thread-safe on-disk cache of review scores keyed by review LLM and idea content."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(review_llm, title, details):
+        return hashlib.sha1(f"{review_llm}\n{title}\n{details}".encode()).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            return self.entries.get(key)
+
+    def put(self, key, review):
+        with self.lock:
+            self.entries[key] = review
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self.lock:
+            with open(self.path, 'w') as f:
+                json.dump(self.entries, f)
+
+
+def _to_individual(idea, **extra):
+    """Normalize an idea (CSV row or parsed LLM output) into a population member."""
+    researcher = idea.get('researcher')
+    return {
+        'name': str(idea.get('name', idea.get('Name', ''))),
+        'title': str(idea.get('title', idea.get('Title', ''))),
+        'details': str(idea.get('details', idea.get('Details', ''))),
+        'thought': str(idea.get('thought', idea.get('Thought', ''))),
+        'researcher': None if pd.isna(researcher) else researcher,
+        **extra
+    }
+
+
+def create_offspring(chat, cfg, parents):
+    """Create one child idea from one (mutation) or two (crossover) parents."""
+    output_parser = create_idea_parser()
+    system = SystemMessage(content=EVOLUTION_SYSTEM_TEMPLATE.format(
+        topic=cfg['topic'],
+        format_instructions=output_parser.get_format_instructions()
+    ))
+    if len(parents) == 2:
+        origin = 'crossover'
+        human = HumanMessage(content=CROSSOVER_PROMPT.format(
+            topic=cfg['topic'],
+            title_a=parents[0]['title'],
+            details_a=parents[0]['details'],
+            title_b=parents[1]['title'],
+            details_b=parents[1]['details']
+        ))
+    else:
+        origin = 'mutation'
+        human = HumanMessage(content=MUTATION_PROMPT.format(
+            topic=cfg['topic'],
+            title=parents[0]['title'],
+            details=parents[0]['details']
+        ))
+
+    response = chat.invoke([system, human])
+    try:
+        child = output_parser.parse(response.content)
+    except Exception as e:
+        print(f"Warning: Failed to parse {origin} response: {str(e)}")
+        return None
+    # The child inherits the researcher agent of its first parent
+    return _to_individual(
+        child,
+        researcher=parents[0]['researcher'],
+        origin=origin,
+        parents=" | ".join(p['name'] for p in parents)
+    )
+
+
+def evaluate_fitness(review_chain, cache, cfg, individual):
+    """Review an individual, reusing cached scores for ideas that were already reviewed."""
+    key = FitnessCache.key(cfg['review_llm'], individual['title'], individual['details'])
+    review = cache.get(key)
+    if review is None:
+        for attempt in range(3):
+            try:
+                review = review_chain(individual['title'], individual['details'])
+                cache.put(key, review)
+                break
+            except Exception as e:
+                if attempt == 2:
+                    print(f"Failed to review '{individual['name']}' after 3 attempts: {str(e)}")
+                    return {**individual, 'overall_score': 0}
+    return {**individual, **review}
+
+
+def _objective_matrix(population, objectives):
+    return np.array([[float(ind.get(k, 0) or 0) for k in objectives] for ind in population])
+
+
+def evolve_ideas(generate_chat, review_chat, cfg):
+    """Evolve a population of research ideas using reviewer scores as multi-objective fitness.
+
+    Args:
+        generate_chat: The chat model used for seeding, crossover and mutation
+        review_chat: The chat model used to score ideas
+        cfg: Configuration dictionary
+
+    Returns:
+        tuple: (final population DataFrame, history DataFrame of every generation)
+    """
+    ecfg = cfg['evolution']
+    objectives = ecfg['objectives']
+    pop_size = ecfg['population_size']
+    rng = np.random.default_rng(ecfg.get('seed'))
+    cache = FitnessCache(ecfg['cache_path'])
+    review_chain = create_review_chain(review_chat, cfg['topic'])
+
+    with ThreadPoolExecutor(max_workers=cfg['concurrency']) as pool:
+        # Seed the population from previously generated ideas, topping up with fresh ones
+        population = []
+        if os.path.exists("data/ideas.csv"):
+            seeds = pd.read_csv("data/ideas.csv", index_col=False)
+            seeds = seeds.sample(n=min(pop_size, len(seeds)), random_state=ecfg.get('seed'))
+            population = [_to_individual(row, origin='seed', parents='') for _, row in seeds.iterrows()]
+        missing = pop_size - len(population)
+        for idea_df in pool.map(lambda _: generate_research_idea(generate_chat, cfg), range(missing)):
+            population.extend(
+                _to_individual(row, origin='seed', parents='') for _, row in idea_df.iterrows()
+            )
+
+        population = list(pool.map(lambda ind: evaluate_fitness(review_chain, cache, cfg, ind), population))
+        history = [{**ind, 'generation': 0} for ind in population]
+
+        budget = active_budget()
+        for generation in range(1, ecfg['generations'] + 1):
+            if budget is not None and budget.exhausted():
+                print(f"Budget exhausted after {generation - 1} generations: {budget.report()}")
+                break
+            scores = _objective_matrix(population, objectives)
+            ranks = non_dominated_sort(scores)
+            crowding = crowding_distance(scores, ranks)
+
+            # Pick parents and decide per child between crossover and mutation
+            winners = tournament_select(ranks, crowding, 2 * pop_size, rng).reshape(pop_size, 2)
+            crossover = rng.random(pop_size) < ecfg['crossover_rate']
+            parent_sets = [
+                [population[a], population[b]] if use_crossover and a != b else [population[a]]
+                for (a, b), use_crossover in zip(winners, crossover)
+            ]
+
+            offspring = [
+                child for child in pool.map(lambda p: create_offspring(generate_chat, cfg, p), parent_sets)
+                if child is not None
+            ]
+            offspring = list(pool.map(lambda ind: evaluate_fitness(review_chain, cache, cfg, ind), offspring))
+            history.extend({**ind, 'generation': generation} for ind in offspring)
+
+            combined = population + offspring
+            scores = _objective_matrix(combined, objectives)
+            ranks = non_dominated_sort(scores)
+            crowding = crowding_distance(scores, ranks)
+            population = [combined[i] for i in select_survivors(ranks, crowding, pop_size)]
+            cache.save()
+
+            front = [ind for ind, r in zip(combined, ranks) if r == 0]
+            best = {k: max(float(ind.get(k, 0) or 0) for ind in population) for k in objectives}
+            print(f"Generation {generation}/{ecfg['generations']}: {len(offspring)} offspring, "
+                  f"{len(front)} on Pareto front, best {best}")
+
+    scores = _objective_matrix(population, objectives)
+    ranks = non_dominated_sort(scores)
+    population_df = pd.DataFrame(population)
+    population_df['front'] = ranks
+    population_df['crowding_distance'] = crowding_distance(scores, ranks)
+
+    history_df = pd.DataFrame(history)
+    history_df['generate_llm'] = cfg['generate_llm']
+    history_df['review_llm'] = cfg['review_llm']
+    return population_df.sort_values(['front', 'crowding_distance'], ascending=[True, False]), history_df
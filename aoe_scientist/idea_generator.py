@@ -1,8 +1,19 @@
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain.output_parsers import ResponseSchema, StructuredOutputParser
-from scripts.select_papers import is_name_match
+from langchain_core.utils.json import parse_json_markdown
+from aoe_scientist.llm import provider_settings, PROVIDER_CONFIGS
+from aoe_scientist.embeddings import encode
+from aoe_scientist.rag_context import researcher_context, researcher_papers
+from aoe_scientist.personas import researcher_persona
+from aoe_scientist.tracing import span
+from aoe_scientist.metrics import provider_of
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from langchain_core.language_models.chat_models import BaseChatModel
+import numpy as np
 import pandas as pd
 import json
+import os
 
 # Prompt templates for idea generation
 RAG_SYSTEM_TEMPLATE = """You are the amazing AI researcher, {researcher}, tasked with generating novel and impactful \
@@ -15,6 +26,10 @@ Prior work: {papers}
 
 {format_instructions}"""
 
+# Fills {papers} of RAG_SYSTEM_TEMPLATE in persona mode
+PERSONA_CONTEXT = """Research profile distilled from the researcher's {num_papers} recent papers:
+{persona}"""
+
 RAG_HUMAN_TEMPLATE = """Using the following recent papers authored by {researcher}, provided to you, generate one \
 creative and novel research idea in {topic}. The idea must align with the researcher's \
 expertise but should be novel.
@@ -109,17 +124,16 @@ If you truly believe the idea cannot be meaningfully improved, include "I am don
 
 Respond in the format specified in the system message."""
 
-def generate_research_idea(chat, cfg, num_reflections=3):
-    """Generate a novel research idea based on existing papers.
-    
-    Args:
-        chat: The chat model to use
-        cfg: Configuration dictionary
-        num_reflections: Number of reflection iterations to perform
-    
-    Returns:
-        pd.DataFrame: DataFrame containing the generated idea
-    """
+BATCH_HUMAN_SUFFIX = """
+
+Instead of one idea, generate {num_ideas} distinct research ideas that explore clearly different directions. \
+Return them as a JSON list of {num_ideas} objects inside a single ```json code block, where each object follows the \
+format specified in the system message."""
+
+IDEA_FIELDS = ["Thought", "Name", "Title", "Details"]
+
+def create_idea_parser():
+    """Create the structured output parser shared by idea generation and refinement."""
     # Define response schema for structured output parsing
     response_schemas = [
         ResponseSchema(name="Thought", description="Your analysis and reasoning about the research idea, including specific critiques and suggested improvements."),
@@ -127,17 +141,28 @@ def generate_research_idea(chat, cfg, num_reflections=3):
         ResponseSchema(name="Title", description="A precise and specific title that clearly conveys the technical innovation."),
         ResponseSchema(name="Details", description="Technical specifications and implementation details in exactly 3 sentences. Each sentence should be specific and actionable, covering methodology, implementation approach, and expected outcomes.")
     ]
-    output_parser = StructuredOutputParser.from_response_schemas(response_schemas)
-    format_instructions = output_parser.get_format_instructions()
-    
+    return StructuredOutputParser.from_response_schemas(response_schemas)
+
+def build_idea_messages(cfg, format_instructions, human_suffix=""):
+    """Build the system and human messages for initial idea generation."""
     if cfg['rag']:
         # Load RAG prompt and papers
-        papers_df = pd.read_csv("data/scholar_papers.csv")
-        papers_df = papers_df[papers_df['researcher'].apply(lambda x: is_name_match(x, cfg['researcher']))]
-        papers_df = papers_df[['title', 'year', 'abstract']]
-        papers_str = papers_df.to_json(orient='records', indent=2)
-        
-        messages = [
+        with span("load_rag_papers", researcher=cfg['researcher']) as attrs:
+            if cfg['rag_context'].get('mode', 'papers') == 'persona':
+                # A research profile distilled once from the papers replaces their abstracts
+                persona, stats = researcher_persona(cfg, cfg['researcher'])
+                papers_str = PERSONA_CONTEXT.format(num_papers=stats['papers'], persona=persona)
+                print(f"RAG persona: {stats['tokens']} tokens, distilled from {stats['papers']} papers")
+            else:
+                # Count tokens with the generating model's tokenizer
+                model = provider_settings(cfg['generate_llm'], cfg.get('providers'))['model']
+                papers_str, stats = researcher_context(cfg['researcher'], cfg['rag_context']['max_tokens'],
+                                                       cfg['rag_context']['max_abstract_tokens'], model)
+                print(f"RAG context: {stats['tokens']} tokens, {stats['papers']} papers "
+                      f"({stats['truncated']} abstracts truncated, {stats['dropped']} papers left out)")
+            attrs.update({'num_papers': stats['papers'], 'context_tokens': stats['tokens']})
+
+        return [
             SystemMessage(content=RAG_SYSTEM_TEMPLATE.format(
                 researcher=cfg['researcher'],
                 topic=cfg['topic'],
@@ -147,97 +172,347 @@ def generate_research_idea(chat, cfg, num_reflections=3):
             HumanMessage(content=RAG_HUMAN_TEMPLATE.format(
                 researcher=cfg['researcher'],
                 topic=cfg['topic']
-            ))
-        ]
-    else:
-        messages = [
-            SystemMessage(content=NON_RAG_SYSTEM_TEMPLATE.format(
-                topic=cfg['topic'],
-                format_instructions=format_instructions
-            )),
-            HumanMessage(content=NON_RAG_HUMAN_TEMPLATE.format(
-                topic=cfg['topic']
-            ))
+            ) + human_suffix)
         ]
+    return [
+        SystemMessage(content=NON_RAG_SYSTEM_TEMPLATE.format(
+            topic=cfg['topic'],
+            format_instructions=format_instructions
+        )),
+        HumanMessage(content=NON_RAG_HUMAN_TEMPLATE.format(
+            topic=cfg['topic']
+        ) + human_suffix)
+    ]
 
-    def has_meaningful_changes(old_idea, new_idea):
-        """Check if the new idea has meaningful changes from the old one."""
-        # Check for significant changes in title (more than just minor word changes)
-        title_changed = len(set(new_idea['Title'].split()) - set(old_idea['Title'].split())) >= 2
-        
-        # Check for significant changes in details
-        details_changed = (
-            len(set(new_idea['Details'].split()) - set(old_idea['Details'].split())) >= 5 or
-            len(new_idea['Details']) - len(old_idea['Details']) >= 20
-        )
-        
-        return title_changed or details_changed
+def has_meaningful_changes(old_idea, new_idea):
+    """Check if the new idea has meaningful changes from the old one."""
+    # Check for significant changes in title (more than just minor word changes)
+    title_changed = len(set(new_idea['Title'].split()) - set(old_idea['Title'].split())) >= 2
+    
+    # Check for significant changes in details
+    details_changed = (
+        len(set(new_idea['Details'].split()) - set(old_idea['Details'].split())) >= 5 or
+        len(new_idea['Details']) - len(old_idea['Details']) >= 20
+    )
+    
+    return title_changed or details_changed
 
-    # Initial idea generation
-    response = chat.invoke(messages)
+def build_reflection_messages(idea, current_round, num_reflections, format_instructions):
+    """Build the system and human messages of one reflection round on idea."""
+    return [
+        SystemMessage(content=REFLECTION_SYSTEM_PROMPT.format(
+            format_instructions=format_instructions
+        )),
+        HumanMessage(content=IDEA_REFLECTION_PROMPT.format(
+            current_round=current_round,
+            num_reflections=num_reflections,
+            title=idea.get('Title', ''),
+            name=idea.get('Name', ''),
+            details=idea.get('Details', ''),
+            thought=idea.get('Thought', '')
+        ))
+    ]
+
+def refine_idea(chat, idea, output_parser, num_reflections=3):
+    """Iteratively improve an idea through reflection rounds.
     
-    try:
-        idea = output_parser.parse(response.content)
-        print("\nInitial idea:")
-        print(json.dumps(idea, indent=2))
-        current_idea = idea
+    Returns:
+        dict: The refined idea with Thought, Name, Title and Details fields
+    """
+    format_instructions = output_parser.get_format_instructions()
+    current_idea = idea
+    
+    # Reflection stage with separate message chain
+    consecutive_no_changes = 0
+    for i in range(num_reflections - 1):
+        reflection_messages = build_reflection_messages(current_idea, i+2, num_reflections, format_instructions)
         
-        # Reflection stage with separate message chain
-        consecutive_no_changes = 0
-        for i in range(num_reflections - 1):
-            reflection_messages = [
-                SystemMessage(content=REFLECTION_SYSTEM_PROMPT.format(
-                    format_instructions=format_instructions
-                )),
-                HumanMessage(content=IDEA_REFLECTION_PROMPT.format(
-                    current_round=i+2,
-                    num_reflections=num_reflections,
-                    title=current_idea.get('Title', ''),
-                    name=current_idea.get('Name', ''),
-                    details=current_idea.get('Details', ''),
-                    thought=current_idea.get('Thought', '')
-                ))
-            ]
-            
+        with span("reflection", round=i+2):
             reflection_response = chat.invoke(reflection_messages)
-            try:
+        try:
+            with span("parse", round=i+2):
                 reflected_idea = output_parser.parse(reflection_response.content)
-                print(f"\nIteration {i+2}:")
-                print(json.dumps(reflected_idea, indent=2))
+            print(f"\nIteration {i+2}:")
+            print(json.dumps(reflected_idea, indent=2))
+            
+            if "I am done" in reflected_idea.get('Thought', ''):
+                print(f"Idea generation converged after {i+2} iterations.")
+                break
                 
-                if "I am done" in reflected_idea.get('Thought', ''):
-                    print(f"Idea generation converged after {i+2} iterations.")
+            # Check for meaningful changes
+            if not has_meaningful_changes(current_idea, reflected_idea):
+                consecutive_no_changes += 1
+                print("No meaningful changes made in this iteration.")
+                if consecutive_no_changes >= 2:  # If no changes for 2 consecutive iterations
+                    print("No meaningful changes for multiple iterations. Stopping reflection.")
                     break
+                if i < num_reflections - 2:  # If not the last iteration
+                    continue
+            else:
+                consecutive_no_changes = 0  # Reset counter when we see meaningful changes
                     
-                # Check for meaningful changes
-                if not has_meaningful_changes(current_idea, reflected_idea):
-                    consecutive_no_changes += 1
-                    print("No meaningful changes made in this iteration.")
-                    if consecutive_no_changes >= 2:  # If no changes for 2 consecutive iterations
-                        print("No meaningful changes for multiple iterations. Stopping reflection.")
-                        break
-                    if i < num_reflections - 2:  # If not the last iteration
-                        continue
-                else:
-                    consecutive_no_changes = 0  # Reset counter when we see meaningful changes
-                        
-                current_idea = reflected_idea
-            except Exception as e:
-                print(f"Warning: Failed to parse reflection response: {str(e)}")
-                print(f"Response content: {reflection_response.content[:200]}...")
+            current_idea = reflected_idea
+        except Exception as e:
+            print(f"Warning: Failed to parse reflection response: {str(e)}")
+            print(f"Response content: {reflection_response.content[:200]}...")
+            break
+    return current_idea
+
+def idea_text(idea):
+    return f"{idea['Title']}. {idea['Details']}"
+
+@lru_cache(maxsize=8)
+def _reference_embeddings(researcher, rag, ideas_path, ideas_mtime, papers_path, papers_mtime):
+    texts = []
+    if ideas_mtime is not None:
+        ideas = pd.read_csv(ideas_path, index_col=False)
+        if rag:
+            ideas = ideas[ideas['researcher'] == researcher]
+        texts += [f"{t}. {d}" for t, d in zip(ideas['title'].fillna(''), ideas['details'].fillna(''))]
+    if rag and papers_mtime is not None:
+        papers = researcher_papers(researcher, papers_path)
+        texts += [f"{t}. {a}" for t, a in zip(papers['title'], papers['abstract'])]
+    return encode(texts) if texts else None
+
+def novelty_reference(cfg, ideas_path="data/ideas.csv", papers_path="data/scholar_papers.csv"):
+    """Embeddings of the work refined ideas should differ from: earlier ideas of the same
+    researcher (all earlier ideas without RAG) and the researcher's papers."""
+    def mtime(path):
+        return os.stat(path).st_mtime_ns if os.path.exists(path) else None
+    return _reference_embeddings(cfg['researcher'], bool(cfg['rag']), ideas_path, mtime(ideas_path),
+                                 papers_path, mtime(papers_path))
+
+def novelty_scores(ideas, reference):
+    """1 - the highest cosine similarity of each idea to the reference embeddings."""
+    if reference is None or len(reference) == 0:
+        return np.ones(len(ideas))
+    return 1 - (encode([idea_text(idea) for idea in ideas]) @ reference.T).max(axis=1)
+
+def refine_idea_beam(chat, idea, output_parser, num_reflections=3, beam_width=3, branching=2, reference=None,
+                     provider_overrides=None):
+    """Beam search over reflection rounds.
+
+    Each round asks for branching refinements of every idea in the beam, all in parallel,
+    and keeps the beam_width most novel of them (by embedding distance to reference), so
+    more ideas are explored per round without adding sequential rounds.
+
+    Returns:
+        dict: The most novel idea of the last round
+    """
+    format_instructions = output_parser.get_format_instructions()
+    beam = [idea]
+    for i in range(num_reflections - 1):
+        with span("beam_round", round=i+2, beam=len(beam)) as attrs:
+            def expand(parent):
+                messages = build_reflection_messages(parent, i+2, num_reflections, format_instructions)
+                return sample_candidates(chat, messages, branching, provider_overrides)
+            with ThreadPoolExecutor(len(beam)) as pool:
+                contents = [c for children in pool.map(expand, beam) for c in children]
+
+            children, titles = [], set()
+            for content in contents:
+                try:
+                    child = output_parser.parse(content)
+                except Exception as e:
+                    print(f"Warning: Failed to parse reflection response: {str(e)}")
+                    continue
+                if all(child.get(k) for k in IDEA_FIELDS) and child['Title'] not in titles:
+                    titles.add(child['Title'])
+                    children.append(child)
+            attrs['num_failed'] = len(contents) - len(children)
+            if not children:
+                print(f"No valid refinements in round {i+2}, keeping the current beam")
                 break
-        
-        idea_dict = {
-            'name': current_idea.get('Name', ''),
-            'generate_llm': cfg['generate_llm'],
-            'researcher': cfg['researcher'],
-            'rag': cfg['rag'],
-            'title': current_idea.get('Title', ''),
-            'details': current_idea.get('Details', ''),
-            'thought': current_idea.get('Thought', '')
-        }
-        return pd.DataFrame([idea_dict])
+
+            scores = novelty_scores(children, reference)
+            order = np.argsort(-scores, kind='stable')[:beam_width]
+            beam = [children[j] for j in order]
+        print(f"\nBeam round {i+2}: kept {len(beam)} of {len(children)} refinements, "
+              f"novelty {', '.join(f'{scores[j]:.3f}' for j in order)}")
+        print(json.dumps(beam[0], indent=2))
+        if all("I am done" in child.get('Thought', '') for child in children):
+            print(f"Idea generation converged after {i+2} iterations.")
+            break
+    return beam[0]
+
+def refine(chat, cfg, idea, output_parser, num_reflections=3):
+    """Refine idea with the linear reflection chain, or beam search if reflection.beam_width > 1."""
+    reflection = cfg.get('reflection') or {}
+    if reflection.get('beam_width', 1) > 1:
+        return refine_idea_beam(chat, idea, output_parser, num_reflections, reflection['beam_width'],
+                                reflection.get('branching', 2), novelty_reference(cfg), cfg.get('providers'))
+    return refine_idea(chat, idea, output_parser, num_reflections)
+
+def idea_to_row(cfg, idea):
+    """Convert a parsed idea into a row of the ideas.csv schema."""
+    return {
+        'name': idea.get('Name', ''),
+        'generate_llm': cfg['generate_llm'],
+        'researcher': cfg['researcher'],
+        'rag': cfg['rag'],
+        'title': idea.get('Title', ''),
+        'details': idea.get('Details', ''),
+        'thought': idea.get('Thought', '')
+    }
+
+def generate_research_idea(chat, cfg, num_reflections=3):
+    """Generate a novel research idea based on existing papers.
+    
+    Args:
+        chat: The chat model to use
+        cfg: Configuration dictionary
+        num_reflections: Number of reflection iterations to perform
+    
+    Returns:
+        pd.DataFrame: DataFrame containing the generated idea
+    """
+    output_parser = create_idea_parser()
+    with span("build_prompt"):
+        messages = build_idea_messages(cfg, output_parser.get_format_instructions())
+
+    # Initial idea generation
+    with span("initial_generation"):
+        response = chat.invoke(messages)
+    
+    try:
+        with span("parse", round=1):
+            idea = output_parser.parse(response.content)
+        print("\nInitial idea:")
+        print(json.dumps(idea, indent=2))
+        current_idea = refine(chat, cfg, idea, output_parser, num_reflections)
+        return pd.DataFrame([idea_to_row(cfg, current_idea)])
     except Exception as e:
         print(f"Warning: Failed to parse response: {str(e)}\nResponse: {response.content}")
         print("Skipping this idea generation")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
+
+def parse_idea_batch(content):
+    """Parse a JSON list of ideas, keeping every complete item.
+    
+    Returns:
+        tuple: (list of valid idea dicts, number of items that failed to parse)
+    """
+    try:
+        items = parse_json_markdown(content)
+    except Exception as e:
+        print(f"Warning: Failed to parse batch response: {str(e)}")
+        return [], 1
+    if isinstance(items, dict):
+        items = items.get('ideas', [items])
+
+    ideas = [item for item in items if isinstance(item, dict) and all(item.get(k) for k in IDEA_FIELDS)]
+    return ideas, len(items) - len(ideas)
+
+def generate_research_idea_batch(chat, cfg, num_ideas, num_reflections=3):
+    """Generate several research ideas from a single request, then refine each one.
+    
+    The shared system prompt (format instructions, RAG papers) is sent once for all
+    ideas instead of once per idea. Items that fail to parse are skipped.
+    
+    Returns:
+        pd.DataFrame: DataFrame with one row per successfully generated idea
+    """
+    output_parser = create_idea_parser()
+    with span("build_prompt"):
+        messages = build_idea_messages(
+            cfg,
+            output_parser.get_format_instructions(),
+            human_suffix=BATCH_HUMAN_SUFFIX.format(num_ideas=num_ideas)
+        )
+
+    with span("initial_generation", num_ideas=num_ideas):
+        response = chat.invoke(messages)
+    with span("parse") as attrs:
+        ideas, num_failed = parse_idea_batch(response.content)
+        attrs['num_failed'] = num_failed
+    print(f"\nBatch generated {len(ideas)}/{num_ideas} ideas ({num_failed} failed to parse)")
+
+    rows = []
+    for idea in ideas[:num_ideas]:
+        print("\nInitial idea:")
+        print(json.dumps(idea, indent=2))
+        try:
+            rows.append(idea_to_row(cfg, refine(chat, cfg, idea, output_parser, num_reflections)))
+        except Exception as e:
+            print(f"Warning: Reflection failed, keeping initial idea: {str(e)}")
+            rows.append(idea_to_row(cfg, idea))
+    return pd.DataFrame(rows)
+
+def sample_candidates(chat, messages, num_candidates, provider_overrides=None):
+    """num_candidates completions of one prompt.
+
+    Providers that support it (supports_n in llm.PROVIDER_CONFIGS) return all of them from
+    one request, so the prompt is sent and billed once. Otherwise, and for wrapped clients
+    (streaming, routing), the prompt is sent in num_candidates concurrent requests.
+
+    Returns:
+        list: response contents
+    """
+    provider = provider_of(chat)
+    supports_n = (isinstance(chat, BaseChatModel) and provider in PROVIDER_CONFIGS
+                  and provider_settings(provider, provider_overrides).get('supports_n', False))
+    if supports_n:
+        result = chat.generate([messages], n=num_candidates)
+        return [generation.message.content for generation in result.generations[0]]
+    with ThreadPoolExecutor(num_candidates) as pool:
+        return [response.content for response in pool.map(lambda _: chat.invoke(messages), range(num_candidates))]
+
+def select_diverse_ideas(ideas, k):
+    """Pick k ideas spread out in embedding space (greedy farthest-point selection).
+
+    Starts from the idea least similar to the others, then repeatedly adds the idea
+    whose closest already selected idea is least similar to it.
+    """
+    if len(ideas) <= k:
+        return list(ideas)
+    embeddings = encode([idea_text(idea) for idea in ideas])
+    similarity = embeddings @ embeddings.T
+    selected = [int(np.argmin(similarity.sum(axis=1)))]
+    closest = similarity[selected[0]].copy()
+    while len(selected) < k:
+        closest[selected] = np.inf
+        best = int(np.argmin(closest))
+        selected.append(best)
+        closest = np.maximum(closest, similarity[best])
+    return [ideas[i] for i in selected]
+
+def generate_research_idea_candidates(chat, cfg, num_ideas, num_candidates, num_reflections=3):
+    """Sample num_candidates ideas from one prompt, keep the num_ideas most diverse valid ones and refine them.
+
+    Candidates that fail to parse are dropped before the diversity selection, so only
+    the kept ideas go through the reflection rounds.
+
+    Returns:
+        pd.DataFrame: DataFrame with one row per kept idea
+    """
+    output_parser = create_idea_parser()
+    with span("build_prompt"):
+        messages = build_idea_messages(cfg, output_parser.get_format_instructions())
+
+    with span("initial_generation", num_candidates=num_candidates):
+        contents = sample_candidates(chat, messages, num_candidates, cfg.get('providers'))
+    candidates = []
+    with span("parse") as attrs:
+        for content in contents:
+            try:
+                idea = output_parser.parse(content)
+            except Exception as e:
+                print(f"Warning: Failed to parse candidate: {str(e)}")
+                continue
+            if all(idea.get(k) for k in IDEA_FIELDS):
+                candidates.append(idea)
+        attrs['num_failed'] = len(contents) - len(candidates)
+    with span("select_candidates"):
+        kept = select_diverse_ideas(candidates, num_ideas)
+    print(f"\nKept {len(kept)} of {len(candidates)} valid candidates ({len(contents) - len(candidates)} failed to parse)")
+
+    rows = []
+    for idea in kept:
+        print("\nInitial idea:")
+        print(json.dumps(idea, indent=2))
+        try:
+            rows.append(idea_to_row(cfg, refine(chat, cfg, idea, output_parser, num_reflections)))
+        except Exception as e:
+            print(f"Warning: Reflection failed, keeping initial idea: {str(e)}")
+            rows.append(idea_to_row(cfg, idea))
+    return pd.DataFrame(rows)
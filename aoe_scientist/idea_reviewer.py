@@ -1,9 +1,14 @@
 from langchain_core.prompts import ChatPromptTemplate
-from langchain.output_parsers import ResponseSchema, StructuredOutputParser
+from aoe_scientist.router import track_served, served_columns
+from aoe_scientist.budget import active_budget
+from aoe_scientist.tracing import span
+from aoe_scientist.progress import tracker
 from pydantic import BaseModel, Field
 import pandas as pd
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+
+SCORE_FIELDS = ["technical_merit", "novelty", "feasibility", "impact", "clarity"]
 
 class ReviewOutput(BaseModel):
     """Schema for the review output."""
@@ -14,6 +19,14 @@ class ReviewOutput(BaseModel):
     clarity: int = Field(description="Rating from 1-10 on idea clarity", ge=1, le=10)
     justification: str = Field(description="Technical justification for the scores in 3-4 concise sentences")
 
+class IdeaReview(ReviewOutput):
+    """Schema for the review of one idea within a batch."""
+    idea_id: int = Field(description="Number of the idea being reviewed, as given in the prompt")
+
+class BatchReviewOutput(BaseModel):
+    """Schema for reviewing several ideas in one response."""
+    reviews: List[IdeaReview] = Field(description="Exactly one review per idea")
+
 # Prompt templates
 REVIEW_SYSTEM_TEMPLATE = """You are a senior AI research reviewer tasked with critically evaluating research ideas in the field of {topic}. 
 Your evaluation must be extremely thorough, unbiased, and highly critical - your research standards are extremely high. Many ideas might sound good on the surface, but ultimately 
@@ -87,17 +100,62 @@ Your task:
 2. Adjust scores (increase or decrease) for each category based on your technical analysis.
 3. Provide a concise, 3-4 sentence justification for any score adjustments, explaining your reasoning in technical terms."""
 
-def create_review_chain(chat, topic: str):
-    """Create a review chain with proper response schema parsing."""
-    # Load context for the topic
-    topic = "nas"
+BATCH_REVIEW_HUMAN_TEMPLATE = """Please review each of the following research ideas independently, with extreme rigor and skepticism. \
+Return exactly one review per idea and set its idea_id to the number of the idea.
+
+{ideas}
+
+### Review Guidelines:
+1. Critically analyze each aspect objectively and think deeply about each idea
+2. Support scores with specific examples and reasoning
+3. Consider both immediate and long-term implications
+4. Identify major challenges, limitations and flaws
+5. Be extremely critical - most ideas should score low unless truly exceptional
+6. Score every idea on its own merits, not relative to the other ideas in this list"""
+
+BATCH_REFLECTION_HUMAN_TEMPLATE = """Each research idea below is listed with its initial review scores.
+
+{ideas}
+
+As an expert senior evaluator in this research field, use your in-depth knowledge of the domain's current state to \
+critically re-evaluate each idea independently. Check whether the theoretical and methodological foundations are robust, \
+whether the idea is genuinely novel or incremental, whether the claimed impact is realistic, and whether practical \
+challenges or ambiguities were overlooked.
+
+Your task, for every idea:
+1. Identify additional strengths or limitations based on the current state of the field.
+2. Adjust scores (increase or decrease) for each category based on your technical analysis.
+3. Provide a concise, 3-4 sentence justification for any score adjustments, explaining your reasoning in technical terms.
+
+Return exactly one revised review per idea and set its idea_id to the number of the idea."""
+
+def load_field_context(topic: str) -> str:
+    """Load the distilled survey context for a topic."""
     context_path = f"data/surveys/{topic}/context.txt"
     try:
         with open(context_path, 'r') as f:
-            field_context = f.read()
+            return f.read()
     except FileNotFoundError:
         print(f"Warning: No context file found at {context_path}")
-        field_context = ""
+        return ""
+
+def combine_reviews(initial_review: Dict[str, Any], final_review: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine initial and final reviews with the overall score of the final review."""
+    overall_score = sum(int(final_review[k]) for k in SCORE_FIELDS) / len(SCORE_FIELDS)
+    return {
+        **{f"initial_{k}": v for k, v in initial_review.items()},
+        **final_review,
+        "overall_score": overall_score
+    }
+
+def create_review_chain(chat, topic: str, reflection: bool = True):
+    """Create a review chain with proper response schema parsing.
+
+    With reflection disabled the initial review is final, halving the LLM calls per idea.
+    """
+    # Load context for the topic
+    topic = "nas"
+    field_context = load_field_context(topic)
 
     # Create structured chat model with function calling
     structured_chat = chat.with_structured_output(ReviewOutput, method="function_calling")
@@ -115,8 +173,9 @@ def create_review_chain(chat, topic: str):
 
     def get_initial_review(title: str, details: str) -> Dict[str, Any]:
         """Get initial review scores and criticism."""
-        messages = review_prompt.format_messages(title=title, details=details)
-        review = structured_chat.invoke(messages)
+        with span("initial_review"):
+            messages = review_prompt.format_messages(title=title, details=details)
+            review = structured_chat.invoke(messages)
         print("\nInitial review:")
         print(json.dumps(review.dict(), indent=2))
         return review.dict()
@@ -124,17 +183,17 @@ def create_review_chain(chat, topic: str):
     def get_reflection_review(title: str, details: str, initial_review: Dict[str, Any]) -> Dict[str, Any]:
         """Get reflection review scores and criticism."""
         # Calculate overall score using integers
-        score_fields = ["technical_merit", "novelty", "feasibility", "impact", "clarity"]
-        overall_score = sum(int(initial_review[k]) for k in score_fields) / len(score_fields)
+        overall_score = sum(int(initial_review[k]) for k in SCORE_FIELDS) / len(SCORE_FIELDS)
         
-        messages = reflection_prompt.format_messages(
-            field_context=field_context,
-            title=title,
-            details=details,
-            **initial_review,
-            overall_score=overall_score
-        )
-        review = structured_chat.invoke(messages)
+        with span("reflection_review"):
+            messages = reflection_prompt.format_messages(
+                field_context=field_context,
+                title=title,
+                details=details,
+                **initial_review,
+                overall_score=overall_score
+            )
+            review = structured_chat.invoke(messages)
         print("\nFinal review after reflection:")
         print(json.dumps(review.dict(), indent=2))
         return review.dict()
@@ -142,68 +201,194 @@ def create_review_chain(chat, topic: str):
     def review_with_reflection(title: str, details: str) -> Dict[str, Any]:
         """Generate initial review and refine through reflection."""
         try:
-            # Get initial review
-            initial_review = get_initial_review(title, details)
+            with span("review", title=title):
+                # Get initial review
+                initial_review = get_initial_review(title, details)
 
-            # Get reflection review
-            try:
-                final_review = get_reflection_review(title, details, initial_review)
-            except Exception as e:
-                print(f"Reflection failed: {str(e)}")
+                # Get reflection review
                 final_review = initial_review
-
-            # Calculate overall score
-            score_fields = ["technical_merit", "novelty", "feasibility", "impact", "clarity"]
-            overall_score = sum(int(final_review[k]) for k in score_fields) / len(score_fields)
-
-            # Combine results with overall score
-            return {
-                **{f"initial_{k}": v for k, v in initial_review.items()},
-                **final_review,
-                "overall_score": overall_score
-            }
+                if reflection:
+                    try:
+                        final_review = get_reflection_review(title, details, initial_review)
+                    except Exception as e:
+                        print(f"Reflection failed: {str(e)}")
+
+                # Combine results with overall score
+                return combine_reviews(initial_review, final_review)
         except Exception as e:
             print(f"Review failed: {str(e)}")
             raise e
 
     return review_with_reflection
 
-def review_ideas(chat, cfg):
-    """Review research ideas and save results to a dataframe."""
-    ideas = pd.read_csv("data/ideas.csv", index_col=False)
-    review_chain = create_review_chain(chat, cfg['topic'])
-    reviews_df = pd.DataFrame()
+def parse_batch_reviews(result: Dict[str, Any], num_ideas: int) -> List[Optional[Dict[str, Any]]]:
+    """Validate each review of a batch response separately.
+
+    A malformed review only loses its own idea: the returned list has None for
+    every idea without a valid review.
+    """
+    if result.get('parsed') is not None:
+        items = [review.dict() for review in result['parsed'].reviews]
+    else:
+        tool_calls = getattr(result['raw'], 'tool_calls', None) or []
+        items = tool_calls[0]['args'].get('reviews', []) if tool_calls else []
 
-    for idx, idea in ideas.iterrows():
-        print(f"\nReviewing idea {idx+1}/{len(ideas)}:")
-        for attempt in range(3):
+    reviews = [None] * num_ideas
+    for item in items:
+        try:
+            review = IdeaReview(**item).dict()
+        except Exception:
+            continue
+        idx = review.pop('idea_id') - 1
+        if 0 <= idx < num_ideas:
+            reviews[idx] = review
+    return reviews
+
+def create_batch_review_chain(chat, topic: str, reflection: bool = True):
+    """Create a review chain that scores several ideas per request.
+
+    The review rubric and field context are sent once per batch instead of once per idea.
+    """
+    topic = "nas"
+    field_context = load_field_context(topic)
+    structured_chat = chat.with_structured_output(BatchReviewOutput, method="function_calling", include_raw=True)
+
+    review_prompt = ChatPromptTemplate.from_messages([
+        ("system", REVIEW_SYSTEM_TEMPLATE),
+        ("human", BATCH_REVIEW_HUMAN_TEMPLATE)
+    ]).partial(topic=topic)
+
+    reflection_prompt = ChatPromptTemplate.from_messages([
+        ("system", REFLECTION_SYSTEM_TEMPLATE),
+        ("human", BATCH_REFLECTION_HUMAN_TEMPLATE)
+    ])
+
+    def format_idea(number: int, title: str, details: str, review: Optional[Dict[str, Any]] = None) -> str:
+        text = f"Idea {number}:\nTitle: {title}\nDescription: {details}"
+        if review is not None:
+            scores = ", ".join(f"{k.replace('_', ' ').title()}: {review[k]}/10" for k in SCORE_FIELDS)
+            overall_score = sum(int(review[k]) for k in SCORE_FIELDS) / len(SCORE_FIELDS)
+            text += f"\nInitial Review Scores: {scores}, Overall Score: {overall_score}/10"
+        return text
+
+    def review_batch(items: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """Review (title, details) pairs; None marks ideas that need a single review."""
+        ideas = "\n\n".join(format_idea(i + 1, title, details) for i, (title, details) in enumerate(items))
+        with span("batch_initial_review", num_ideas=len(items)):
+            initial_reviews = parse_batch_reviews(
+                structured_chat.invoke(review_prompt.format_messages(ideas=ideas)), len(items)
+            )
+        print(f"\nBatch initial review: {sum(r is not None for r in initial_reviews)}/{len(items)} ideas scored")
+
+        final_reviews = list(initial_reviews)
+        pending = [i for i, review in enumerate(initial_reviews) if review is not None]
+        if reflection and pending:
+            ideas = "\n\n".join(
+                format_idea(slot + 1, *items[i], initial_reviews[i]) for slot, i in enumerate(pending)
+            )
             try:
-                review = review_chain(idea['title'], idea['details'])
-                review_data = {
-                    'name': str(idea['name']),
-                    'title': str(idea['title']),
-                    'researcher': idea['researcher'],
-                    'rag': idea['rag'],
-                    'generate_llm': idea['generate_llm'],
-                    'review_llm': cfg.get('review_llm'),
-                    **review
-                }
-                reviews_df = pd.concat([reviews_df, pd.DataFrame([review_data])], ignore_index=True)
-                break
+                with span("batch_reflection_review", num_ideas=len(pending)):
+                    reflected = parse_batch_reviews(
+                        structured_chat.invoke(reflection_prompt.format_messages(field_context=field_context, ideas=ideas)),
+                        len(pending)
+                    )
+                for slot, i in enumerate(pending):
+                    if reflected[slot] is not None:
+                        final_reviews[i] = reflected[slot]
             except Exception as e:
-                if attempt == 2:
-                    print(f"Failed to review '{idea['name']}' after 3 attempts: {str(e)}")
+                print(f"Batch reflection failed: {str(e)}")
+
+        return [
+            combine_reviews(initial, final) if initial is not None else None
+            for initial, final in zip(initial_reviews, final_reviews)
+        ]
+
+    return review_batch
+
+def review_ideas(chat, cfg, ideas=None):
+    """Review research ideas and save results to a dataframe.
+
+    Args:
+        chat: The chat model to use
+        cfg: Configuration dictionary
+        ideas: Ideas to review (default: all of data/ideas.csv); an idea_id column is
+            copied to the reviews, since ideas left when the budget runs out get no row
+    """
+    if ideas is None:
+        ideas = pd.read_csv("data/ideas.csv", index_col=False)
+    reflection = cfg.get('review_reflection', True)
+    batch_size = cfg.get('batch_size', 1)
+    budget = active_budget()
+    chains = {}
+
+    def get_chains(reflection):
+        if reflection not in chains:
+            chains[reflection] = (
+                create_review_chain(chat, cfg['topic'], reflection=reflection),
+                create_batch_review_chain(chat, cfg['topic'], reflection=reflection) if batch_size > 1 else None
+            )
+        return chains[reflection]
+
+    reviews_df = pd.DataFrame()
+    ideas = [idea for _, idea in ideas.iterrows()]
+    tracker.expect('review', cfg.get('review_llm'), len(ideas))
+
+    for start in range(0, len(ideas), batch_size):
+        if budget is not None and budget.exhausted():
+            print(f"Budget exhausted, skipping {len(ideas) - start} remaining reviews: {budget.report()}")
+            break
+        # Reflection reviews are dropped once the budget runs low
+        review_chain, batch_chain = get_chains(reflection and (budget is None or budget.reflections(1) > 0))
+        chunk = ideas[start:start + batch_size]
+        batch_reviews = [None] * len(chunk)
+        batch_served = []
+        if batch_chain is not None:
+            print(f"\nReviewing ideas {start+1}-{start+len(chunk)}/{len(ideas)} in one batch:")
+            try:
+                with track_served() as batch_served:
+                    batch_reviews = batch_chain([(idea['title'], idea['details']) for idea in chunk])
+            except Exception as e:
+                print(f"Batch review failed, falling back to single reviews: {str(e)}")
+
+        for offset, (idea, review) in enumerate(zip(chunk, batch_reviews)):
+            served = batch_served
+            if review is None:
+                print(f"\nReviewing idea {start+offset+1}/{len(ideas)}:")
+            for attempt in range(3):
+                try:
+                    if review is None:
+                        # With routing, record the provider(s) that actually answered
+                        with track_served() as served:
+                            review = review_chain(idea['title'], idea['details'])
                     review_data = {
                         'name': str(idea['name']),
                         'title': str(idea['title']),
                         'researcher': idea['researcher'],
                         'rag': idea['rag'],
-                        'review_llm': cfg.get('review_llm'),
-                        'justification': f"Failed to review: {str(e)}",
-                        'overall_score': 0
+                        'generate_llm': idea['generate_llm'],
+                        **served_columns(served, 'review_llm', cfg.get('review_llm')),
+                        **{k: v for k, v in idea.items() if k.startswith('surrogate_') or k == 'idea_id'},
+                        **review
                     }
                     reviews_df = pd.concat([reviews_df, pd.DataFrame([review_data])], ignore_index=True)
-                else:
-                    print(f"Attempt {attempt+1} failed, retrying...")
-
-    return reviews_df
\ No newline at end of file
+                    tracker.item_done('review', cfg.get('review_llm'))
+                    break
+                except Exception as e:
+                    if attempt == 2:
+                        print(f"Failed to review '{idea['name']}' after 3 attempts: {str(e)}")
+                        review_data = {
+                            'name': str(idea['name']),
+                            'title': str(idea['title']),
+                            'researcher': idea['researcher'],
+                            'rag': idea['rag'],
+                            'review_llm': cfg.get('review_llm'),
+                            **({'idea_id': idea['idea_id']} if 'idea_id' in idea else {}),
+                            'justification': f"Failed to review: {str(e)}",
+                            'overall_score': 0
+                        }
+                        reviews_df = pd.concat([reviews_df, pd.DataFrame([review_data])], ignore_index=True)
+                        tracker.item_done('review', cfg.get('review_llm'), failed=1)
+                    else:
+                        print(f"Attempt {attempt+1} failed, retrying...")
+
+    return reviews_df
@@ -1,54 +1,228 @@
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
+from aoe_scientist.streaming import StreamingChat
+from aoe_scientist.batching import MicroBatchingChat
+from aoe_scientist.router import RoutedChat
+from aoe_scientist.budget import UsageCallback
+from aoe_scientist.tracing import LLMSpanCallback
+from aoe_scientist.progress import ProgressCallback
+from functools import lru_cache
+import importlib.util
+import threading
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
-
-def create_client(llm_provider: str, temperature: float = 0.75) -> ChatOpenAI:
-    provider_configs = {
-        "deepseek": {
-            "class": ChatOpenAI,
-            "api_key_env": "DEEPSEEK_API_KEY",
-            "base_url": "https://api.deepseek.com/v1",
-            "model": "deepseek-chat"
-        },
-        "anthropic": {
-            "class": ChatAnthropic,
-            "api_key_env": "ANTHROPIC_API_KEY",
-            "model": "claude-3-5-sonnet-latest"
-        },
-        "openai": {
-            "class": ChatOpenAI,
-            "api_key_env": "OPENAI_API_KEY",
-            "model": "gpt-4o"
-            # "model": "o1-preview"
-        }
+PROVIDER_CONFIGS = {
+    "deepseek": {
+        "class": "ChatOpenAI",
+        "api_key_env": "DEEPSEEK_API_KEY",
+        "base_url": "https://api.deepseek.com/v1",
+        "model": "deepseek-chat"
+    },
+    "anthropic": {
+        "class": "ChatAnthropic",
+        "api_key_env": "ANTHROPIC_API_KEY",
+        "model": "claude-3-5-sonnet-latest"
+    },
+    "openai": {
+        "class": "ChatOpenAI",
+        "api_key_env": "OPENAI_API_KEY",
+        "model": "gpt-4o",
+        "supports_n": True  # several completions per request (n > 1)
+        # "model": "o1-preview"
+    },
+    "local": {
+        # OpenAI-compatible local server (llama.cpp, vLLM); endpoint and model come from config
+        "class": "ChatOpenAI",
+        "api_key_env": "LOCAL_API_KEY",
+        "default_api_key": "not-needed",
+        "base_url": "http://localhost:8080/v1",
+        "model": "local-model",
+        "max_batch_size": 8,
+        "batch_window_ms": 20
+    },
+    "mock": {
+        # Deterministic offline model for tests and dry runs (aoe_scientist/mock_llm.py)
+        "class": "MockChat",
+        "api_key_env": "MOCK_API_KEY",
+        "default_api_key": "not-needed",
+        "model": "mock",
+        "supports_n": True
     }
-    
+}
+
+
+def provider_settings(llm_provider: str, overrides=None):
+    """Built-in provider settings updated with the config's per-provider overrides."""
     llm_provider = llm_provider.lower()
-    if llm_provider not in provider_configs:
-        raise ValueError(f"Provider {llm_provider} not supported. Must be one of: {', '.join(provider_configs.keys())}")
-    
-    config = provider_configs[llm_provider]
-    
-    # Get API key
-    api_key = os.environ.get(config["api_key_env"])
+    if llm_provider not in PROVIDER_CONFIGS:
+        raise ValueError(f"Provider {llm_provider} not supported. Must be one of: {', '.join(PROVIDER_CONFIGS.keys())}")
+    return {**PROVIDER_CONFIGS[llm_provider], **((overrides or {}).get(llm_provider) or {})}
+
+
+@lru_cache(maxsize=None)
+def _pooled_anthropic_class():
+    """ChatAnthropic variant that accepts shared httpx clients like ChatOpenAI does.
+
+    ChatAnthropic has no http_client argument; it builds its anthropic clients in the cached
+    properties _client/_async_client (langchain-anthropic 0.3, pinned in pyproject.toml and
+    checked in tests/test_llm.py). If a release changes them, plain ChatAnthropic is used
+    with its own connection pool instead of silently losing the override.
+    """
+    from functools import cached_property
+    from typing import Any
+    from pydantic import Field
+    from langchain_anthropic import ChatAnthropic
+    import anthropic
+
+    if not all(isinstance(ChatAnthropic.__dict__.get(name), cached_property) for name in ('_client', '_async_client')):
+        print("Warning: unsupported langchain-anthropic version, Anthropic clients will not share the HTTP pool")
+        return ChatAnthropic
+
+    class PooledChatAnthropic(ChatAnthropic):
+        http_client: Any = Field(default=None, exclude=True)
+        http_async_client: Any = Field(default=None, exclude=True)
+
+        @cached_property
+        def _client(self) -> anthropic.Client:
+            if self.http_client is None:
+                return ChatAnthropic._client.func(self)
+            return anthropic.Client(**self._client_params, http_client=self.http_client)
+
+        @cached_property
+        def _async_client(self) -> anthropic.AsyncClient:
+            if self.http_async_client is None:
+                return ChatAnthropic._async_client.func(self)
+            return anthropic.AsyncClient(**self._client_params, http_client=self.http_async_client)
+
+    return PooledChatAnthropic
+
+
+def _chat_class(class_name: str):
+    """Import a chat model class on first use; each client library takes seconds to import."""
+    if class_name == "ChatAnthropic":
+        return _pooled_anthropic_class()
+    if class_name == "MockChat":
+        from aoe_scientist.mock_llm import MockChat
+        return MockChat
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI
+
+
+def create_client(llm_provider: str, temperature: float = 0.75, http_client=None, http_async_client=None,
+                  provider_overrides=None):
+    llm_provider = llm_provider.lower()
+    config = provider_settings(llm_provider, provider_overrides)
+
+    # Get API key (local servers accept any key)
+    api_key = os.environ.get(config["api_key_env"]) or config.get("default_api_key")
     if not api_key:
         raise ValueError(f"Missing {config['api_key_env']} environment variable")
-    
+
     # Create model instance
     kwargs = {
         "model": config["model"],
-        "api_key": api_key
+        "api_key": api_key,
+        "metadata": {"provider": llm_provider},
+        # Charge the token usage of every response to the run's budget, trace each call
+        # and count calls in flight for the progress dashboard
+        "callbacks": [UsageCallback(llm_provider), LLMSpanCallback(llm_provider), ProgressCallback(llm_provider)]
     }
-    
+
+    if config["class"] == "ChatOpenAI":
+        # Report token usage on streamed responses too
+        kwargs["stream_usage"] = True
+
     if config["model"] != "o1-preview":
         kwargs["temperature"] = temperature
-    
+
     if "base_url" in config:
         kwargs["base_url"] = config["base_url"]
-        
-    chat = config["class"](**kwargs)
+
+    chat_class = _chat_class(config["class"])
+    if http_client is not None and "http_client" in chat_class.model_fields:
+        kwargs["http_client"] = http_client
+    if http_async_client is not None and "http_async_client" in chat_class.model_fields:
+        kwargs["http_async_client"] = http_async_client
+
+    chat = chat_class(**kwargs)
     return chat
+
+
+_registry_lock = threading.Lock()
+_clients = {}
+_http_clients = {}
+
+
+def _shared_http_clients(max_connections: int, http2: bool):
+    """One pooled sync/async httpx transport per pool setting, shared by every provider."""
+    import httpx
+
+    # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it
+    http2 = http2 and importlib.util.find_spec("h2") is not None
+    key = (max_connections, http2)
+    if key not in _http_clients:
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        timeout = httpx.Timeout(600.0, connect=10.0)
+        _http_clients[key] = (
+            httpx.Client(limits=limits, timeout=timeout, http2=http2),
+            httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+        )
+    return _http_clients[key]
+
+
+def get_client(llm_provider: str, temperature: float = 0.75, max_connections: int = 32, http2: bool = True,
+               provider_overrides=None):
+    """Return the cached client for (provider, model, temperature, pool settings), creating it on first use.
+
+    All clients with the same pool settings share one pooled HTTP transport, so TLS
+    connections are kept alive and reused across calls, threads, providers and in-process
+    runs. Providers with a max_batch_size above 1 (local servers) are wrapped in a
+    MicroBatchingChat.
+    """
+    llm_provider = llm_provider.lower()
+    config = provider_settings(llm_provider, provider_overrides)
+    key = (llm_provider, config["model"], config.get("base_url"), temperature, max_connections, http2)
+    with _registry_lock:
+        if key not in _clients:
+            http_client, http_async_client = _shared_http_clients(max_connections, http2)
+            chat = create_client(llm_provider, temperature, http_client, http_async_client, provider_overrides)
+            if config.get("max_batch_size", 1) > 1:
+                chat = MicroBatchingChat(chat, config["max_batch_size"], config.get("batch_window_ms", 20))
+            _clients[key] = chat
+        return _clients[key]
+
+
+def create_stage_client(cfg, llm_provider: str, stage: str, temperature: float, required_fields=None):
+    """Create the client for one pipeline stage ('generate' or 'review').
+
+    With cfg['stream'] set, every call streams and records time-to-first-token; text
+    responses stop early once all required_fields of the JSON answer have arrived.
+    With cfg['routing']['enabled'] set, llm_provider is the primary of a RoutedChat that
+    hedges and fails over to the configured fallback providers.
+    """
+    pool = cfg.get('llm_pool', {})
+
+    def provider_client(provider):
+        chat = get_client(provider, temperature,
+                          max_connections=pool.get('max_connections', 32), http2=pool.get('http2', True),
+                          provider_overrides=cfg.get('providers'))
+        if cfg.get('stream'):
+            chat = StreamingChat(chat, stage, required_fields=required_fields)
+        return chat
+
+    routing = cfg.get('routing') or {}
+    if not routing.get('enabled'):
+        return provider_client(llm_provider)
+
+    routes = [(llm_provider, provider_client(llm_provider))]
+    for provider in routing.get('fallbacks') or []:
+        if provider in [name for name, _ in routes]:
+            continue
+        try:
+            routes.append((provider, provider_client(provider)))
+        except ValueError as e:
+            print(f"Skipping fallback provider {provider}: {str(e)}")
+    return RoutedChat(routes, hedge_after_s=routing.get('hedge_after_s', 30.0),
+                      failure_threshold=routing.get('failure_threshold', 3),
+                      cooldown_s=routing.get('cooldown_s', 60.0))
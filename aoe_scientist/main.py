@@ -1,19 +1,50 @@
 import pandas as pd
-from aoe_scientist.llm import create_client
-from aoe_scientist.idea_generator import generate_research_idea
-from aoe_scientist.idea_reviewer import review_ideas
+from aoe_scientist.llm import create_stage_client
 from aoe_scientist.utils import setup_config, save_df
+from aoe_scientist.metrics import save_run_metrics, RUN_ID
+from aoe_scientist.tracing import start_tracing, save_trace
+from aoe_scientist.router import track_served, served_columns
+from aoe_scientist.budget import start_budget, run_within_budget
+from aoe_scientist.progress import tracker, live_progress
+from aoe_scientist import embeddings
 
-def main():
-    cfg = setup_config()
-    
+# Pipeline modules are imported inside their mode so that each mode only pays for
+# the dependencies it uses (langchain parsers, scikit-learn, sentence-transformers).
+
+def run_mode(cfg, budget):
     if cfg['mode'] == 'generate':
+        from aoe_scientist.idea_generator import (generate_research_idea, generate_research_idea_batch,
+                                                  generate_research_idea_candidates, IDEA_FIELDS)
         print("Generating ideas using: ", cfg['generate_llm'], "\nRAG: ", cfg['rag'], "\nResearcher: ", cfg['researcher'])
-        chat = create_client(cfg['generate_llm'], temperature=0.75)
+        chat = create_stage_client(cfg, cfg['generate_llm'], 'generate', 0.75, IDEA_FIELDS)
         ideas_df = pd.DataFrame()
         
-        for _ in range(cfg['num_ideas']):
-            idea_df = generate_research_idea(chat, cfg)
+        batch_size = cfg['batch_size']
+        num_candidates = cfg['candidates']['per_request']
+        # Each request samples num_candidates completions and keeps the most diverse ones
+        ideas_per_request = min(cfg['candidates']['keep'], num_candidates) if num_candidates > 1 else batch_size
+        request_sizes = [min(ideas_per_request, cfg['num_ideas'] - start)
+                         for start in range(0, cfg['num_ideas'], ideas_per_request)]
+        tracker.expect('generate', cfg['generate_llm'], cfg['num_ideas'])
+
+        def generate(num_ideas):
+            # Reflection rounds shrink as the budget runs low
+            num_reflections = 3 if budget is None else budget.reflections(3)
+            with track_served() as served:
+                if num_candidates > 1:
+                    idea_df = generate_research_idea_candidates(chat, cfg, num_ideas, num_candidates, num_reflections)
+                elif batch_size > 1:
+                    idea_df = generate_research_idea_batch(chat, cfg, num_ideas, num_reflections)
+                else:
+                    idea_df = generate_research_idea(chat, cfg, num_reflections)
+            tracker.item_done('generate', cfg['generate_llm'], n=len(idea_df), failed=num_ideas - len(idea_df))
+            # With routing, label ideas with the provider that actually generated them
+            return idea_df.assign(**served_columns(served, 'generate_llm', cfg['generate_llm']))
+
+        # Concurrent requests share the client's pooled keep-alive connections; once the
+        # budget is exhausted no new requests start and the completed ideas are still saved
+        idea_dfs = run_within_budget(generate, request_sizes, cfg['concurrency'], budget)
+        for idea_df in idea_dfs:
             ideas_df = pd.concat([ideas_df, idea_df], ignore_index=True)
             for _, row in idea_df.iterrows():
                 print(f"\nGenerated idea:\nName: {row['name']}\nTitle: {row['title']}\nDetails: {row['details']}\n")
@@ -21,11 +52,68 @@ def main():
         save_df(ideas_df, 'data/ideas.csv')
     
     elif cfg['mode'] == 'review':
-        print("\nReviewing ideas using: ", cfg['review_llm'])
-        chat = create_client(cfg['review_llm'], temperature=0.25)
-        reviews_df = review_ideas(chat, cfg)
+        from aoe_scientist.idea_reviewer import review_ideas
+        ideas = pd.read_csv("data/ideas.csv", index_col=False)
+        screen_fraction = cfg['surrogate']['screen_fraction']
+        if screen_fraction < 1:
+            from aoe_scientist.surrogate import SurrogateReviewer, screen_ideas
+            surrogate = SurrogateReviewer.load(cfg['surrogate']['model_path'])
+            ideas = screen_ideas(ideas, surrogate, screen_fraction)
+        if cfg['review_schedule']:
+            from aoe_scientist.review_scheduler import schedule_reviews
+            print("\nReviewing ideas in stages using: ", [s['review_llm'] for s in cfg['review_schedule']])
+            reviews_df = schedule_reviews(cfg, ideas)
+        else:
+            print("\nReviewing ideas using: ", cfg['review_llm'])
+            chat = create_stage_client(cfg, cfg['review_llm'], 'review', 0.25)
+            reviews_df = review_ideas(chat, cfg, ideas)
         print(f"Reviews completed with average score: {reviews_df.overall_score.mean():.2f}")
+        if screen_fraction < 1:
+            from aoe_scientist.surrogate import surrogate_correlation
+            print("Surrogate vs LLM agreement:")
+            print(surrogate_correlation(reviews_df).round(3).to_string())
         save_df(reviews_df, 'data/reviews.csv')
 
+    elif cfg['mode'] == 'rank':
+        from aoe_scientist.tournament import rank_ideas, save_ratings
+        ideas = pd.read_csv("data/ideas.csv", index_col=False)
+        print("\nRanking ideas by pairwise comparison using: ", cfg['review_llm'])
+        chat = create_stage_client(cfg, cfg['review_llm'], 'review', 0.25)
+        ratings_df = rank_ideas(chat, cfg, ideas)
+        for _, row in ratings_df.head(5).iterrows():
+            print(f"\n#{row['rank']} (rating {row['rating']:.2f}, {row['wins']}/{row['comparisons']} wins): {row['title']}")
+        save_ratings(ratings_df, 'data/ratings.csv')
+
+    elif cfg['mode'] == 'plan':
+        from aoe_scientist.planner import plan_sweep, print_plan
+        print_plan(plan_sweep(cfg))
+
+    elif cfg['mode'] == 'evolve':
+        from aoe_scientist.idea_generator import IDEA_FIELDS
+        from aoe_scientist.evolution import evolve_ideas
+        print("Evolving ideas using: ", cfg['generate_llm'], "\nFitness from: ", cfg['review_llm'])
+        generate_chat = create_stage_client(cfg, cfg['generate_llm'], 'generate', 0.75, IDEA_FIELDS)
+        review_chat = create_stage_client(cfg, cfg['review_llm'], 'review', 0.25)
+        population_df, history_df = evolve_ideas(generate_chat, review_chat, cfg)
+        for _, row in population_df[population_df['front'] == 0].iterrows():
+            print(f"\nPareto-optimal idea:\nTitle: {row['title']}\nDetails: {row['details']}\n")
+        save_df(history_df, 'data/evolution.csv')
+
+def main(overrides=None):
+    cfg = setup_config(overrides=overrides)
+    budget = start_budget(cfg)
+    embeddings.configure(**cfg['embeddings'])
+    if cfg['trace']:
+        start_tracing()
+
+    with live_progress(cfg, f"data/logs/{cfg['mode']}-{RUN_ID}.log"):
+        run_mode(cfg, budget)
+
+    if budget is not None:
+        print(f"Budget used: {budget.report()}")
+    save_run_metrics()
+    if cfg['trace']:
+        save_trace(f"data/traces/{cfg['mode']}-{RUN_ID}.json")
+
 if __name__ == "__main__":
     main()
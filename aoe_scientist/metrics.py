@@ -0,0 +1,69 @@
+"""Per-call LLM latency and throughput metrics for a run."""
+from aoe_scientist.utils import save_df
+import pandas as pd
+import threading
+import time
+
+_lock = threading.Lock()
+_records = []
+RUN_ID = time.strftime("%Y%m%d-%H%M%S")
+
+
+def provider_of(chat):
+    """Provider name attached to a chat model by llm.create_client."""
+    return (getattr(chat, 'metadata', None) or {}).get('provider', type(chat).__name__)
+
+
+def record_llm_call(provider, stage, duration, ttft=None, input_tokens=None, output_tokens=None, aborted=False,
+                    output_chunks=None):
+    """Record one LLM call; tokens/sec is measured from the first token to the end of the stream.
+
+    output_tokens is the provider-reported usage (None when the stream ended before it), and
+    output_chunks the number of streamed text chunks; throughput uses the reported usage only.
+    """
+    generation_time = duration - ttft if ttft is not None else duration
+    tokens_per_sec = output_tokens / generation_time if output_tokens and generation_time > 0 else None
+    with _lock:
+        _records.append({
+            'run_id': RUN_ID,
+            'provider': provider,
+            'stage': stage,
+            'ttft': ttft,
+            'duration': duration,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'output_chunks': output_chunks,
+            'tokens_per_sec': tokens_per_sec,
+            'aborted': aborted
+        })
+
+
+def get_run_metrics():
+    with _lock:
+        return pd.DataFrame(_records)
+
+
+def summarize_run_metrics(metrics_df=None):
+    """Per-provider TTFT percentiles and generation throughput."""
+    metrics_df = get_run_metrics() if metrics_df is None else metrics_df
+    if metrics_df.empty:
+        return metrics_df
+    return metrics_df.groupby('provider').agg(
+        calls=('duration', 'size'),
+        ttft_p50=('ttft', 'median'),
+        ttft_p95=('ttft', lambda x: x.quantile(0.95)),
+        duration_mean=('duration', 'mean'),
+        tokens_per_sec=('tokens_per_sec', 'mean'),
+        aborted=('aborted', 'sum')
+    )
+
+
+def save_run_metrics(filepath='data/run_metrics.csv'):
+    """Append this run's call metrics to the metrics history and start a new record set."""
+    with _lock:
+        metrics_df = pd.DataFrame(_records)
+        _records.clear()
+    if not metrics_df.empty:
+        print("\nLLM call metrics by provider:")
+        print(summarize_run_metrics(metrics_df).round(3).to_string())
+        save_df(metrics_df, filepath)
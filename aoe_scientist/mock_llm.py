@@ -0,0 +1,103 @@
+"""Offline chat model for tests and dry runs of the pipeline without API keys (provider "mock")."""
+from typing import Any, Optional
+import hashlib
+import json
+import random
+import re
+from pydantic import Field
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+
+def _fill_schema(schema, seed):
+    """Build a value satisfying a (dereferenced) JSON schema, varied by seed."""
+    kind = schema.get('type')
+    if kind == 'object':
+        return {k: _fill_schema(v, seed + i) for i, (k, v) in enumerate(schema.get('properties', {}).items())}
+    if kind == 'array':
+        return [_fill_schema(schema.get('items', {}), seed)]
+    if kind == 'integer':
+        lo, hi = schema.get('minimum', 1), schema.get('maximum', 10)
+        return lo + seed % (hi - lo + 1)
+    if kind == 'number':
+        lo, hi = schema.get('minimum', 0.0), schema.get('maximum', 1.0)
+        return lo + (seed % 101) / 100 * (hi - lo)
+    if kind == 'boolean':
+        return True
+    return f"Mock {schema.get('description', 'text').lower()}"
+
+
+def _mock_idea(n):
+    return {
+        "Thought": "A mock idea for offline runs. I am done",
+        "Name": f"mock_idea_{n}",
+        "Title": f"Mock Research Idea {n}",
+        "Details": f"Mock idea {n} proposes a method. It is evaluated on a benchmark. It improves a baseline."
+    }
+
+
+class MockChat(BaseChatModel):
+    """Answers text prompts with ideas in the requested JSON format and tool calls with schema-valid
+    arguments. At temperature 0 answers are derived from a hash of the prompt, so they are
+    reproducible; otherwise they vary between calls like a sampled model."""
+
+    model: str = "mock"
+    api_key: Optional[str] = None
+    temperature: float = 0.0
+    http_client: Any = Field(default=None, exclude=True)
+    http_async_client: Any = Field(default=None, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock"
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, tools=None, n=1, **kwargs):
+        # n > 1 samples several completions of the prompt, each reporting the request's usage as OpenAI does
+        results = [self._generate_one(messages, tools, i) for i in range(n)]
+        input_tokens = results[0].usage_metadata['input_tokens']
+        output_tokens = sum(m.usage_metadata['output_tokens'] for m in results)
+        for message in results:
+            message.usage_metadata = {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens
+            }
+        return ChatResult(generations=[ChatGeneration(message=m) for m in results])
+
+    def _generate_one(self, messages, tools, index):
+        prompt = "\n".join(str(m.content) for m in messages)
+        if self.temperature == 0:
+            seed = int(hashlib.sha1(prompt.encode()).hexdigest()[:8], 16) + index
+        else:
+            seed = random.getrandbits(32)
+        if tools:
+            function = tools[0]['function']
+            message = AIMessage(content="", tool_calls=[{
+                "name": function['name'],
+                "args": _fill_schema(function['parameters'], seed),
+                "id": f"call_{seed:08x}"
+            }])
+            output = json.dumps(message.tool_calls[0]['args'])
+        else:
+            batch = re.search(r"JSON list of (\d+) objects", prompt)
+            if batch:
+                answer = [_mock_idea(seed % 100000 + i) for i in range(int(batch.group(1)))]
+            else:
+                answer = _mock_idea(seed % 100000)
+            output = f"```json\n{json.dumps(answer, indent=2)}\n```"
+            message = AIMessage(content=output)
+        # Rough whitespace token counts stand in for the provider's usage report
+        input_tokens, output_tokens = len(prompt.split()), len(output.split())
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens
+        }
+        # get_usage_metadata_callback attributes usage by model name
+        message.response_metadata = {"model_name": self.model}
+        return message
@@ -0,0 +1,59 @@
+"""Fuzzy matching of researcher names across paper metadata and configs."""
+from thefuzz import fuzz
+import pandas as pd
+import re
+
+def normalize_name(name):
+    """Normalize a name by removing special chars, extra spaces, etc."""
+    if pd.isna(name):
+        return ""
+    # Convert to lowercase and remove special characters
+    name = re.sub(r'[^\w\s]', ' ', str(name).lower())
+    # Remove extra whitespace
+    name = ' '.join(name.split())
+    return name
+
+def is_name_match(name1, name2, threshold=80):
+    """
+    Check if two names match using various fuzzy matching techniques.
+    Returns True if any matching method succeeds.
+    """
+    if pd.isna(name1) or pd.isna(name2):
+        return False
+        
+    name1 = normalize_name(name1)
+    name2 = normalize_name(name2)
+    
+    # Direct matches
+    if name1 == name2:
+        return True
+    
+    # Check if one name is contained within the other
+    if name1 in name2 or name2 in name1:
+        return True
+    
+    # Fuzzy ratio matching
+    if fuzz.ratio(name1, name2) >= threshold:
+        return True
+        
+    # Token sort ratio (handles reordered names better)
+    if fuzz.token_sort_ratio(name1, name2) >= threshold:
+        return True
+    
+    # Token set ratio (handles partial matches better)
+    if fuzz.token_set_ratio(name1, name2) >= threshold:
+        return True
+    
+    # Handle initials
+    name1_parts = name1.split()
+    name2_parts = name2.split()
+    if len(name1_parts) > 1 and len(name2_parts) > 1:
+        # Compare last names
+        if fuzz.ratio(name1_parts[-1], name2_parts[-1]) >= threshold:
+            # Check if initials match
+            initials1 = ''.join(part[0] for part in name1_parts[:-1])
+            initials2 = ''.join(part[0] for part in name2_parts[:-1])
+            if initials1 == initials2:
+                return True
+    
+    return False
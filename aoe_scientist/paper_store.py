@@ -0,0 +1,150 @@
+"""Memory-lean access to the paper dump (data/paper_dump.csv).
+
+The dump is read in chunks. Only the metadata needed to find a researcher's candidate
+papers is held in memory, with researcher, venue and first/last author as categoricals.
+Free-text columns (abstract, author list) are read only for the rows that are asked for.
+With pyarrow installed, the CSV is converted once to a Parquet file in the cache directory;
+later runs memory-map it and read abstracts from just the row groups they fall in.
+"""
+import json
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+METADATA_COLUMNS = ['researcher', 'title', 'year', 'venue', 'citations', 'first_author', 'last_author',
+                    'author_count']
+TEXT_COLUMNS = ['abstract', 'authors']
+CATEGORY_COLUMNS = ['researcher', 'venue', 'first_author', 'last_author']
+CHUNK_ROWS = 100_000
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _string_dtype():
+    return pd.StringDtype('pyarrow') if _has_pyarrow() else pd.StringDtype('python')
+
+
+def _csv_dtypes(columns):
+    # Floats rather than ints so chunks with and without missing values share a schema
+    dtypes = {'year': 'float32', 'citations': 'float64', 'author_count': 'float32'}
+    dtypes.update({c: _string_dtype() for c in ['title', 'url'] + TEXT_COLUMNS + CATEGORY_COLUMNS})
+    return {c: d for c, d in dtypes.items() if c in columns}
+
+
+def _arrow_strings():
+    import pyarrow as pa
+    return {pa.string(): pd.StringDtype('pyarrow'), pa.large_string(): pd.StringDtype('pyarrow')}.get
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {'source': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class PaperStore:
+    """Chunked, column-projected reader of a paper dump CSV with an optional Parquet cache.
+
+    Args:
+        csv_path (str): The paper dump.
+        cache_dir (str): Where the Parquet copy is kept; None disables the cache.
+        chunk_rows (int): Rows per CSV chunk and per Parquet row group.
+    """
+
+    def __init__(self, csv_path="data/paper_dump.csv", cache_dir="data/paper_cache", chunk_rows=CHUNK_ROWS):
+        self.csv_path = csv_path
+        self.chunk_rows = chunk_rows
+        self.parquet_path = None
+        if cache_dir and _has_pyarrow():
+            name = os.path.splitext(os.path.basename(csv_path))[0]
+            self.parquet_path = os.path.join(cache_dir, f"{name}.parquet")
+
+    def _chunks(self, columns):
+        header = pd.read_csv(self.csv_path, nrows=0).columns
+        usecols = [c for c in columns if c in header]
+        return pd.read_csv(self.csv_path, usecols=usecols, dtype=_csv_dtypes(usecols), chunksize=self.chunk_rows)
+
+    def _parquet_is_current(self):
+        if not os.path.exists(self.parquet_path):
+            return False
+        import pyarrow.parquet as pq
+        metadata = pq.read_schema(self.parquet_path).metadata or {}
+        return json.loads(metadata.get(b'aoe_source', b'{}')) == _source_stamp(self.csv_path)
+
+    def ensure_parquet(self):
+        """Convert the CSV to Parquet, one row group per chunk, unless the copy is current."""
+        if self.parquet_path is None or self._parquet_is_current():
+            return self.parquet_path
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        print(f"Converting {self.csv_path} to {self.parquet_path}...")
+        os.makedirs(os.path.dirname(self.parquet_path), exist_ok=True)
+        tmp_path = self.parquet_path + ".tmp"
+        writer = None
+        for chunk in self._chunks(pd.read_csv(self.csv_path, nrows=0).columns):
+            chunk['has_abstract'] = chunk['abstract'].notna()
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                schema = table.schema.with_metadata({'aoe_source': json.dumps(_source_stamp(self.csv_path))})
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(table.cast(schema), row_group_size=self.chunk_rows)
+        if writer is not None:
+            writer.close()
+            os.replace(tmp_path, self.parquet_path)
+        return self.parquet_path
+
+    def metadata(self):
+        """All papers without their free-text columns, plus a has_abstract flag.
+
+        The index is the paper's row number in the dump, as expected by text().
+        """
+        if self.ensure_parquet():
+            import pyarrow.parquet as pq
+            # Dictionary-encoded columns arrive as categoricals
+            table = pq.read_table(self.parquet_path, columns=METADATA_COLUMNS + ['has_abstract'], memory_map=True,
+                                  read_dictionary=CATEGORY_COLUMNS)
+            return table.to_pandas(types_mapper=_arrow_strings())
+
+        frames = []
+        for chunk in self._chunks(METADATA_COLUMNS + ['abstract']):
+            chunk['has_abstract'] = chunk.pop('abstract').notna()
+            frames.append(chunk.astype({c: 'category' for c in CATEGORY_COLUMNS}))
+        if not frames:
+            return pd.DataFrame(columns=METADATA_COLUMNS + ['has_abstract'])
+        # Categories differ between chunks; unite them so the columns stay categorical
+        df = pd.concat([f.drop(columns=CATEGORY_COLUMNS) for f in frames], ignore_index=True)
+        for column in CATEGORY_COLUMNS:
+            df[column] = pd.api.types.union_categoricals([f[column] for f in frames])
+        return df[METADATA_COLUMNS + ['has_abstract']]
+
+    def text(self, rows, columns=TEXT_COLUMNS):
+        """Free-text columns of the papers at the given row numbers, indexed by row number."""
+        rows = np.sort(np.unique(np.asarray(rows, dtype=np.int64)))
+        if len(rows) == 0:
+            return pd.DataFrame(columns=list(columns), index=pd.Index(rows))
+        if self.ensure_parquet():
+            import pyarrow.parquet as pq
+            parquet = pq.ParquetFile(self.parquet_path, memory_map=True)
+            starts = np.cumsum([0] + [parquet.metadata.row_group(i).num_rows
+                                      for i in range(parquet.num_row_groups)])
+            groups = np.unique(np.searchsorted(starts, rows, side='right') - 1)
+            table = parquet.read_row_groups(groups.tolist(), columns=list(columns))
+            # Row numbers of the rows read, to pick out the requested ones
+            read_rows = np.concatenate([np.arange(starts[g], starts[g + 1]) for g in groups])
+            df = table.take(np.searchsorted(read_rows, rows)).to_pandas(types_mapper=_arrow_strings())
+            df.index = rows
+            return df
+        return _csv_text(self.csv_path, tuple(columns), self.chunk_rows).loc[rows]
+
+
+@lru_cache(maxsize=4)
+def _csv_text(csv_path, columns, chunk_rows):
+    # Without pyarrow there is no random access into the CSV: read the text once per process
+    store = PaperStore(csv_path, cache_dir=None, chunk_rows=chunk_rows)
+    return pd.concat(store._chunks(list(columns)), ignore_index=True)
@@ -0,0 +1,110 @@
+"""Researcher personas: a compact research profile distilled once from a researcher's papers.
+
+RAG prompts can carry the persona instead of the raw abstracts, so every idea of a
+researcher pays a few hundred tokens instead of the full paper context. Personas are
+stored in data/personas/ keyed by a hash of the papers they were distilled from, so they
+are redistilled only when select_papers picks different papers.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from langchain_core.messages import HumanMessage
+from aoe_scientist.rag_context import researcher_papers, TokenCounter
+
+PERSONA_PROMPT = """
+You are an expert senior researcher. You are tasked with writing a compact research profile of {researcher} from \
+their recent papers.
+
+You will be provided with the titles and abstracts of the papers, surrounded by triple quotes. Your task is to \
+understand what this researcher works on and how they work. Be specific and technical, but concise: the profile \
+will be given to another model that has to generate research ideas in this researcher's style.
+The output should include:
+The researcher's core research areas and the problems they keep returning to.
+Their signature methods, techniques, and experimental approach.
+The open questions and directions their recent work points to.
+Do not list the papers or their titles. Use at most {max_words} words of plain prose.
+Papers:
+\"\"\"
+{papers}
+\"\"\"
+"""
+
+_locks_lock = threading.Lock()
+_locks = {}
+
+
+def papers_hash(papers_df):
+    """Hash of the paper set a persona is distilled from (order-independent)."""
+    papers = sorted(f"{t}\n{y}\n{a}" for t, y, a in zip(papers_df['title'], papers_df['year'], papers_df['abstract']))
+    return hashlib.sha256("\n\n".join(papers).encode()).hexdigest()
+
+
+def persona_path(researcher, digest, persona_dir="data/personas"):
+    slug = re.sub(r'[^a-z0-9]+', '_', researcher.lower()).strip('_')
+    return os.path.join(persona_dir, f"{slug}-{digest[:12]}.json")
+
+
+def distill_persona(chat, researcher, papers_df, max_words=250):
+    """Ask the LLM for the research profile of researcher given their papers."""
+    papers = "\n\n".join(f"{row['title']} ({int(row['year'])})\n{row['abstract']}" for _, row in papers_df.iterrows())
+    response = chat.invoke([HumanMessage(content=PERSONA_PROMPT.format(
+        researcher=researcher, papers=papers, max_words=max_words
+    ))])
+    assert response.content is not None
+    return response.content.strip()
+
+
+def load_or_distill_persona(chat_factory, researcher, papers_df, persona_dir="data/personas", max_words=250):
+    """The stored persona for this paper set, distilling it on first use.
+
+    Args:
+        chat_factory: Called without arguments to get the chat model, only if a distillation is needed
+        researcher: Name as used in the prompts
+        papers_df: The researcher's selected papers
+
+    Returns:
+        dict: persona record with 'persona', 'researcher', 'papers_hash', 'num_papers', 'created'
+    """
+    digest = papers_hash(papers_df)
+    path = persona_path(researcher, digest, persona_dir)
+    with _locks_lock:
+        lock = _locks.setdefault(path, threading.Lock())
+    # Concurrent generations of the same researcher wait for a single distillation
+    with lock:
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        print(f"Distilling the persona of {researcher} from {len(papers_df)} papers...")
+        chat = chat_factory()
+        record = {
+            'researcher': researcher,
+            'papers_hash': digest,
+            'num_papers': len(papers_df),
+            'provider': (getattr(chat, 'metadata', None) or {}).get('provider'),
+            'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'persona': distill_persona(chat, researcher, papers_df, max_words)
+        }
+        os.makedirs(persona_dir, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(record, f, indent=2)
+        print(f"Persona saved to {path}")
+        return record
+
+
+def researcher_persona(cfg, researcher, papers_path="data/scholar_papers.csv"):
+    """Persona of researcher, distilled with rag_context.persona_llm (default: generate_llm).
+
+    Returns:
+        tuple: (persona text, stats dict with tokens and papers)
+    """
+    from aoe_scientist.llm import get_client, provider_settings
+    rag_cfg = cfg['rag_context']
+    provider = rag_cfg.get('persona_llm') or cfg['generate_llm']
+    papers_df = researcher_papers(researcher, papers_path)
+    record = load_or_distill_persona(lambda: get_client(provider, temperature=0.25), researcher, papers_df,
+                                     rag_cfg.get('persona_dir', "data/personas"))
+    model = provider_settings(cfg['generate_llm'], cfg.get('providers'))['model']
+    return record['persona'], {'tokens': TokenCounter(model).count(record['persona']), 'papers': record['num_papers']}
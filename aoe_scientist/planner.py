@@ -0,0 +1,218 @@
+"""Dry-run estimate of a generate + review sweep: LLM calls, tokens, cost and wall time.
+
+The sweep is the matrix in cfg['sweep'] that scripts/run_ideas.py and scripts/run_reviews.py
+run. Input tokens come from rendering the actual prompts (RAG papers, format instructions,
+survey context, tool schemas) and counting them with the target model's tokenizer. Output
+tokens and call latency are the medians of earlier runs in data/run_metrics.csv (recorded
+with stream=true), falling back to DEFAULT_CALL_STATS for provider/stage pairs without history.
+
+Call counts assume every reflection round runs; ideas that converge early make the real
+sweep cheaper.
+"""
+import math
+import os
+import json
+import pandas as pd
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from aoe_scientist.budget import PRICES
+from aoe_scientist.llm import provider_settings
+from aoe_scientist.rag_context import TokenCounter, researcher_papers
+from aoe_scientist.idea_generator import (build_idea_messages, build_reflection_messages, create_idea_parser,
+                                          BATCH_HUMAN_SUFFIX)
+from aoe_scientist.idea_reviewer import (ReviewOutput, BatchReviewOutput, load_field_context, REVIEW_SYSTEM_TEMPLATE,
+                                         REVIEW_HUMAN_TEMPLATE, REFLECTION_SYSTEM_TEMPLATE, REFLECTION_HUMAN_TEMPLATE,
+                                         BATCH_REVIEW_HUMAN_TEMPLATE, BATCH_REFLECTION_HUMAN_TEMPLATE, SCORE_FIELDS)
+from aoe_scientist.personas import papers_hash, persona_path
+
+# Median output tokens and seconds per call when a provider/stage has no history
+DEFAULT_CALL_STATS = {'generate': {'output_tokens': 400, 'duration': 20.0},
+                      'review': {'output_tokens': 250, 'duration': 10.0}}
+NUM_REFLECTIONS = 3  # as run by main.run_mode without a budget
+
+
+def call_stats(metrics_path="data/run_metrics.csv"):
+    """Median output tokens and duration per (provider, stage) of earlier calls.
+
+    Only calls that returned are recorded; aborted ones are streams stopped as soon as their
+    JSON answer was complete (streaming.stream_text), so they count like any other call.
+    Those never receive their usage, so their output tokens are estimated by the number of
+    streamed chunks (providers stream about one token per chunk).
+    """
+    if not os.path.exists(metrics_path):
+        return {}
+    metrics_df = pd.read_csv(metrics_path)
+    if 'output_chunks' in metrics_df:
+        metrics_df['output_tokens'] = metrics_df['output_tokens'].fillna(metrics_df['output_chunks'])
+    stats = metrics_df.groupby(['provider', 'stage']).agg(
+        output_tokens=('output_tokens', 'median'), duration=('duration', 'median'), calls=('duration', 'size'))
+    for stage, defaults in DEFAULT_CALL_STATS.items():
+        in_stage = stats.index.get_level_values('stage') == stage
+        stats.loc[in_stage] = stats.loc[in_stage].fillna(defaults)
+    return {key: row.to_dict() for key, row in stats.iterrows()}
+
+
+def sample_idea(ideas_path="data/ideas.csv"):
+    """An idea of median length from earlier runs, to render reflection and review prompts with."""
+    if os.path.exists(ideas_path):
+        ideas = pd.read_csv(ideas_path, index_col=False).dropna(subset=['title', 'details'])
+        if not ideas.empty:
+            idea = ideas.iloc[(ideas['details'].str.len() - ideas['details'].str.len().median()).abs().argmin()]
+            return {k: str(idea.get(k.lower(), '')) for k in ['Thought', 'Name', 'Title', 'Details']}
+    return {'Thought': 'thought ' * 40, 'Name': 'idea_name', 'Title': 'title ' * 10, 'Details': 'details ' * 150}
+
+
+def messages_tokens(counter, messages):
+    return sum(counter.count(str(m.content)) for m in messages)
+
+
+def _persona_cached(cfg, researcher):
+    digest = papers_hash(researcher_papers(researcher))
+    return os.path.exists(persona_path(researcher, digest, cfg['rag_context'].get('persona_dir', "data/personas")))
+
+
+class Estimate:
+    """Accumulates calls, tokens and wall time per (stage, provider)."""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.rows = {}
+
+    def add(self, stage, provider, calls, input_tokens, output_tokens, wall_time_s, runs=0):
+        row = self.rows.setdefault((stage, provider), dict.fromkeys(
+            ['runs', 'calls', 'input_tokens', 'output_tokens', 'wall_time_s'], 0))
+        row['runs'] += runs
+        row['calls'] += calls
+        row['input_tokens'] += input_tokens
+        row['output_tokens'] += output_tokens
+        row['wall_time_s'] += wall_time_s
+
+    def to_df(self):
+        plan_df = pd.DataFrame([{'stage': stage, 'provider': provider, **row}
+                                for (stage, provider), row in self.rows.items()])
+        input_price = plan_df['provider'].map(lambda p: self.prices.get(p, (0.0, 0.0))[0])
+        output_price = plan_df['provider'].map(lambda p: self.prices.get(p, (0.0, 0.0))[1])
+        plan_df['usd'] = (plan_df['input_tokens'] * input_price + plan_df['output_tokens'] * output_price) / 1e6
+        return plan_df
+
+
+def plan_generation(estimate, cfg, stats, idea):
+    """Add one generate run (cfg's generate_llm, rag and researcher) to estimate."""
+    provider = cfg['generate_llm']
+    settings = provider_settings(provider, cfg.get('providers'))
+    counter = TokenCounter(settings['model'])
+    history = stats.get((provider, 'generate'), DEFAULT_CALL_STATS['generate'])
+    output, duration = history['output_tokens'], history['duration']
+    format_instructions = create_idea_parser().get_format_instructions()
+    if cfg['rag'] and cfg['rag_context'].get('mode') == 'persona' and not _persona_cached(cfg, cfg['researcher']):
+        print(f"No persona of {cfg['researcher']} distilled yet, counting its paper abstracts instead")
+        cfg = {**cfg, 'rag_context': {**cfg['rag_context'], 'mode': 'papers'}}
+
+    num_ideas, batch_size = cfg['num_ideas'], cfg['batch_size']
+    num_candidates = cfg['candidates']['per_request']
+    supports_n = settings.get('supports_n', False)
+    if num_candidates > 1:
+        ideas_per_request = min(cfg['candidates']['keep'], num_candidates)
+        samples = 1 if supports_n else num_candidates
+        initial_input = messages_tokens(counter, build_idea_messages(cfg, format_instructions))
+        initial = (samples, initial_input * samples, output * num_candidates)
+    elif batch_size > 1:
+        ideas_per_request = batch_size
+        initial_input = messages_tokens(counter, build_idea_messages(
+            cfg, format_instructions, human_suffix=BATCH_HUMAN_SUFFIX.format(num_ideas=batch_size)))
+        initial = (1, initial_input, output * batch_size)
+    else:
+        ideas_per_request = 1
+        initial = (1, messages_tokens(counter, build_idea_messages(cfg, format_instructions)), output)
+    requests = math.ceil(num_ideas / ideas_per_request)
+
+    # Reflection calls per idea; beam rounds expand 1, then beam_width ideas with branching samples each
+    reflection_input = messages_tokens(counter, build_reflection_messages(idea, 2, NUM_REFLECTIONS, format_instructions))
+    reflection = cfg.get('reflection') or {}
+    beam_width, branching = reflection.get('beam_width', 1), reflection.get('branching', 2)
+    if beam_width > 1:
+        parents = sum(1 if r == 0 else beam_width for r in range(NUM_REFLECTIONS - 1))
+        calls = parents * (1 if supports_n else branching)
+        reflections = (calls, reflection_input * calls, output * parents * branching)
+    else:
+        reflections = (NUM_REFLECTIONS - 1, reflection_input * (NUM_REFLECTIONS - 1), output * (NUM_REFLECTIONS - 1))
+
+    calls = requests * initial[0] + num_ideas * reflections[0]
+    # Requests run concurrently; within one, the initial call and then each idea's rounds are sequential
+    depth = 1 + ideas_per_request * (NUM_REFLECTIONS - 1)
+    wall_time = math.ceil(requests / cfg['concurrency']) * depth * duration
+    estimate.add('generate', provider, calls, requests * initial[1] + num_ideas * reflections[1],
+                 requests * initial[2] + num_ideas * reflections[2], wall_time, runs=1)
+
+
+def plan_review(estimate, cfg, stats, idea, num_ideas):
+    """Add one review run of num_ideas ideas with cfg's review_llm to estimate."""
+    provider = cfg['review_llm']
+    counter = TokenCounter(provider_settings(provider, cfg.get('providers'))['model'])
+    history = stats.get((provider, 'review'), DEFAULT_CALL_STATS['review'])
+    output, duration = history['output_tokens'], history['duration']
+    reflection = cfg.get('review_reflection', True)
+    batch_size = cfg['batch_size']
+    # create_review_chain always reviews in the NAS field context
+    field_context = load_field_context("nas")
+    scores = {k: 5 for k in SCORE_FIELDS}
+    title, details = idea['Title'], idea['Details']
+
+    if batch_size > 1:
+        tool = counter.count(json.dumps(convert_to_openai_tool(BatchReviewOutput)))
+        ideas = "\n\n".join(f"Idea {i + 1}:\nTitle: {title}\nDescription: {details}" for i in range(batch_size))
+        score_line = ", ".join(f"{k.replace('_', ' ').title()}: 5/10" for k in SCORE_FIELDS)
+        reviewed = ideas.replace("\nTitle:", f"\nInitial Review Scores: {score_line}, Overall Score: 5.0/10\nTitle:")
+        review_input = tool + counter.count(REVIEW_SYSTEM_TEMPLATE.format(topic="nas")) + \
+            counter.count(BATCH_REVIEW_HUMAN_TEMPLATE.format(ideas=ideas))
+        reflection_input = tool + counter.count(REFLECTION_SYSTEM_TEMPLATE.format(field_context=field_context)) + \
+            counter.count(BATCH_REFLECTION_HUMAN_TEMPLATE.format(ideas=reviewed))
+        requests, output = math.ceil(num_ideas / batch_size), output * batch_size
+    else:
+        tool = counter.count(json.dumps(convert_to_openai_tool(ReviewOutput)))
+        review_input = tool + counter.count(REVIEW_SYSTEM_TEMPLATE.format(topic="nas")) + \
+            counter.count(REVIEW_HUMAN_TEMPLATE.format(title=title, details=details))
+        reflection_input = tool + counter.count(REFLECTION_SYSTEM_TEMPLATE.format(field_context=field_context)) + \
+            counter.count(REFLECTION_HUMAN_TEMPLATE.format(title=title, details=details, overall_score=5.0, **scores))
+        requests = num_ideas
+
+    calls_per_request = 2 if reflection else 1
+    input_tokens = requests * (review_input + (reflection_input if reflection else 0))
+    # review_ideas reviews one idea (or batch) after another
+    estimate.add('review', provider, requests * calls_per_request, input_tokens,
+                 requests * calls_per_request * output, requests * calls_per_request * duration, runs=1)
+
+
+def plan_sweep(cfg, metrics_path="data/run_metrics.csv", ideas_path="data/ideas.csv"):
+    """Estimate the sweep in cfg['sweep']: each LLM generates num_ideas without RAG and for every
+    researcher, then each review LLM reviews all ideas (the existing ones plus the new).
+
+    Returns:
+        pd.DataFrame: runs, calls, input/output tokens, usd and wall_time_s per stage and provider
+    """
+    sweep = cfg['sweep']
+    stats = call_stats(metrics_path)
+    idea = sample_idea(ideas_path)
+    estimate = Estimate({**PRICES, **{k: tuple(v) for k, v in (cfg['budget'].get('prices') or {}).items()}})
+
+    generate_runs = [(llm, False, None) for llm in sweep['llms']]
+    generate_runs += [(llm, True, researcher) for llm in sweep['llms'] for researcher in sweep['researchers']]
+    for llm, rag, researcher in generate_runs:
+        plan_generation(estimate, {**cfg, 'generate_llm': llm, 'rag': rag, 'researcher': researcher}, stats, idea)
+
+    existing = len(pd.read_csv(ideas_path, index_col=False)) if os.path.exists(ideas_path) else 0
+    num_ideas = existing + len(generate_runs) * cfg['num_ideas']
+    for llm in sweep['review_llms']:
+        plan_review(estimate, {**cfg, 'review_llm': llm}, stats, idea, num_ideas)
+
+    plan_df = estimate.to_df()
+    plan_df['history_calls'] = [stats.get((p, s), {}).get('calls', 0) for s, p in zip(plan_df['stage'], plan_df['provider'])]
+    return plan_df
+
+
+def print_plan(plan_df):
+    total = plan_df.drop(columns=['stage', 'provider', 'history_calls']).sum()
+    print("\nEstimated sweep (output tokens and latency from data/run_metrics.csv where history_calls > 0):")
+    print(plan_df.set_index(['stage', 'provider']).round(2).to_string())
+    print(f"\nTotal: {int(total['calls'])} calls, {int(total['input_tokens']):,} input and "
+          f"{int(total['output_tokens']):,} output tokens, ${total['usd']:.2f}, "
+          f"{total['wall_time_s'] / 3600:.1f} h wall time")
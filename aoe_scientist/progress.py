@@ -0,0 +1,233 @@
+"""Live progress of generate/review runs: terminal dashboard and Prometheus metrics."""
+from collections import Counter
+from contextlib import contextmanager, redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from langchain_core.callbacks import BaseCallbackHandler
+import os
+import sys
+import threading
+import time
+
+
+class Progress:
+    """Counters of ideas/reviews per (stage, provider) and LLM calls per provider.
+
+    Counts accumulate over in-process runs, so a sweep shows its whole generate/review matrix.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = {}
+        self.expected = Counter()
+        self.done = Counter()
+        self.failed = Counter()
+        self.in_flight = Counter()
+        self.llm_calls = Counter()
+        self.llm_errors = Counter()
+
+    def expect(self, stage, provider, n):
+        with self.lock:
+            self.started.setdefault((stage, provider), time.monotonic())
+            self.expected[(stage, provider)] += n
+
+    def item_done(self, stage, provider, n=1, failed=0):
+        with self.lock:
+            self.done[(stage, provider)] += n
+            self.failed[(stage, provider)] += failed
+
+    def llm_started(self, provider):
+        with self.lock:
+            self.in_flight[provider] += 1
+
+    def llm_finished(self, provider, error=False):
+        with self.lock:
+            self.in_flight[provider] -= 1
+            self.llm_calls[provider] += 1
+            self.llm_errors[provider] += error
+
+    def snapshot(self):
+        """One row per (stage, provider) with rate per minute and ETA in seconds."""
+        now = time.monotonic()
+        with self.lock:
+            rows = []
+            for key in sorted(set(self.expected) | set(self.done)):
+                stage, provider = key
+                done, expected = self.done[key], self.expected[key]
+                rate = done / (max(now - self.started.get(key, now), 1e-9) / 60)
+                remaining = max(expected - done, 0)
+                rows.append({
+                    'stage': stage,
+                    'provider': provider,
+                    'done': done,
+                    'expected': expected,
+                    'failed': self.failed[key],
+                    'per_min': rate,
+                    'eta_s': remaining / rate * 60 if rate > 0 else None,
+                    'in_flight': self.in_flight[provider],
+                    'llm_error_rate': self.llm_errors[provider] / self.llm_calls[provider]
+                    if self.llm_calls[provider] else 0.0
+                })
+            return rows
+
+    def prometheus_text(self):
+        """Metrics in the Prometheus text exposition format."""
+        lines = []
+        metrics = [
+            ('aoe_items_done_total', 'counter', 'Ideas or reviews completed', 'done'),
+            ('aoe_items_expected', 'gauge', 'Ideas or reviews scheduled', 'expected'),
+            ('aoe_items_failed_total', 'counter', 'Ideas or reviews that failed', 'failed'),
+            ('aoe_items_per_minute', 'gauge', 'Completion rate since start', 'per_min'),
+            ('aoe_eta_seconds', 'gauge', 'Estimated time to finish the scheduled items', 'eta_s'),
+        ]
+        rows = self.snapshot()
+        for name, kind, help_text, field in metrics:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [
+                f'{name}{{stage="{r["stage"]}",provider="{r["provider"]}"}} {r[field]:g}'
+                for r in rows if r[field] is not None
+            ]
+        with self.lock:
+            lines += ["# HELP aoe_llm_in_flight LLM requests in flight", "# TYPE aoe_llm_in_flight gauge"]
+            lines += [f'aoe_llm_in_flight{{provider="{p}"}} {n}' for p, n in sorted(self.in_flight.items())]
+            lines += ["# HELP aoe_llm_calls_total LLM calls finished", "# TYPE aoe_llm_calls_total counter"]
+            lines += [f'aoe_llm_calls_total{{provider="{p}"}} {n}' for p, n in sorted(self.llm_calls.items())]
+            lines += ["# HELP aoe_llm_errors_total LLM calls that raised", "# TYPE aoe_llm_errors_total counter"]
+            lines += [f'aoe_llm_errors_total{{provider="{p}"}} {n}' for p, n in sorted(self.llm_errors.items())]
+        return "\n".join(lines) + "\n"
+
+
+tracker = Progress()
+
+
+class ProgressCallback(BaseCallbackHandler):
+    """Count in-flight and finished LLM calls of one provider's client."""
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        tracker.llm_started(self.provider)
+
+    def on_llm_end(self, response, **kwargs):
+        tracker.llm_finished(self.provider)
+
+    def on_llm_error(self, error, **kwargs):
+        # A stream closed early by its consumer (streaming.stream_text) finished fine
+        tracker.llm_finished(self.provider, error=not isinstance(error, GeneratorExit))
+
+
+def _format_eta(eta_s):
+    if eta_s is None:
+        return "-"
+    return time.strftime("%H:%M:%S", time.gmtime(eta_s))
+
+
+def _render(rows):
+    """Rich table of the snapshot rows."""
+    from rich.table import Table
+    table = Table(title=f"AOE Scientist progress ({time.strftime('%H:%M:%S')})")
+    for column in ["Stage", "Provider", "Done", "Failed", "Per min", "ETA", "In flight", "LLM errors"]:
+        table.add_column(column, justify="left" if column in ("Stage", "Provider") else "right")
+    for r in rows:
+        table.add_row(
+            r['stage'], r['provider'], f"{r['done']}/{r['expected']}", str(r['failed']), f"{r['per_min']:.1f}",
+            _format_eta(r['eta_s']), str(r['in_flight']), f"{r['llm_error_rate']:.0%}"
+        )
+    return table
+
+
+def _summary_line(rows):
+    return " | ".join(
+        f"{r['stage']}/{r['provider']}: {r['done']}/{r['expected']} ({r['per_min']:.1f}/min, ETA {_format_eta(r['eta_s'])})"
+        for r in rows
+    )
+
+
+def _serve_metrics(port):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = tracker.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("localhost", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving progress metrics on http://localhost:{port}/metrics")
+    return server
+
+
+@contextmanager
+def live_progress(cfg, log_path):
+    """Show progress while the block runs, as configured in cfg['progress'].
+
+    The dashboard is drawn on the terminal (rich if installed, otherwise a status line);
+    meanwhile the per-response output goes to log_path instead of flooding it. The
+    Prometheus metrics are rewritten to metrics_path and/or served on localhost:port.
+    """
+    pcfg = cfg.get('progress') or {}
+    dashboard, metrics_path, port = pcfg.get('dashboard'), pcfg.get('metrics_path'), pcfg.get('port')
+    if not (dashboard or metrics_path or port):
+        yield
+        return
+
+    server = _serve_metrics(port) if port else None
+    stop = threading.Event()
+    live = None
+    if dashboard:
+        try:
+            from rich.console import Console
+            from rich.live import Live
+            live = Live(_render([]), console=Console(file=sys.__stdout__), refresh_per_second=4)
+        except ImportError:
+            pass
+
+    def refresh():
+        rows = tracker.snapshot()
+        if metrics_path:
+            if os.path.dirname(metrics_path):
+                os.makedirs(os.path.dirname(metrics_path), exist_ok=True)
+            with open(metrics_path + ".tmp", 'w') as f:
+                f.write(tracker.prometheus_text())
+            os.replace(metrics_path + ".tmp", metrics_path)
+        if live is not None:
+            live.update(_render(rows))
+        elif dashboard and rows:
+            sys.__stdout__.write(_summary_line(rows) + "\n")
+            sys.__stdout__.flush()
+
+    def loop():
+        while not stop.wait(pcfg.get('refresh_s', 2.0)):
+            refresh()
+
+    thread = threading.Thread(target=loop, daemon=True)
+    log_file = None
+    try:
+        if dashboard:
+            if os.path.dirname(log_path):
+                os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            log_file = open(log_path, 'a')
+            sys.__stdout__.write(f"Run output is written to {log_path}\n")
+        if live is not None:
+            live.start()
+        thread.start()
+        if log_file is not None:
+            with redirect_stdout(log_file):
+                yield
+        else:
+            yield
+    finally:
+        stop.set()
+        thread.join()
+        refresh()
+        if live is not None:
+            live.stop()
+        if log_file is not None:
+            log_file.close()
+        if server is not None:
+            server.shutdown()
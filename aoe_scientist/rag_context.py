@@ -0,0 +1,111 @@
+"""Token-budgeted serialization of a researcher's papers for the RAG prompt."""
+from functools import lru_cache
+import os
+import pandas as pd
+from aoe_scientist.names import is_name_match
+
+# tiktoken encodings of the hosted models; other providers' tokenizers are not public,
+# so their counts use cl100k_base as an estimate
+MODEL_ENCODINGS = {'gpt-4o': 'o200k_base', 'o1': 'o200k_base', 'gpt-4': 'cl100k_base'}
+DEFAULT_ENCODING = 'cl100k_base'
+CHARS_PER_TOKEN = 4  # Fallback estimate when tiktoken or its encoding files are unavailable
+
+
+class TokenCounter:
+    """Counts and truncates text in tokens of the target model's tokenizer."""
+
+    def __init__(self, model=None):
+        self.encoding = _load_encoding(_encoding_name(model))
+
+    def count(self, text):
+        if self.encoding is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text, max_tokens):
+        """Cut text to at most max_tokens (including the ellipsis marking the cut)."""
+        if self.count(text) <= max_tokens:
+            return text
+        if max_tokens <= 1:
+            return ""
+        if self.encoding is None:
+            return text[:(max_tokens - 1) * CHARS_PER_TOKEN].rstrip() + "…"
+        tokens = self.encoding.encode(text, disallowed_special=())
+        return self.encoding.decode(tokens[:max_tokens - 1]).rstrip() + "…"
+
+
+def _encoding_name(model):
+    model = (model or '').lower()
+    return next((enc for prefix, enc in MODEL_ENCODINGS.items() if model.startswith(prefix)), DEFAULT_ENCODING)
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(name):
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:  # Not installed, or the encoding file cannot be downloaded
+        print(f"Warning: tiktoken encoding {name} unavailable ({type(e).__name__}), estimating tokens from length")
+        return None
+
+
+def format_paper(paper, abstract):
+    return f"- {paper['title']} ({int(paper['year'])}): {abstract}"
+
+
+def build_rag_context(papers_df, max_tokens=3000, max_abstract_tokens=300, model=None, min_abstract_tokens=32):
+    """Pack papers into at most max_tokens, highest final_score first.
+
+    Each abstract is cut to max_abstract_tokens. When the next paper does not fit, its
+    abstract is cut further to fill the remaining budget, if at least min_abstract_tokens
+    of it would remain; otherwise the paper is left out.
+
+    Returns:
+        tuple: (context string, stats dict with tokens, papers, truncated, dropped)
+    """
+    counter = TokenCounter(model)
+    # Older selections have no final_score; their file order is the selection order
+    if 'final_score' in papers_df:
+        papers_df = papers_df.sort_values('final_score', ascending=False, kind='stable')
+
+    lines, used, truncated = [], 0, 0
+    for _, paper in papers_df.iterrows():
+        abstract = str(paper['abstract'])
+        short = counter.truncate(abstract, max_abstract_tokens)
+        line = format_paper(paper, short)
+        # Lines are joined with newlines, one token each
+        cost = counter.count(line) + (1 if lines else 0)
+        if used + cost > max_tokens:
+            header_cost = counter.count(format_paper(paper, "")) + (1 if lines else 0)
+            room = max_tokens - used - header_cost
+            if room < min_abstract_tokens:
+                continue
+            short = counter.truncate(short, room)
+            line = format_paper(paper, short)
+            cost = counter.count(line) + (1 if lines else 0)
+            if used + cost > max_tokens:
+                continue
+        truncated += short != abstract
+        lines.append(line)
+        used += cost
+
+    stats = {'tokens': used, 'papers': len(lines), 'truncated': truncated, 'dropped': len(papers_df) - len(lines)}
+    return "\n".join(lines), stats
+
+
+def researcher_papers(researcher, papers_path="data/scholar_papers.csv"):
+    """The selected papers of a researcher (fuzzy name match)."""
+    papers_df = pd.read_csv(papers_path)
+    return papers_df[papers_df['researcher'].apply(lambda x: is_name_match(x, researcher))]
+
+
+@lru_cache(maxsize=32)
+def _cached_context(papers_path, mtime_ns, researcher, max_tokens, max_abstract_tokens, model):
+    return build_rag_context(researcher_papers(researcher, papers_path), max_tokens, max_abstract_tokens, model)
+
+
+def researcher_context(researcher, max_tokens=3000, max_abstract_tokens=300, model=None,
+                       papers_path="data/scholar_papers.csv"):
+    """RAG context of a researcher, built once per process while the papers file is unchanged."""
+    return _cached_context(papers_path, os.stat(papers_path).st_mtime_ns, researcher, max_tokens,
+                           max_abstract_tokens, model)
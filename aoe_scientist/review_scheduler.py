@@ -0,0 +1,75 @@
+"""Successive-halving review scheduling: cheap reviewers on everything, expensive ones on the best."""
+from aoe_scientist.llm import create_stage_client
+from aoe_scientist.idea_reviewer import review_ideas
+import pandas as pd
+import math
+
+
+def promote(ideas, stage_reviews, promote_fraction, max_ideas=None):
+    """Select the ideas that advance to the next stage.
+
+    Ideas are ranked by their mean overall score over all stages reviewed so far,
+    so one noisy reviewer cannot single-handedly eliminate an idea.
+    """
+    num_promote = max(1, math.ceil(promote_fraction * len(ideas)))
+    if max_ideas is not None:
+        num_promote = min(num_promote, max_ideas)
+    ranking = stage_reviews.groupby('idea_id')['overall_score'].mean()
+    promoted_ids = ranking.loc[ideas['idea_id']].nlargest(num_promote).index
+    return ideas[ideas['idea_id'].isin(promoted_ids)]
+
+
+def budget_cut(ideas, max_ideas, seed=0):
+    """The max_ideas ideas a first stage can afford, in their original order.
+
+    Ideas screened by the surrogate keep the best predicted ones; otherwise a random
+    sample is taken, so the cut does not depend on the order of ideas.csv.
+    """
+    if 'surrogate_overall_score' in ideas:
+        kept = ideas.nlargest(max_ideas, 'surrogate_overall_score')
+    else:
+        kept = ideas.sample(max_ideas, random_state=seed)
+    return kept.sort_index()
+
+
+def schedule_reviews(cfg, ideas):
+    """Review ideas in successive-halving stages defined by cfg['review_schedule'].
+
+    Each stage has a review_llm, whether to run the reflection round, the fraction of its
+    ideas promoted to the next stage and an optional max_ideas budget for the stage. Later
+    stages get the best max_ideas ideas from promote; a budget on the first stage is met
+    with budget_cut.
+
+    If the budget runs out within a stage, the reviews finished so far are returned and
+    no later stage starts.
+
+    Returns:
+        pd.DataFrame: Reviews from every stage in the reviews.csv schema, plus a 'stage' column
+    """
+    ideas = ideas.reset_index(drop=True).copy()
+    ideas['idea_id'] = ideas.index
+    all_reviews = pd.DataFrame()
+    stages = cfg['review_schedule']
+
+    for stage_idx, stage in enumerate(stages):
+        max_ideas = stage.get('max_ideas')
+        if max_ideas is not None and len(ideas) > max_ideas:
+            ideas = budget_cut(ideas, max_ideas)
+        print(f"\nReview stage {stage_idx + 1}/{len(stages)}: {len(ideas)} ideas, "
+              f"review_llm={stage['review_llm']}, reflection={stage.get('reflection', False)}")
+
+        stage_cfg = {**cfg, 'review_llm': stage['review_llm'], 'review_reflection': stage.get('reflection', False)}
+        chat = create_stage_client(cfg, stage['review_llm'], 'review', 0.25)
+        stage_reviews = review_ideas(chat, stage_cfg, ideas)
+        if not stage_reviews.empty:
+            all_reviews = pd.concat([all_reviews, stage_reviews.assign(stage=stage_idx)], ignore_index=True)
+        # review_ideas stops early when the budget runs out; later stages would start nothing
+        if len(stage_reviews) < len(ideas):
+            print(f"Budget exhausted in stage {stage_idx + 1}, keeping {len(all_reviews)} reviews so far")
+            break
+
+        if stage_idx < len(stages) - 1:
+            next_budget = stages[stage_idx + 1].get('max_ideas')
+            ideas = promote(ideas, all_reviews, stage.get('promote_fraction', 0.5), next_budget)
+
+    return all_reviews.drop(columns='idea_id', errors='ignore')
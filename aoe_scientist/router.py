@@ -0,0 +1,208 @@
+"""Multi-provider routing with hedged requests, failover and per-provider circuit breakers."""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+import threading
+import time
+
+# Hedged requests outlive the call that started them, so they run on a shared pool
+_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="router")
+_local = threading.local()
+_health_lock = threading.Lock()
+_health = {}
+
+
+class ProviderHealth:
+    """Consecutive-failure circuit breaker and call statistics for one provider.
+
+    The circuit opens after failure_threshold consecutive errors. Once the cooldown has
+    passed it is half-open: a single trial request is let through while other callers
+    keep skipping the provider, and the trial's outcome closes the circuit or reopens it
+    for another cooldown. Not thread-safe on its own; callers hold _health_lock.
+    """
+
+    def __init__(self):
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.tripped = False
+        self.trial_in_flight = False
+        self.calls = 0
+        self.errors = 0
+        self.total_latency = 0.0
+
+    def state(self):
+        if not self.tripped:
+            return 'closed'
+        if time.monotonic() < self.open_until or self.trial_in_flight:
+            return 'open'
+        return 'half_open'
+
+    def available(self):
+        return self.state() != 'open'
+
+    def acquire(self):
+        """Whether a request may go to this provider now; in half-open state this takes the trial."""
+        state = self.state()
+        if state == 'half_open':
+            self.trial_in_flight = True
+        return state != 'open'
+
+    def release_trial(self):
+        """Give back a trial slot that was acquired but not used."""
+        self.trial_in_flight = False
+
+    def record_success(self, latency):
+        self.calls += 1
+        self.total_latency += latency
+        self.consecutive_failures = 0
+        self.tripped = self.trial_in_flight = False
+
+    def record_failure(self, failure_threshold, cooldown_s):
+        """Count an error; returns True if it opened (or, for a failed trial, reopened) the circuit."""
+        self.calls += 1
+        self.errors += 1
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.consecutive_failures >= failure_threshold:
+            self.tripped = True
+            self.open_until = time.monotonic() + cooldown_s
+            return True
+        return False
+
+
+def provider_health(name):
+    with _health_lock:
+        return _health.setdefault(name, ProviderHealth())
+
+
+@contextmanager
+def track_served():
+    """Collect the providers that served the routed calls made by this thread."""
+    previous = getattr(_local, 'served', None)
+    _local.served = served = []
+    try:
+        yield served
+    finally:
+        _local.served = previous
+
+
+def served_provider(served, default):
+    """The provider that served most of an item's calls (default if nothing was routed)."""
+    return Counter(served).most_common(1)[0][0] if served else default
+
+
+def served_columns(served, column, requested):
+    """Row fields naming the provider that served an item and, when routed, the one requested."""
+    if not served:
+        return {column: requested}
+    return {column: served_provider(served, requested), 'routed_from': requested}
+
+
+class RoutedChat:
+    """Route calls over an ordered list of providers, primary first.
+
+    A request is hedged to the next provider if no answer arrives within hedge_after_s,
+    and fails over to the next provider as soon as a request errors. The first successful
+    answer wins. Providers whose circuit is open are skipped until their cooldown ends.
+    """
+
+    def __init__(self, routes, hedge_after_s=30.0, failure_threshold=3, cooldown_s=60.0):
+        self.routes = routes
+        self.hedge_after_s = hedge_after_s
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.metadata = {'provider': routes[0][0]}
+
+    def with_structured_output(self, *args, **kwargs):
+        return RoutedChat(
+            [(name, chat.with_structured_output(*args, **kwargs)) for name, chat in self.routes],
+            self.hedge_after_s, self.failure_threshold, self.cooldown_s
+        )
+
+    def _candidates(self):
+        """Routes whose circuit lets a request through, and the names that took a half-open trial."""
+        available, trials = [], []
+        with _health_lock:
+            for name, chat in self.routes:
+                health = _health.setdefault(name, ProviderHealth())
+                half_open = health.state() == 'half_open'
+                if health.acquire():
+                    available.append((name, chat))
+                    if half_open:
+                        trials.append(name)
+        # With every circuit open, trying them all beats failing outright
+        return (available or list(self.routes)), trials
+
+    def _call(self, name, chat, input, config):
+        health = provider_health(name)
+        start = time.monotonic()
+        try:
+            result = chat.invoke(input) if config is None else chat.invoke(input, config)
+        except Exception:
+            with _health_lock:
+                opened = health.record_failure(self.failure_threshold, self.cooldown_s)
+            if opened:
+                print(f"Circuit open for {name}: {health.consecutive_failures} consecutive failures, "
+                      f"skipping it for {self.cooldown_s:.0f}s")
+            raise
+        with _health_lock:
+            health.record_success(time.monotonic() - start)
+        return result
+
+    def invoke(self, input, config=None):
+        candidates, trials = self._candidates()
+        pending = {}
+        errors = []
+        next_idx = 0
+
+        def launch():
+            nonlocal next_idx
+            name, chat = candidates[next_idx]
+            next_idx += 1
+            pending[_executor.submit(self._call, name, chat, input, config)] = name
+
+        try:
+            launch()
+            while pending:
+                timeout = self.hedge_after_s if next_idx < len(candidates) else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    print(f"Hedging: no answer from {', '.join(pending.values())} after {self.hedge_after_s}s, "
+                          f"also asking {candidates[next_idx][0]}")
+                    launch()
+                    continue
+                for future in done:
+                    name = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        errors.append(f"{name}: {str(e)}")
+                        if next_idx < len(candidates):
+                            print(f"{name} failed, failing over to {candidates[next_idx][0]}")
+                            launch()
+                        continue
+                    if getattr(_local, 'served', None) is not None:
+                        _local.served.append(name)
+                    return result
+            raise RuntimeError(f"All providers failed: {'; '.join(errors)}")
+        finally:
+            # Half-open trials of providers this request never reached go to the next caller
+            unused = {name for name, _ in candidates[next_idx:]} & set(trials)
+            with _health_lock:
+                for name in unused:
+                    _health[name].release_trial()
+
+
+def health_report():
+    """Per-provider call counts, error rate, mean latency and circuit state."""
+    with _health_lock:
+        return {
+            name: {
+                'calls': h.calls,
+                'errors': h.errors,
+                'mean_latency': h.total_latency / max(h.calls - h.errors, 1),
+                'circuit_open': h.state() == 'open',
+                'circuit': h.state()
+            }
+            for name, h in _health.items()
+        }
@@ -0,0 +1,179 @@
+"""HTTP service for on-demand idea generation and review (uv pip install ".[service]").
+
+The clients, review chains, survey context and the configured researchers' RAG context are
+created once at startup and shared by all requests. At most service.max_concurrency requests
+call the LLMs at a time; up to service.max_queue more wait their turn and beyond that requests
+are rejected with 503. Reviews (and generations that ask for it) are cached by their inputs,
+and identical requests in flight share one computation.
+
+Usage: python -m aoe_scientist.service generate_llm=deepseek review_llm=openai service.port=8000
+"""
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional
+import asyncio
+import hashlib
+import json
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+from aoe_scientist.llm import create_stage_client
+from aoe_scientist.utils import setup_config
+from aoe_scientist import embeddings
+
+
+class GenerateRequest(BaseModel):
+    researcher: Optional[str] = Field(None, description="Generate in the style of this researcher (RAG)")
+    topic: Optional[str] = Field(None, description="Research topic (default: the configured topic)")
+    num_reflections: int = Field(3, ge=1, le=10)
+    cache: bool = Field(False, description="Return the cached idea of an identical earlier request")
+
+
+class ReviewRequest(BaseModel):
+    title: str
+    details: str
+    reflection: Optional[bool] = Field(None, description="Run the reflection round (default: review_reflection)")
+
+
+class ResultCache:
+    """LRU cache of results by key; concurrent calls with the same key share one computation."""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.results = OrderedDict()
+        self.in_flight = {}
+        self.hits = 0
+
+    async def get_or_run(self, key, compute):
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+        if key in self.in_flight:
+            self.hits += 1
+            return await asyncio.shield(self.in_flight[key])
+        task = asyncio.ensure_future(compute())
+        self.in_flight[key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            self.in_flight.pop(key, None)
+        self.results[key] = result
+        if len(self.results) > self.max_size:
+            self.results.popitem(last=False)
+        return result
+
+
+def request_key(kind, cfg, payload):
+    """Hash of everything a result depends on."""
+    key = [kind, cfg['generate_llm'] if kind == 'generate' else cfg['review_llm'], payload]
+    return hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+
+class Service:
+    """Warm clients and chains plus the request limiter shared by all requests."""
+
+    def __init__(self, cfg):
+        # Imported here like in main.run_mode: the pipeline modules pull in langchain parsers
+        from aoe_scientist.idea_generator import IDEA_FIELDS
+        from aoe_scientist.idea_reviewer import create_review_chain
+        self.cfg = cfg
+        settings = cfg.get('service') or {}
+        self.generate_chat = create_stage_client(cfg, cfg['generate_llm'], 'generate', 0.75, IDEA_FIELDS)
+        review_chat = create_stage_client(cfg, cfg['review_llm'], 'review', 0.25)
+        # Both variants load the survey context now rather than on the first request
+        self.review_chains = {reflection: create_review_chain(review_chat, cfg['topic'], reflection)
+                              for reflection in (True, False)}
+        self.max_concurrency = settings.get('max_concurrency', 4)
+        self.max_queue = settings.get('max_queue', 64)
+        self.slots = asyncio.Semaphore(self.max_concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.cache = ResultCache(settings.get('cache_size', 1024))
+        for researcher in settings.get('preload_researchers') or []:
+            self.preload(researcher)
+
+    def preload(self, researcher):
+        """Build (and cache) a researcher's RAG prompt context before the first request needs it."""
+        from aoe_scientist.idea_generator import build_idea_messages, create_idea_parser
+        format_instructions = create_idea_parser().get_format_instructions()
+        build_idea_messages({**self.cfg, 'rag': True, 'researcher': researcher}, format_instructions)
+
+    async def run(self, function, *args):
+        """Run a blocking pipeline call in a worker thread once a concurrency slot is free."""
+        if self.waiting >= self.max_queue:
+            raise HTTPException(503, f"Queue full ({self.waiting} requests waiting)")
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await asyncio.to_thread(function, *args)
+        finally:
+            self.running -= 1
+            self.slots.release()
+
+    async def generate(self, request: GenerateRequest):
+        from aoe_scientist.idea_generator import generate_research_idea
+        cfg = {**self.cfg, 'rag': request.researcher is not None, 'researcher': request.researcher,
+               'topic': request.topic or self.cfg['topic']}
+
+        async def compute():
+            idea_df = await self.run(generate_research_idea, self.generate_chat, cfg, request.num_reflections)
+            if idea_df.empty:
+                raise HTTPException(502, "The LLM response could not be parsed into an idea")
+            return idea_df.iloc[0].to_dict()
+
+        if not request.cache:
+            return await compute()
+        return await self.cache.get_or_run(request_key('generate', cfg, request.model_dump()), compute)
+
+    async def review(self, request: ReviewRequest):
+        reflection = self.cfg.get('review_reflection', True) if request.reflection is None else request.reflection
+        chain = self.review_chains[reflection]
+        payload = {'title': request.title, 'details': request.details, 'reflection': reflection}
+        return await self.cache.get_or_run(request_key('review', self.cfg, payload),
+                                           lambda: self.run(chain, request.title, request.details))
+
+    def status(self):
+        return {'status': 'ok', 'generate_llm': self.cfg['generate_llm'], 'review_llm': self.cfg['review_llm'],
+                'running': self.running, 'waiting': self.waiting, 'max_concurrency': self.max_concurrency,
+                'cached': len(self.cache.results), 'cache_hits': self.cache.hits}
+
+
+def create_app(cfg):
+    """FastAPI app serving POST /generate, POST /review and GET /health."""
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.service = Service(cfg)
+        yield
+
+    app = FastAPI(title="AoE Scientist", lifespan=lifespan)
+
+    @app.post("/generate")
+    async def generate(request: GenerateRequest):
+        return await app.state.service.generate(request)
+
+    @app.post("/review")
+    async def review(request: ReviewRequest):
+        return await app.state.service.review(request)
+
+    @app.get("/health")
+    async def health():
+        return app.state.service.status()
+
+    return app
+
+
+def main(overrides=None):
+    import uvicorn
+    cfg = setup_config(overrides=overrides)
+    embeddings.configure(**cfg['embeddings'])
+    settings = cfg.get('service') or {}
+    uvicorn.run(create_app(cfg), host=settings.get('host', '127.0.0.1'), port=settings.get('port', 8000))
+
+
+if __name__ == "__main__":
+    main()
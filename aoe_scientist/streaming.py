@@ -0,0 +1,154 @@
+"""Streaming LLM execution with incremental JSON parsing and first-token latency tracking."""
+from langchain_core.messages import AIMessage
+from langchain_core.utils.json import parse_json_markdown
+from aoe_scientist.metrics import provider_of, record_llm_call
+import json
+import re
+import time
+
+
+def _chunk_text(chunk):
+    """Text of a streamed chunk (Anthropic streams lists of content blocks)."""
+    if isinstance(chunk.content, str):
+        return chunk.content
+    return "".join(
+        block.get('text', '') for block in chunk.content
+        if isinstance(block, dict) and block.get('type') == 'text'
+    )
+
+
+def json_fields_complete(text, required_fields):
+    """Whether every required field of the streamed JSON object has been fully received.
+
+    A field is complete once a later key has started or the object is closed, since the
+    partial parser also returns fields whose string value is still being streamed.
+    """
+    try:
+        parsed = parse_json_markdown(text)
+    except Exception:
+        return False
+    if not isinstance(parsed, dict) or not all(field in parsed for field in required_fields):
+        return False
+    keys = list(parsed.keys())
+    if keys[-1] not in required_fields:
+        return True
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match is None:
+        return False
+    try:
+        json.loads(match.group(0))
+        return True
+    except json.JSONDecodeError:
+        return False
+
+
+def _usage(message):
+    usage = getattr(message, 'usage_metadata', None) or {}
+    return usage.get('input_tokens'), usage.get('output_tokens')
+
+
+def stream_text(chat, messages, stage, required_fields=None, echo=True):
+    """Stream a text response and return it as an AIMessage.
+
+    Stops reading the stream as soon as all required_fields of the JSON answer are complete.
+    """
+    start = time.perf_counter()
+    ttft = None
+    message = None
+    num_chunks = 0
+    aborted = False
+    stream = chat.stream(messages)
+    for chunk in stream:
+        text = _chunk_text(chunk)
+        message = chunk if message is None else message + chunk
+        if not text:
+            continue
+        num_chunks += 1
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        if echo:
+            print(text, end="", flush=True)
+        # Only re-parse when the chunk can close a string value or the object
+        if required_fields and any(c in text for c in '",}') \
+                and json_fields_complete(_chunk_text(message), required_fields):
+            aborted = True
+            # Closing the stream ends the call in the callbacks, so it leaves the in-flight count now
+            stream.close()
+            break
+    if echo:
+        print()
+
+    content = _chunk_text(message) if message is not None else ""
+    # Aborted streams never receive the final usage chunk, so only their chunk count is known
+    input_tokens, output_tokens = _usage(message)
+    record_llm_call(provider_of(chat), stage, time.perf_counter() - start, ttft,
+                    input_tokens, output_tokens, aborted, output_chunks=num_chunks)
+    return AIMessage(content=content, usage_metadata=getattr(message, 'usage_metadata', None))
+
+
+def stream_structured(chat, schema, messages, stage, include_raw=False):
+    """Stream a function-calling response and parse its arguments into schema.
+
+    Mirrors chat.with_structured_output(schema, method="function_calling", include_raw=...).
+    """
+    bound = chat.bind_tools([schema], tool_choice=schema.__name__)
+    start = time.perf_counter()
+    ttft = None
+    message = None
+    num_chunks = 0
+    # Tool calls end the response, so the stream is read to the end to keep the usage chunk
+    for chunk in bound.stream(messages):
+        if _chunk_text(chunk) or chunk.tool_call_chunks:
+            num_chunks += 1
+            if ttft is None:
+                ttft = time.perf_counter() - start
+        message = chunk if message is None else message + chunk
+
+    input_tokens, output_tokens = _usage(message)
+    record_llm_call(provider_of(chat), stage, time.perf_counter() - start, ttft,
+                    input_tokens, output_tokens, output_chunks=num_chunks)
+
+    raw = AIMessage(content=_chunk_text(message), tool_calls=message.tool_calls,
+                    usage_metadata=getattr(message, 'usage_metadata', None))
+    try:
+        parsed, parsing_error = schema(**message.tool_calls[0]['args']), None
+    except Exception as e:
+        if not include_raw:
+            raise
+        parsed, parsing_error = None, e
+    if include_raw:
+        return {'raw': raw, 'parsed': parsed, 'parsing_error': parsing_error}
+    return parsed
+
+
+class StreamingStructuredChat:
+    """Streaming counterpart of chat.with_structured_output(schema)."""
+
+    def __init__(self, chat, schema, stage, include_raw=False):
+        self.chat = chat
+        self.schema = schema
+        self.stage = stage
+        self.include_raw = include_raw
+
+    def invoke(self, messages):
+        return stream_structured(self.chat, self.schema, messages, self.stage, self.include_raw)
+
+
+class StreamingChat:
+    """Drop-in wrapper around a chat model that streams every call.
+
+    Generation code only uses invoke and with_structured_output, so wrapping the client
+    switches the whole pipeline to streaming without changing call sites.
+    """
+
+    def __init__(self, chat, stage, required_fields=None, echo=True):
+        self.chat = chat
+        self.stage = stage
+        self.required_fields = required_fields
+        self.echo = echo
+
+    def invoke(self, messages):
+        return stream_text(self.chat, messages, self.stage, self.required_fields, self.echo)
+
+    def with_structured_output(self, schema, method="function_calling", include_raw=False):
+        return StreamingStructuredChat(self.chat, schema, self.stage, include_raw)
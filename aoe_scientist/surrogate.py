@@ -0,0 +1,120 @@
+"""Local surrogate reviewer that predicts LLM review scores from idea embeddings."""
+from sklearn.linear_model import RidgeCV
+from sklearn.model_selection import KFold, cross_val_predict
+from aoe_scientist.embeddings import encode, DEFAULT_MODEL
+from aoe_scientist.idea_reviewer import SCORE_FIELDS
+import numpy as np
+import pandas as pd
+import joblib
+import math
+
+
+def idea_text(title, details):
+    return f"{title}. {details}"
+
+
+def load_training_data(reviews_path="data/reviews.csv", ideas_path="data/ideas.csv", review_llm=None):
+    """Load labelled (title, details) -> scores rows, one row per idea.
+
+    Args:
+        reviews_path: CSV of LLM reviews
+        ideas_path: CSV of ideas, used to recover details missing from older review files
+        review_llm: Only learn the scores of this review LLM (default: average of all review LLMs)
+
+    Returns:
+        pd.DataFrame: Columns ['title', 'details'] + SCORE_FIELDS
+    """
+    reviews = pd.read_csv(reviews_path)
+    if review_llm:
+        reviews = reviews[reviews['review_llm'] == review_llm]
+    if 'details' not in reviews.columns:
+        ideas = pd.read_csv(ideas_path)[['title', 'details']].drop_duplicates('title')
+        reviews = reviews.merge(ideas, on='title', how='inner')
+
+    # Failed reviews are stored with an overall score of 0
+    reviews = reviews.dropna(subset=SCORE_FIELDS + ['details'])
+    reviews = reviews[reviews['overall_score'] > 0]
+    return reviews.groupby(['title', 'details'], as_index=False)[SCORE_FIELDS].mean()
+
+
+def correlation_report(predicted, actual):
+    """Compare predicted and LLM scores per metric (Pearson, Spearman, MAE)."""
+    rows = []
+    for metric in SCORE_FIELDS + ['overall_score']:
+        pred, true = predicted[metric].astype(float), actual[metric].astype(float)
+        rows.append({
+            'metric': metric,
+            'pearson': pred.corr(true),
+            'spearman': pred.corr(true, method='spearman'),
+            'mae': (pred - true).abs().mean(),
+            'n': len(true)
+        })
+    return pd.DataFrame(rows).set_index('metric')
+
+
+class SurrogateReviewer:
+    """Ridge regression from sentence embeddings to the five review scores."""
+
+    def __init__(self, model_name=DEFAULT_MODEL, alphas=(0.1, 1.0, 10.0, 100.0)):
+        self.model_name = model_name
+        self.regressor = RidgeCV(alphas=list(alphas))
+
+    def embed(self, titles, details):
+        return encode([idea_text(t, d) for t, d in zip(titles, details)], self.model_name)
+
+    def fit(self, titles, details, scores):
+        self.regressor.fit(self.embed(titles, details), np.asarray(scores, dtype=float))
+        return self
+
+    def _to_frame(self, predictions):
+        scores = pd.DataFrame(np.clip(predictions, 1, 10), columns=SCORE_FIELDS)
+        scores['overall_score'] = scores[SCORE_FIELDS].mean(axis=1)
+        return scores
+
+    def predict(self, titles, details):
+        """Predict review scores in the same schema as the LLM reviewer."""
+        return self._to_frame(self.regressor.predict(self.embed(titles, details)))
+
+    def cross_validate(self, titles, details, scores, n_splits=5):
+        """Out-of-fold predictions, reported against the LLM scores."""
+        X = self.embed(titles, details)
+        folds = KFold(n_splits=min(n_splits, len(X)), shuffle=True, random_state=0)
+        predicted = self._to_frame(cross_val_predict(self.regressor, X, np.asarray(scores, dtype=float), cv=folds))
+        actual = pd.DataFrame(np.asarray(scores, dtype=float), columns=SCORE_FIELDS)
+        actual['overall_score'] = actual[SCORE_FIELDS].mean(axis=1)
+        return correlation_report(predicted, actual)
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def screen_ideas(ideas, surrogate, fraction):
+    """Keep the top fraction of ideas by predicted overall score.
+
+    Predicted scores are attached as surrogate_* columns so they are saved next to the LLM scores.
+    """
+    predictions = surrogate.predict(ideas['title'].astype(str), ideas['details'].astype(str))
+    ideas = ideas.reset_index(drop=True).copy()
+    for column in predictions.columns:
+        ideas[f"surrogate_{column}"] = predictions[column]
+
+    num_keep = max(1, math.ceil(fraction * len(ideas)))
+    screened = ideas.nlargest(num_keep, 'surrogate_overall_score').reset_index(drop=True)
+    print(f"Surrogate screening kept {len(screened)}/{len(ideas)} ideas for LLM review")
+    return screened
+
+
+def surrogate_correlation(reviews_df):
+    """Surrogate-vs-LLM agreement on the ideas that were reviewed by the LLM.
+
+    Screened runs only review the top of the predicted ranking, so expect lower
+    correlations than cross-validation on the full score range.
+    """
+    reviewed = reviews_df[reviews_df['overall_score'] > 0]
+    predicted = reviewed[[f"surrogate_{k}" for k in SCORE_FIELDS + ['overall_score']]]
+    predicted.columns = SCORE_FIELDS + ['overall_score']
+    return correlation_report(predicted, reviewed)
@@ -0,0 +1,187 @@
+"""Pairwise ranking of ideas: an LLM judges which of two ideas is better, TrueSkill turns the
+outcomes into ratings, and each Swiss round pairs ideas whose ratings are uncertain and close.
+
+Ideas are compared in ceil(log2 n) + 1 rounds of n/2 comparisons by default, so a full
+ranking takes O(n log n) LLM calls instead of many absolute reviews per idea.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field
+from aoe_scientist.budget import active_budget
+from aoe_scientist.tracing import span
+from aoe_scientist.progress import tracker
+import numpy as np
+import pandas as pd
+import math
+import os
+
+# TrueSkill defaults: prior N(25, (25/3)^2), performance noise beta, rating drift tau per round
+MU, SIGMA = 25.0, 25.0 / 3
+BETA = SIGMA / 2
+TAU = SIGMA / 100
+
+class ComparisonOutput(BaseModel):
+    """Schema for a pairwise comparison."""
+    better: int = Field(description="Number of the better idea: 1 or 2", ge=1, le=2)
+    justification: str = Field(description="Technical justification for the choice in 2-3 concise sentences")
+
+COMPARISON_SYSTEM_TEMPLATE = """You are a senior AI research reviewer comparing research ideas in the field of {topic}.
+Your research standards are extremely high. Judge the ideas on technical merit, novelty, feasibility, impact and clarity
+taken together, and decide which of the two is the stronger research idea. Ignore the order in which they are presented
+and the length of their descriptions."""
+
+COMPARISON_HUMAN_TEMPLATE = """Which of these two research ideas is better?
+
+Idea 1:
+Title: {title_1}
+Description: {details_1}
+
+Idea 2:
+Title: {title_2}
+Description: {details_2}
+
+Answer with the number of the better idea and a short technical justification."""
+
+def update_ratings(mu, sigma, winner, loser, beta=BETA, tau=TAU):
+    """TrueSkill update of a two-player game without draws, in place."""
+    var_w, var_l = sigma[winner] ** 2 + tau ** 2, sigma[loser] ** 2 + tau ** 2
+    c = math.sqrt(2 * beta ** 2 + var_w + var_l)
+    t = (mu[winner] - mu[loser]) / c
+    # v and w of the truncated Gaussian; the Phi guard keeps extreme upsets finite
+    pdf = math.exp(-t * t / 2) / math.sqrt(2 * math.pi)
+    cdf = max(0.5 * math.erfc(-t / math.sqrt(2)), 1e-12)
+    v = pdf / cdf
+    w = v * (v + t)
+    mu[winner] += var_w / c * v
+    mu[loser] -= var_l / c * v
+    sigma[winner] = math.sqrt(var_w * max(1 - var_w / c ** 2 * w, 1e-6))
+    sigma[loser] = math.sqrt(var_l * max(1 - var_l / c ** 2 * w, 1e-6))
+
+def match_quality(mu, sigma, i, beta=BETA):
+    """TrueSkill draw probability of idea i against every idea: high when the outcome is uncertain."""
+    c2 = 2 * beta ** 2 + sigma[i] ** 2 + sigma ** 2
+    return np.sqrt(2 * beta ** 2 / c2) * np.exp(-(mu[i] - mu) ** 2 / (2 * c2))
+
+def swiss_pairs(mu, sigma, played, rng=None, beta=BETA):
+    """Pair every idea once for the next round.
+
+    The most uncertain unpaired idea picks the unpaired opponent with the highest match
+    quality it has not met yet (a rematch only if it has met all of them). Ties are broken
+    at random, so equally rated ideas are not paired by their order in the file. With an
+    odd number of ideas the last one sits the round out.
+    """
+    rng = rng if rng is not None else np.random.default_rng(0)
+    n = len(mu)
+    unpaired = np.ones(n, dtype=bool)
+    pairs = []
+    for i in map(int, np.lexsort((rng.random(n), -sigma))):
+        if not unpaired[i]:
+            continue
+        unpaired[i] = False
+        quality = np.where(unpaired, match_quality(mu, sigma, i, beta), -np.inf)
+        fresh = np.where([(min(i, j), max(i, j)) not in played for j in range(n)], quality, -np.inf)
+        candidates = fresh if np.isfinite(fresh).any() else quality
+        if not np.isfinite(candidates).any():
+            break
+        best = np.flatnonzero(candidates >= candidates.max() - 1e-12)
+        j = int(rng.choice(best))
+        unpaired[j] = False
+        pairs.append((i, j))
+    return pairs
+
+def create_comparison_chain(chat, topic: str):
+    """Create a function comparing two ideas, returning the index (0 or 1) of the better one."""
+    structured_chat = chat.with_structured_output(ComparisonOutput, method="function_calling")
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", COMPARISON_SYSTEM_TEMPLATE),
+        ("human", COMPARISON_HUMAN_TEMPLATE)
+    ]).partial(topic=topic)
+
+    def compare(idea_1, idea_2) -> int:
+        with span("comparison", title_1=idea_1['title'], title_2=idea_2['title']):
+            messages = prompt.format_messages(title_1=idea_1['title'], details_1=idea_1['details'],
+                                              title_2=idea_2['title'], details_2=idea_2['details'])
+            return structured_chat.invoke(messages).better - 1
+
+    return compare
+
+def rank_ideas(chat, cfg, ideas):
+    """Rank ideas by pairwise comparisons over Swiss rounds.
+
+    Each round's comparisons run concurrently (cfg['concurrency']). The ideas are shown in
+    random order to cancel the judge's position bias. Failed comparisons are skipped, and
+    their pairs can be drawn again in a later round.
+
+    Returns:
+        pd.DataFrame: One row per idea with the reviews.csv identity columns, the judging
+            rating_llm, rating, rating_mu, rating_sigma, rank, comparisons and wins; rating is
+            the conservative estimate mu - 3 sigma that rank is based on
+    """
+    settings = cfg.get('tournament') or {}
+    ideas = ideas.reset_index(drop=True)
+    n = len(ideas)
+    rounds = settings.get('rounds') or math.ceil(math.log2(max(n, 2))) + 1
+    rng = np.random.default_rng(settings.get('seed', 0))
+    compare = create_comparison_chain(chat, cfg['topic'])
+    budget = active_budget()
+
+    mu, sigma = np.full(n, MU), np.full(n, SIGMA)
+    comparisons, wins = np.zeros(n, dtype=int), np.zeros(n, dtype=int)
+    played = set()
+    tracker.expect('rank', cfg.get('review_llm'), rounds * (n // 2))
+
+    def judge(pair):
+        i, j = pair
+        try:
+            return (i, j) if compare(ideas.iloc[i], ideas.iloc[j]) == 0 else (j, i)
+        except Exception as e:
+            print(f"Comparison of '{ideas.iloc[i]['name']}' and '{ideas.iloc[j]['name']}' failed: {str(e)}")
+            return None
+
+    for round_idx in range(rounds):
+        if budget is not None and budget.exhausted():
+            print(f"Budget exhausted, stopping after {round_idx} rounds: {budget.report()}")
+            break
+        pairs = swiss_pairs(mu, sigma, played, rng)
+        if not pairs:
+            break
+        pairs = [pair if swap else pair[::-1] for pair, swap in zip(pairs, rng.random(len(pairs)) < 0.5)]
+        with span("tournament_round", round=round_idx + 1, comparisons=len(pairs)):
+            # Ratings change only between rounds, so the order results arrive in does not matter
+            with ThreadPoolExecutor(cfg.get('concurrency', 4)) as pool:
+                results = list(pool.map(judge, pairs))
+        for pair, result in zip(pairs, results):
+            if result is None:
+                continue
+            played.add((min(pair), max(pair)))
+            winner, loser = result
+            update_ratings(mu, sigma, winner, loser)
+            comparisons[[winner, loser]] += 1
+            wins[winner] += 1
+        failed = results.count(None)
+        tracker.item_done('rank', cfg.get('review_llm'), n=len(pairs) - failed, failed=failed)
+        print(f"Tournament round {round_idx + 1}/{rounds}: {len(pairs) - failed}/{len(pairs)} comparisons, "
+              f"mean sigma {sigma.mean():.2f}")
+
+    ratings_df = ideas[[c for c in ['name', 'title', 'researcher', 'rag', 'generate_llm'] if c in ideas]].copy()
+    ratings_df['rating_llm'] = cfg.get('review_llm')
+    ratings_df['rating'] = mu - 3 * sigma
+    ratings_df['rating_mu'], ratings_df['rating_sigma'] = mu, sigma
+    ratings_df['rank'] = ratings_df['rating'].rank(ascending=False, method='first').astype(int)
+    ratings_df['comparisons'], ratings_df['wins'] = comparisons, wins
+    return ratings_df.sort_values('rank')
+
+def save_ratings(ratings_df, filepath="data/ratings.csv"):
+    """Store ratings in their own file, one row per idea and judging rating_llm.
+
+    Ranking again with the same judge replaces that judge's ratings; other judges' ratings
+    stay. reviews.csv is left alone, so ratings never add raters to the review statistics.
+    """
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    if os.path.exists(filepath):
+        existing_df = pd.read_csv(filepath)
+        rerated = existing_df['title'].isin(ratings_df['title']) \
+            & existing_df['rating_llm'].isin(ratings_df['rating_llm'])
+        ratings_df = pd.concat([existing_df[~rerated], ratings_df], ignore_index=True)
+    ratings_df.to_csv(filepath, index=False)
+    print(f"Ratings saved to: {filepath}")
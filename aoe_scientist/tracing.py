@@ -0,0 +1,108 @@
+"""Lightweight span tracing of pipeline stages, exported as Chrome trace JSON.
+
+Open the saved file in chrome://tracing or https://ui.perfetto.dev: each worker thread is
+a row, spans nest by time, and LLM calls appear as llm:<provider> spans inside the stage
+that made them, separating queueing, LLM and local compute time per idea.
+"""
+from contextlib import contextmanager
+from langchain_core.callbacks import BaseCallbackHandler
+import json
+import os
+import threading
+import time
+
+_lock = threading.Lock()
+_events = []
+_enabled = False
+_origin_ns = time.perf_counter_ns()
+
+
+def start_tracing():
+    """Record spans from now on, discarding any earlier ones."""
+    global _enabled, _origin_ns
+    with _lock:
+        _events.clear()
+        _origin_ns = time.perf_counter_ns()
+        _enabled = True
+
+
+def tracing_enabled():
+    return _enabled
+
+
+def _micros(ns):
+    return (ns - _origin_ns) / 1000
+
+
+def record_span(name, start_ns, end_ns, **attrs):
+    """Record a finished span from perf_counter_ns timestamps."""
+    if not _enabled:
+        return
+    thread = threading.current_thread()
+    with _lock:
+        _events.append({
+            'name': name,
+            'ph': 'X',
+            'ts': _micros(start_ns),
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': os.getpid(),
+            'tid': thread.ident,
+            'thread_name': thread.name,
+            'args': attrs
+        })
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the enclosed block as a span; the yielded dict adds attributes to it."""
+    if not _enabled:
+        yield attrs
+        return
+    start_ns = time.perf_counter_ns()
+    try:
+        yield attrs
+    except Exception as e:
+        attrs['error'] = str(e)
+        raise
+    finally:
+        record_span(name, start_ns, time.perf_counter_ns(), **attrs)
+
+
+class LLMSpanCallback(BaseCallbackHandler):
+    """Record each chat model call of one provider's client as an llm:<provider> span."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.starts = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        if _enabled:
+            self.starts[run_id] = time.perf_counter_ns()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        start_ns = self.starts.pop(run_id, None)
+        if start_ns is not None:
+            record_span(f"llm:{self.provider}", start_ns, time.perf_counter_ns())
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        start_ns = self.starts.pop(run_id, None)
+        if start_ns is not None:
+            record_span(f"llm:{self.provider}", start_ns, time.perf_counter_ns(), error=str(error))
+
+
+def save_trace(filepath):
+    """Write the recorded spans as a Chrome trace file and stop tracing."""
+    global _enabled
+    with _lock:
+        _enabled = False
+        events = list(_events)
+        _events.clear()
+    threads = {(e['pid'], e['tid']): e.pop('thread_name') for e in events}
+    metadata = [
+        {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+        for (pid, tid), name in threads.items()
+    ]
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, 'w') as f:
+        json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, f)
+    print(f"Trace with {len(events)} spans saved to: {filepath}")
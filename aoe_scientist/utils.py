@@ -4,13 +4,16 @@ from omegaconf import OmegaConf
 import json
 import pandas as pd
 from dotenv import load_dotenv
+from aoe_scientist.tracing import span
 
+MODES = ['generate', 'review', 'evolve', 'rank', 'plan']
 
-def setup_config(file_path="config/default.yaml"):
+
+def setup_config(file_path="config/default.yaml", overrides=None):
     """Load and merge configuration from multiple sources.
     
     Priority (highest to lowest):
-    1. Command line arguments
+    1. Command line arguments (or `overrides`, a list of "key=value" strings, for in-process runs)
     2. Environment variables
     3. Config file
     4. Default config
@@ -21,8 +24,9 @@ def setup_config(file_path="config/default.yaml"):
     default_conf = OmegaConf.load(file_path)
     
     # Create CLI config with structured format
+    cli_args = OmegaConf.from_cli() if overrides is None else OmegaConf.from_dotlist(overrides)
     cli_conf = OmegaConf.from_dotlist([
-        f"{k}={v}" for k, v in OmegaConf.from_cli().items()
+        f"{k}={v}" for k, v in cli_args.items()
     ])
     
     # Merge configs with CLI taking precedence
@@ -30,8 +34,8 @@ def setup_config(file_path="config/default.yaml"):
     if config.rag == False:
         config.researcher = None
 
-    if 'mode' not in config or config.mode not in ['generate', 'review']:
-        raise ValueError(f"Invalid mode: {getattr(config, 'mode', None)}. Must be 'generate' or 'review'")
+    if 'mode' not in config or config.mode not in MODES:
+        raise ValueError(f"Invalid mode: {getattr(config, 'mode', None)}. Must be one of: {', '.join(MODES)}")
     
     if config.mode == 'review' and not hasattr(config, 'idea_path'):
         config.idea_path = "data/ideas.json"  # Set default path
@@ -60,11 +64,12 @@ def save_json(data, filepath):
     print(f"Results appended to: {filepath}")
 
 def save_df(data_df, filepath):
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    
-    if os.path.exists(filepath):
-        existing_df = pd.read_csv(filepath)
-        data_df = pd.concat([existing_df, data_df], ignore_index=True)
-    
-    data_df.to_csv(filepath, mode='w', index=False)
+    with span("save_df", filepath=filepath, rows=len(data_df)):
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        
+        if os.path.exists(filepath):
+            existing_df = pd.read_csv(filepath)
+            data_df = pd.concat([existing_df, data_df], ignore_index=True)
+        
+        data_df.to_csv(filepath, mode='w', index=False)
     print(f"DataFrame updated and saved to: {filepath}")
\ No newline at end of file
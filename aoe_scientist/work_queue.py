@@ -0,0 +1,219 @@
+"""SQLite work queue for running generation/review sweeps across worker processes and machines.
+
+A coordinator enqueues tasks, any number of workers claim them, and each worker appends
+its results to its own partition file. Task IDs are derived from the task content, so
+enqueueing a sweep twice adds nothing and merging partitions drops rows written twice
+(a worker that dies after saving but before marking its task done).
+"""
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import pandas as pd
+from aoe_scientist.utils import setup_config, save_df
+
+TASK_KINDS = ['generate', 'review']
+RESULT_FILES = {'generate': 'data/ideas.csv', 'review': 'data/reviews.csv'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    error TEXT
+)"""
+
+
+def make_task_id(kind, payload):
+    """Content hash of a task, identical for identical work."""
+    return hashlib.sha1(json.dumps([kind, payload], sort_keys=True).encode()).hexdigest()[:16]
+
+
+class WorkQueue:
+    """Task table in a SQLite file shared by the coordinator and all workers.
+
+    Claims run in an immediate transaction, so each task goes to exactly one worker.
+    A claimed task that is not finished within lease_s (its worker died) is handed out
+    again; a task that fails max_attempts times is marked failed. For workers on several
+    machines, put the file on a shared volume with working file locks.
+    """
+
+    def __init__(self, path, lease_s=900.0, max_attempts=3):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+
+    def enqueue(self, kind, payload):
+        """Add a task unless an identical one exists; returns its task ID."""
+        if kind not in TASK_KINDS:
+            raise ValueError(f"Invalid task kind: {kind}. Must be one of: {', '.join(TASK_KINDS)}")
+        task_id = make_task_id(kind, payload)
+        self.conn.execute(
+            "INSERT OR IGNORE INTO tasks (task_id, kind, payload) VALUES (?, ?, ?)",
+            (task_id, kind, json.dumps(payload))
+        )
+        return task_id
+
+    def claim(self, worker):
+        """Lease the next pending (or abandoned) task to worker, or return None if there is none.
+
+        Abandoned tasks that are out of attempts are marked failed in the same transaction.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'failed', error = 'Lease expired on the last attempt' "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            row = self.conn.execute(
+                "SELECT task_id, kind, payload FROM tasks WHERE status = 'pending' "
+                "OR (status = 'running' AND lease_until < ? AND attempts < ?) ORDER BY rowid LIMIT 1",
+                (now, self.max_attempts)
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'running', worker = ?, attempts = attempts + 1, lease_until = ? "
+                    "WHERE task_id = ?",
+                    (worker, now + self.lease_s, row[0])
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return {'task_id': row[0], 'kind': row[1], 'payload': json.loads(row[2])}
+
+    def complete(self, task_id):
+        self.conn.execute("UPDATE tasks SET status = 'done', error = NULL WHERE task_id = ?", (task_id,))
+
+    def fail(self, task_id, error):
+        """Return the task to the queue, or mark it failed once it is out of attempts."""
+        self.conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ? "
+            "WHERE task_id = ?",
+            (self.max_attempts, error, task_id)
+        )
+
+    def counts(self):
+        """Number of tasks per status."""
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.close()
+
+
+def enqueue_generation(queue, overrides_list, num_ideas=1):
+    """Enqueue num_ideas generation tasks for each list of config overrides."""
+    return [
+        queue.enqueue('generate', {'overrides': list(overrides), 'index': i})
+        for overrides in overrides_list
+        for i in range(num_ideas)
+    ]
+
+
+def enqueue_reviews(queue, ideas, review_llms):
+    """Enqueue one review task per idea and review LLM."""
+    records = json.loads(ideas.drop(columns=['task_id'], errors='ignore').to_json(orient='records'))
+    return [
+        queue.enqueue('review', {'overrides': [f"review_llm={llm}"], 'idea': idea})
+        for llm in review_llms
+        for idea in records
+    ]
+
+
+def run_task(task, base_overrides=None):
+    """Run one task in this process and return its result rows."""
+    from aoe_scientist.llm import create_stage_client
+    payload = task['payload']
+    cfg = setup_config(overrides=[f"mode={task['kind']}", *(base_overrides or []), *payload['overrides']])
+    if task['kind'] == 'generate':
+        from aoe_scientist.idea_generator import generate_research_idea, IDEA_FIELDS
+        chat = create_stage_client(cfg, cfg['generate_llm'], 'generate', 0.75, IDEA_FIELDS)
+        return generate_research_idea(chat, cfg)
+    from aoe_scientist.idea_reviewer import review_ideas
+    chat = create_stage_client(cfg, cfg['review_llm'], 'review', 0.25)
+    return review_ideas(chat, cfg, pd.DataFrame([payload['idea']]))
+
+
+def has_scores(reviews_df):
+    """Rows holding an actual review rather than the placeholder of a failed one."""
+    from aoe_scientist.idea_reviewer import SCORE_FIELDS
+    return reviews_df.reindex(columns=SCORE_FIELDS).notna().any(axis=1)
+
+
+def partition_path(output_dir, kind, worker):
+    return os.path.join(output_dir, f"{kind}-{worker}.csv")
+
+
+def run_worker(queue_path, worker, output_dir='data/partitions', base_overrides=None, idle_timeout_s=0.0):
+    """Claim and run tasks until the queue has had no work for idle_timeout_s seconds.
+
+    Results are appended to this worker's partition with their task_id, and the task is
+    marked done only after its rows are saved. A review task whose rows are all failed-review
+    placeholders (no scores) counts as failed, so it is retried instead of saved.
+    """
+    from aoe_scientist.metrics import save_run_metrics
+    queue = WorkQueue(queue_path)
+    idle_since = time.monotonic()
+    num_done = 0
+    try:
+        while True:
+            task = queue.claim(worker)
+            if task is None:
+                if time.monotonic() - idle_since >= idle_timeout_s:
+                    break
+                time.sleep(1.0)
+                continue
+            print(f"[{worker}] Running {task['kind']} task {task['task_id']}")
+            try:
+                result_df = run_task(task, base_overrides)
+                if result_df.empty:
+                    raise ValueError("Task produced no results")
+                if task['kind'] == 'review' and not has_scores(result_df).any():
+                    raise ValueError(result_df['justification'].iloc[0])
+                save_df(result_df.assign(task_id=task['task_id']), partition_path(output_dir, task['kind'], worker))
+                queue.complete(task['task_id'])
+                num_done += 1
+            except Exception as e:
+                print(f"[{worker}] Task {task['task_id']} failed: {str(e)}")
+                queue.fail(task['task_id'], str(e))
+            idle_since = time.monotonic()
+    finally:
+        queue.close()
+        save_run_metrics(os.path.join(output_dir, f"run_metrics-{worker}.csv"))
+    print(f"[{worker}] Finished {num_done} tasks")
+    return num_done
+
+
+def merge_partitions(output_dir, kind, filepath=None):
+    """Append all workers' results for kind to the main results file, once per task_id.
+
+    Returns the newly merged rows; merging again after more tasks finish only adds the new ones.
+    """
+    filepath = filepath or RESULT_FILES[kind]
+    partitions = sorted(glob.glob(partition_path(output_dir, kind, '*')))
+    if not partitions:
+        return pd.DataFrame()
+    merged_df = pd.concat([pd.read_csv(p) for p in partitions], ignore_index=True)
+    merged_df = merged_df.drop_duplicates(subset='task_id', keep='first')
+    if os.path.exists(filepath):
+        existing_df = pd.read_csv(filepath)
+        if 'task_id' in existing_df.columns:
+            merged_df = merged_df[~merged_df['task_id'].isin(existing_df['task_id'])]
+    if not merged_df.empty:
+        save_df(merged_df, filepath)
+    return merged_df
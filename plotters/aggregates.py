@@ -0,0 +1,73 @@
+"""Review statistics shared by all figures, computed in one pass and cached by content hash."""
+import hashlib
+import os
+import pandas as pd
+from aoe_scientist.analysis import bootstrap_ci, krippendorff_alpha, icc, rater_bias
+
+METRICS = ['technical_merit', 'novelty', 'feasibility', 'impact', 'clarity', 'overall_score']
+LLM_ORDER = ['openai', 'anthropic', 'deepseek']
+EXCLUDED_RESEARCHERS = ['Mehta']
+# Part of the cache key: bump whenever compute_aggregates changes what it returns
+AGGREGATES_VERSION = 2
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def researcher_ci(df, confidence=0.95):
+    """Per-researcher mean, bootstrap confidence interval and range of each metric."""
+    ci = bootstrap_ci(df, ['researcher'], METRICS, confidence=confidence)
+    table = ci.pivot(index='researcher', columns='metric', values=['mean', 'ci_low', 'ci_high'])
+    grouped = df.groupby('researcher', sort=False)[METRICS]
+    table = pd.concat([table, pd.concat({'min': grouped.min(), 'max': grouped.max()}, axis=1)], axis=1)
+    # Keep researchers in order of appearance, as the bars were drawn before
+    return table.reindex(ci['researcher'].unique())
+
+
+def compute_aggregates(df):
+    """All tables the figures are drawn from.
+
+    Returns:
+        dict: name -> DataFrame
+            llm_means / llm_variance: per (generate_llm, review_llm) metric mean / variance
+            researcher_means: per (researcher, review_llm) metric mean
+            researcher_ci: deepseek ideas reviewed by anthropic, per researcher mean and CI
+            review_llm_correlation: correlation between review LLMs averaged over metrics
+            reliability: Krippendorff's alpha and ICC across review LLMs per metric
+            rater_bias: per review LLM and metric, mean deviation from the other reviewers
+    """
+    df = df[~df['researcher'].isin(EXCLUDED_RESEARCHERS)]
+    by_llms = df.groupby(['generate_llm', 'review_llm'])[METRICS]
+
+    # Scores of every idea by each review LLM, for all metrics at once
+    by_idea = df.pivot_table(values=METRICS, index=['researcher', 'generate_llm'], columns='review_llm',
+                             aggfunc='first')
+    correlation = sum(by_idea[metric].corr() for metric in METRICS) / len(METRICS)
+
+    pair = df[(df['generate_llm'] == 'deepseek') & (df['review_llm'] == 'anthropic')]
+    pair = pair.assign(researcher=pair['researcher'].fillna('No Researcher'))
+
+    return {
+        'llm_means': by_llms.mean(),
+        'llm_variance': by_llms.var(),
+        'researcher_means': df.groupby(['researcher', 'review_llm'])[METRICS].mean(),
+        'researcher_ci': researcher_ci(pair),
+        'review_llm_correlation': correlation,
+        'reliability': krippendorff_alpha(df).merge(icc(df).rename(columns={'units': 'complete_units'}), on='metric'),
+        'rater_bias': rater_bias(df)
+    }
+
+
+def load_aggregates(reviews_path='data/reviews.csv', cache_path='data/plot_cache/aggregates.pkl'):
+    """Aggregates of reviews_path, recomputed when the file's content hash or AGGREGATES_VERSION changes."""
+    content_hash = file_hash(reviews_path)
+    if os.path.exists(cache_path):
+        cached = pd.read_pickle(cache_path)
+        if cached['hash'] == content_hash and cached.get('version') == AGGREGATES_VERSION:
+            return cached['aggregates']
+    aggregates = compute_aggregates(pd.read_csv(reviews_path))
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    pd.to_pickle({'hash': content_hash, 'version': AGGREGATES_VERSION, 'aggregates': aggregates}, cache_path)
+    return aggregates
@@ -1,27 +1,11 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
+from aggregates import METRICS, load_aggregates
 
-# Set the style and context for better visualization
-sns.set_theme(style="whitegrid", context="paper")
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-
-# Read the data
-df = pd.read_csv('data/reviews.csv')
-
-# Filter for deepseek generate and review LLM
-mask = (df['generate_llm'] == 'deepseek') & (df['review_llm'] == 'anthropic') & (df['researcher'] != 'Mehta')
-df_filtered = df.loc[mask].copy()  # Create a copy to avoid SettingWithCopyWarning
-
-# Fill empty researcher values with "Unspecified"
-df_filtered['researcher'] = df_filtered['researcher'].fillna('No Researcher')
-
-# Create subplots
-metrics = ['technical_merit', 'novelty', 'feasibility', 'impact', 'clarity', 'overall_score']
-fig, axes = plt.subplots(2, 3, figsize=(20, 12))
+AGGREGATES = ['researcher_ci']
+OUTPUT = 'plotters/imgs/review_scores.png'
 
 # Define colors for each metric
 colors = {
@@ -33,58 +17,70 @@ colors = {
     'overall_score': '#1abc9c'       # turquoise
 }
 
-# Flatten axes for easier iteration
-axes_flat = axes.flatten()
-
-# Plot each metric in a subplot
-for idx, (ax, metric) in enumerate(zip(axes_flat, metrics)):
-    # Get min and max values for this metric
-    min_val = df_filtered[metric].min()
-    max_val = df_filtered[metric].max()
-    
-    sns.barplot(
-        data=df_filtered,
-        x='researcher',
-        y=metric,
-        ax=ax,
-        color=colors[metric],
-        saturation=0.75,
-        errorbar='ci',
-        width=0.7,
-        alpha=0.85
-    )
-    
-    # Customize each subplot
-    ax.set_title(metric.replace('_', ' ').title(), pad=10, fontsize=20, color=colors[metric], fontweight='bold')
-    ax.set_xlabel('')
-    ax.set_ylabel('Score', fontsize=30)
-    
-    # Rotate x-axis labels properly and make them bold and larger
-    plt.setp(ax.get_xticklabels(), rotation=30, ha='right', fontsize=20, fontweight='bold')
-    plt.setp(ax.get_yticklabels(), fontsize=20, fontweight='bold')
-    
-    # Set y-axis range dynamically
-    y_min = np.floor(min_val - 1)
-    y_max = np.ceil(max_val + 1)
-    ax.set_ylim(y_min, y_max)
-    
-    # Set integer ticks only
-    ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
-    
-    # Add light grid only on y-axis
-    ax.grid(True, axis='y', alpha=0.2)
-    
-    # Remove spines
-    sns.despine(ax=ax, left=True, bottom=True)
-
-# Adjust layout
-plt.tight_layout()
-
-# Save the plot in high quality
-plt.savefig('plotters/imgs/review_scores.png', 
-            dpi=300, 
-            bbox_inches='tight',
-            facecolor='white',
-            edgecolor='none')
-
-plt.show()
+def render(aggregates, output_path=OUTPUT):
+    """Mean score per researcher with 95% CI, for deepseek ideas reviewed by anthropic."""
+    # Set the style and context for better visualization
+    sns.set_theme(style="whitegrid", context="paper")
+    plt.rcParams['figure.dpi'] = 300
+    plt.rcParams['savefig.dpi'] = 300
+
+    stats = aggregates['researcher_ci']
+    researchers = list(stats.index)
+
+    # Create subplots
+    fig, axes = plt.subplots(2, 3, figsize=(20, 12))
+
+    # Plot each metric in a subplot
+    for ax, metric in zip(axes.flatten(), METRICS):
+        mean = stats[('mean', metric)]
+        yerr = [mean - stats[('ci_low', metric)], stats[('ci_high', metric)] - mean]
+
+        ax.bar(
+            range(len(researchers)),
+            mean,
+            yerr=yerr,
+            color=colors[metric],
+            width=0.7,
+            alpha=0.85,
+            error_kw={'ecolor': '#424242', 'elinewidth': 2}
+        )
+        ax.set_xticks(range(len(researchers)))
+        ax.set_xticklabels(researchers)
+
+        # Customize each subplot
+        ax.set_title(metric.replace('_', ' ').title(), pad=10, fontsize=20, color=colors[metric], fontweight='bold')
+        ax.set_xlabel('')
+        ax.set_ylabel('Score', fontsize=30)
+
+        # Rotate x-axis labels properly and make them bold and larger
+        plt.setp(ax.get_xticklabels(), rotation=30, ha='right', fontsize=20, fontweight='bold')
+        plt.setp(ax.get_yticklabels(), fontsize=20, fontweight='bold')
+
+        # Set y-axis range dynamically
+        y_min = np.floor(stats[('min', metric)].min() - 1)
+        y_max = np.ceil(stats[('max', metric)].max() + 1)
+        ax.set_ylim(y_min, y_max)
+
+        # Set integer ticks only
+        ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
+
+        # Add light grid only on y-axis
+        ax.grid(True, axis='y', alpha=0.2)
+
+        # Remove spines
+        sns.despine(ax=ax, left=True, bottom=True)
+
+    # Adjust layout
+    plt.tight_layout()
+
+    # Save the plot in high quality
+    plt.savefig(output_path,
+                dpi=300,
+                bbox_inches='tight',
+                facecolor='white',
+                edgecolor='none')
+    return fig
+
+if __name__ == "__main__":
+    render(load_aggregates())
+    plt.show()
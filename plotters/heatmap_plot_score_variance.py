@@ -1,79 +1,70 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import numpy as np
+from aggregates import LLM_ORDER, load_aggregates
 
-# Set the style and context for better visualization
-sns.set_theme(style="whitegrid", context="paper")
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
+AGGREGATES = ['llm_variance']
+OUTPUT = 'plotters/imgs/overall_score_variance_heatmap.png'
 
-# Read the data
-df = pd.read_csv('data/reviews.csv')
+def render(aggregates, output_path=OUTPUT):
+    """Variance of the overall score for each generate/review LLM combination."""
+    # Set the style and context for better visualization
+    sns.set_theme(style="whitegrid", context="paper")
+    plt.rcParams['figure.dpi'] = 300
+    plt.rcParams['savefig.dpi'] = 300
 
-# Filter out Mehta researcher
-df_filtered = df[df['researcher'] != 'Mehta'].copy()
+    # Create figure
+    fig = plt.figure(figsize=(10, 8))
 
-# Define LLM order
-llm_order = ['openai', 'anthropic', 'deepseek']
+    # Variance of the overall score, reordered by LLM
+    pivot_data = aggregates['llm_variance']['overall_score'].unstack('review_llm')
+    pivot_data = pivot_data.reindex(index=LLM_ORDER, columns=LLM_ORDER)
 
-# Create figure
-plt.figure(figsize=(10, 8))
+    # Create custom colormap from white to a neutral color (using a teal color)
+    cmap = sns.light_palette("#2980b9", as_cmap=True)
 
-# Calculate variance for overall score
-pivot_data = df_filtered.pivot_table(
-    values='overall_score',
-    index='generate_llm',
-    columns='review_llm',
-    aggfunc='var'
-)
+    # Plot heatmap
+    hm = sns.heatmap(
+        pivot_data,
+        cmap=cmap,
+        annot=True,
+        fmt='.2f',
+        annot_kws={'size': 14, 'weight': 'bold'},
+        cbar_kws={
+            'label': 'Variance',
+            'shrink': 0.5,
+            'aspect': 5
+        },
+        square=True
+    )
 
-# Reorder the index and columns
-pivot_data = pivot_data.reindex(index=llm_order, columns=llm_order)
+    # Make LLM names title case and larger
+    llm_names = [name.title() for name in LLM_ORDER]
+    plt.xticks(rotation=45, ha='right')
+    plt.yticks(rotation=0)
+    ax = plt.gca()
+    ax.set_xticklabels(llm_names, fontsize=20, fontweight='bold')
+    ax.set_yticklabels(llm_names, fontsize=20, fontweight='bold')
 
-# Create custom colormap from white to a neutral color (using a teal color)
-cmap = sns.light_palette("#2980b9", as_cmap=True)
+    # Get the colorbar and modify its label properties
+    cbar = ax.collections[0].colorbar
+    cbar.ax.set_ylabel('Variance', fontsize=30, fontweight='bold')
 
-# Plot heatmap
-hm = sns.heatmap(
-    pivot_data,
-    cmap=cmap,
-    annot=True,
-    fmt='.2f',
-    annot_kws={'size': 14, 'weight': 'bold'},
-    cbar_kws={
-        'label': 'Variance',
-        'shrink': 0.5,
-        'aspect': 5
-    },
-    square=True
-)
+    # Customize plot
+    plt.title('Overall Score Variance\nby LLM Combinations',
+              fontsize=24,
+              fontweight='bold',
+              pad=20)
+    plt.xlabel('Review LLM', fontsize=30, fontweight='bold')
+    plt.ylabel('Generate LLM', fontsize=30, fontweight='bold')
 
-# Make LLM names title case and larger
-llm_names = [name.title() for name in llm_order]
-plt.xticks(rotation=45, ha='right')
-plt.yticks(rotation=0)
-ax = plt.gca()
-ax.set_xticklabels(llm_names, fontsize=20, fontweight='bold')
-ax.set_yticklabels(llm_names, fontsize=20, fontweight='bold')
+    # Save the plot
+    plt.savefig(output_path,
+                dpi=300,
+                bbox_inches='tight',
+                facecolor='white',
+                edgecolor='none')
+    return fig
 
-# Get the colorbar and modify its label properties
-cbar = ax.collections[0].colorbar
-cbar.ax.set_ylabel('Variance', fontsize=30, fontweight='bold')
-
-# Customize plot
-plt.title('Overall Score Variance\nby LLM Combinations', 
-          fontsize=24, 
-          fontweight='bold', 
-          pad=20)
-plt.xlabel('Review LLM', fontsize=30, fontweight='bold')
-plt.ylabel('Generate LLM', fontsize=30, fontweight='bold')
-
-# Save the plot
-plt.savefig('plotters/imgs/overall_score_variance_heatmap.png', 
-            dpi=300, 
-            bbox_inches='tight',
-            facecolor='white',
-            edgecolor='none')
-
-plt.show() 
\ No newline at end of file
+if __name__ == "__main__":
+    render(load_aggregates())
+    plt.show()
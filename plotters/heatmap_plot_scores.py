@@ -1,18 +1,9 @@
-import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-import numpy as np
+from aggregates import LLM_ORDER, load_aggregates
 
-# Set the style and context for better visualization
-sns.set_theme(style="whitegrid", context="paper")
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-
-# Read the data
-df = pd.read_csv('data/reviews.csv')
-
-# Filter out Mehta researcher
-df_filtered = df[df['researcher'] != 'Mehta'].copy()
+AGGREGATES = ['llm_means']
+OUTPUT = 'plotters/imgs/review_heatmaps.png'
 
 # Define metrics and their colors (same as plot.py)
 metrics = {
@@ -24,62 +15,62 @@ metrics = {
     'overall_score': '#1abc9c'       # turquoise
 }
 
-# Define LLM order
-llm_order = ['openai', 'anthropic', 'deepseek']
+def render(aggregates, output_path=OUTPUT):
+    """Mean of each metric for every generate/review LLM combination."""
+    # Set the style and context for better visualization
+    sns.set_theme(style="whitegrid", context="paper")
+    plt.rcParams['figure.dpi'] = 300
+    plt.rcParams['savefig.dpi'] = 300
+
+    # Create subplots with more vertical space
+    fig, axes = plt.subplots(2, 3, figsize=(20, 14))  # Made figure slightly taller
+    plt.subplots_adjust(hspace=0.1)  # Increase vertical spacing between subplots
+
+    fig.suptitle('Review Metrics Heatmap by LLM Combinations\n(Averaged Across All Researchers)',
+                 fontsize=24, fontweight='bold', y=0.95)  # Adjusted title position
+
+    # Flatten axes for easier iteration
+    axes_flat = axes.flatten()
 
-# Create subplots with more vertical space
-fig, axes = plt.subplots(2, 3, figsize=(20, 14))  # Made figure slightly taller
-plt.subplots_adjust(hspace=0.1)  # Increase vertical spacing between subplots
+    # Plot heatmap for each metric
+    for idx, (metric, color) in enumerate(metrics.items()):
+        # Mean scores for each LLM combination, reordered by LLM
+        pivot_data = aggregates['llm_means'][metric].unstack('review_llm')
+        pivot_data = pivot_data.reindex(index=LLM_ORDER, columns=LLM_ORDER)
 
-fig.suptitle('Review Metrics Heatmap by LLM Combinations\n(Averaged Across All Researchers)', 
-             fontsize=24, fontweight='bold', y=0.95)  # Adjusted title position
+        # Create custom colormap from white to the metric color
+        cmap = sns.light_palette(color, as_cmap=True)
 
-# Flatten axes for easier iteration
-axes_flat = axes.flatten()
+        # Plot heatmap
+        hm = sns.heatmap(
+            pivot_data,
+            ax=axes_flat[idx],
+            cmap=cmap,
+            annot=True,
+            fmt='.1f',
+            annot_kws={'size': 12, 'weight': 'bold'},
+            cbar_kws={'label': '', 'ticks': []},  # Remove label and ticks
+            square=True,
+            center=None  # Remove center to use local min/max
+        )
 
-# Plot heatmap for each metric
-for idx, (metric, color) in enumerate(metrics.items()):
-    # Calculate mean scores for each LLM combination
-    pivot_data = df_filtered.pivot_table(
-        values=metric,
-        index='generate_llm',
-        columns='review_llm',
-        aggfunc='mean'
-    )
-    
-    # Reorder the index and columns
-    pivot_data = pivot_data.reindex(index=llm_order, columns=llm_order)
-    
-    # Create custom colormap from white to the metric color
-    cmap = sns.light_palette(color, as_cmap=True)
-    
-    # Plot heatmap
-    hm = sns.heatmap(
-        pivot_data,
-        ax=axes_flat[idx],
-        cmap=cmap,
-        annot=True,
-        fmt='.1f',
-        annot_kws={'size': 12, 'weight': 'bold'},
-        cbar_kws={'label': '', 'ticks': []},  # Remove label and ticks
-        square=True,
-        center=None  # Remove center to use local min/max
-    )
-    
-    # Customize each subplot
-    axes_flat[idx].set_title(metric.replace('_', ' ').title(), 
-                            pad=10, 
-                            fontsize=20, 
-                            fontweight='bold',
-                            color=metrics[metric])
-    axes_flat[idx].set_xlabel('Review LLM', fontsize=30, fontweight='bold')
-    axes_flat[idx].set_ylabel('Generate LLM', fontsize=30, fontweight='bold')
+        # Customize each subplot
+        axes_flat[idx].set_title(metric.replace('_', ' ').title(),
+                                pad=10,
+                                fontsize=20,
+                                fontweight='bold',
+                                color=metrics[metric])
+        axes_flat[idx].set_xlabel('Review LLM', fontsize=30, fontweight='bold')
+        axes_flat[idx].set_ylabel('Generate LLM', fontsize=30, fontweight='bold')
 
-# Save the plot
-plt.savefig('plotters/imgs/review_heatmaps.png', 
-            dpi=300, 
-            bbox_inches='tight',
-            facecolor='white',
-            edgecolor='none')
+    # Save the plot
+    plt.savefig(output_path,
+                dpi=300,
+                bbox_inches='tight',
+                facecolor='white',
+                edgecolor='none')
+    return fig
 
-plt.show() 
\ No newline at end of file
+if __name__ == "__main__":
+    render(load_aggregates())
+    plt.show()
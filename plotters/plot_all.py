@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Render every figure from one cached set of review aggregates.
+
+Aggregates are recomputed only when data/reviews.csv changes, and a figure is re-rendered
+only when the aggregates it draws from (or its plotting code) changed since it was last
+rendered. Figures that need rendering are drawn in parallel processes.
+
+Usage: python plotters/plot_all.py [--force] [--workers N]
+"""
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from aggregates import load_aggregates
+
+FIGURE_MODULES = ['bar_plot', 'correlation_heatmap', 'heatmap_plot_score_variance', 'heatmap_plot_scores',
+                  'researcher_scores']
+
+
+def figure_hash(module, aggregates):
+    """Hash of the figure's plotting code and the aggregate tables it draws from."""
+    h = hashlib.sha256(inspect.getsource(module).encode())
+    for name in module.AGGREGATES:
+        h.update(aggregates[name].to_csv().encode())
+    return h.hexdigest()
+
+
+def render_figure(module_name, aggregates, output_path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    module = importlib.import_module(module_name)
+    module.render({name: aggregates[name] for name in module.AGGREGATES}, output_path)
+    plt.close('all')
+    return output_path
+
+
+def plot_all(reviews_path='data/reviews.csv', cache_dir='data/plot_cache', output_dir='plotters/imgs',
+             force=False, workers=None):
+    """Render the figures whose inputs changed; returns the paths that were rendered."""
+    aggregates = load_aggregates(reviews_path, os.path.join(cache_dir, 'aggregates.pkl'))
+    manifest_path = os.path.join(cache_dir, 'figures.json')
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    stale = {}
+    for module_name in FIGURE_MODULES:
+        module = importlib.import_module(module_name)
+        output_path = os.path.join(output_dir, os.path.basename(module.OUTPUT))
+        digest = figure_hash(module, aggregates)
+        if force or manifest.get(output_path) != digest or not os.path.exists(output_path):
+            stale[output_path] = (module_name, digest)
+
+    if 'reliability' in aggregates:
+        print("Inter-rater reliability of review LLMs:")
+        print(aggregates['reliability'].round(3).to_string(index=False))
+
+    if not stale:
+        print("All figures are up to date")
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_figure, module_name, aggregates, output_path): output_path
+            for output_path, (module_name, _) in stale.items()
+        }
+        for future, output_path in futures.items():
+            future.result()
+            manifest[output_path] = stale[output_path][1]
+            print(f"Rendered {output_path}")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return list(stale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the figures whose data changed")
+    parser.add_argument("--reviews", default="data/reviews.csv")
+    parser.add_argument("--force", action="store_true", help="Re-render every figure")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel rendering processes")
+    args = parser.parse_args()
+    plot_all(args.reviews, force=args.force, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,8 @@
-import pandas as pd
-import seaborn as sns
 import matplotlib.pyplot as plt
-import numpy as np
-
-# Set style for publication-quality plot
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams.update({
-    'font.family': 'DejaVu Sans',
-    'figure.dpi': 300,
-    'savefig.dpi': 300,
-    'axes.labelsize': 12,
-    'axes.titlesize': 12,
-    'xtick.labelsize': 10,
-    'ytick.labelsize': 10
-})
-
-# Read the data
-df = pd.read_csv('data/reviews.csv')
-
-# Filter out Mehta researcher
-df = df[df['researcher'] != 'Mehta']
+from aggregates import load_aggregates
+
+AGGREGATES = ['researcher_means']
+OUTPUT = 'plotters/imgs/researcher_scores.png'
 
 # Define metrics with better labels
 metrics = {
@@ -31,23 +14,6 @@ metrics = {
     'overall_score': 'Overall Score'
 }
 
-# Create a long-form dataframe for plotting
-plot_data = df.melt(
-    id_vars=['researcher', 'generate_llm', 'review_llm'],
-    value_vars=list(metrics.keys()),
-    var_name='metric',
-    value_name='score'
-)
-
-# Calculate mean scores per researcher, LLM, and metric
-plot_data = plot_data.groupby(['researcher', 'review_llm', 'metric'])['score'].mean().reset_index()
-
-# Map metric codes to display names
-plot_data['metric'] = plot_data['metric'].map(metrics)
-
-# Create figure with extra space for legend
-fig = plt.figure(figsize=(20, 12))
-
 # Define markers and colors for each LLM
 style_dict = {
     'openai': {'marker': 'o', 'color': '#2ecc71', 'label': 'OpenAI'},  # Bright green
@@ -55,100 +21,121 @@ style_dict = {
     'deepseek': {'marker': 'D', 'color': '#3498db', 'label': 'DeepSeek'}  # Blue
 }
 
-# Get unique researchers and metrics
-researchers = sorted(plot_data['researcher'].unique())
-unique_metrics = list(metrics.values())
-
-# Create subplot grid
-ncols = 3
-nrows = (len(unique_metrics) + ncols - 1) // ncols
-
-# Create a list to store axes for sharing
-axes = []
-
-# Plot each metric in its own subplot
-for i, metric in enumerate(unique_metrics):
-    row = i // ncols
-    col = i % ncols
-    
-    # For first row, create subplot normally
-    if row == 0:
-        ax = plt.subplot(nrows, ncols, i + 1)
-        # Store first row axes for sharing
-        axes.append(ax)
-    else:
-        # Share x axis with corresponding subplot from first row
-        ax = plt.subplot(nrows, ncols, i + 1, sharex=axes[col])
-    
-    for llm, style in style_dict.items():
-        # Filter data for current metric and LLM
-        metric_data = plot_data[
-            (plot_data['metric'] == metric) & 
-            (plot_data['review_llm'] == llm)
-        ]
-        
-        # Plot points
-        ax.scatter(
-            x=metric_data['researcher'].map(lambda x: researchers.index(x)),
-            y=metric_data['score'],
-            marker=style['marker'],
-            c=style['color'],
-            s=150,
-            alpha=0.8,
-            label=style['label']
-        )
-    
-    # Customize x-axis
-    ax.set_xticks(range(len(researchers)))
-    
-    # Only show x labels for bottom row
-    if row == nrows - 1:
-        ax.set_xticklabels(researchers, rotation=45, ha='right', fontsize=20, fontweight='bold')
-    else:
-        ax.set_xticklabels([])
-        ax.set_xlabel('')
-        ax.tick_params(axis='x', which='both', bottom=False, top=False, labelbottom=False)  # Hide x-axis tick marks and labels
-    
-    # Add grid
-    ax.grid(True, linestyle='--', alpha=0.7)
-    
-    # Set title and labels
-    ax.set_title(metric, pad=20, fontsize=20, fontweight='bold')
-    if col == 0:  # Only add y-label for leftmost plots
-        ax.set_ylabel('Score', fontsize=25)
-    
-    # Make y-axis ticks larger and bold
-    ax.tick_params(axis='y', labelsize=20)
-    plt.setp(ax.get_yticklabels(), fontweight='bold')
-    
-    # Let y-axis adjust automatically to data range
-    ax.margins(y=0.1)
-
-# Add a single legend to the right of all subplots
-handles = [plt.Line2D([0], [0], marker=style['marker'], color=style['color'],
-                     label=style['label'], markersize=10, linestyle='None')
-          for llm, style in style_dict.items()]
-
-# Place legend to the right of the subplots
-legend = fig.legend(handles=handles, 
-                   title='Review LLM',
-                   bbox_to_anchor=(0.98, 0.5),
-                   loc='center left',
-                   title_fontsize=12,
-                   fontsize=10,
-                   frameon=True,
-                   borderaxespad=1)
-
-# Adjust layout while preserving space for legend
-plt.tight_layout()
-# Adjust subplot spacing to make room for legend
-plt.subplots_adjust(right=0.92)
-
-# Save the plot
-plt.savefig('plotters/imgs/researcher_scores.png', 
-            dpi=300,
-            bbox_inches='tight',
-            facecolor='white',
-            edgecolor='none')
-
-plt.close() 
\ No newline at end of file
+def render(aggregates, output_path=OUTPUT):
+    """Mean score of each researcher's ideas per review LLM."""
+    # Set style for publication-quality plot
+    plt.style.use('seaborn-v0_8-whitegrid')
+    plt.rcParams.update({
+        'font.family': 'DejaVu Sans',
+        'figure.dpi': 300,
+        'savefig.dpi': 300,
+        'axes.labelsize': 12,
+        'axes.titlesize': 12,
+        'xtick.labelsize': 10,
+        'ytick.labelsize': 10
+    })
+
+    # Mean scores per researcher, review LLM and metric
+    plot_data = aggregates['researcher_means']
+
+    # Create figure with extra space for legend
+    fig = plt.figure(figsize=(20, 12))
+
+    # Get unique researchers
+    researchers = sorted(plot_data.index.get_level_values('researcher').unique())
+
+    # Create subplot grid
+    ncols = 3
+    nrows = (len(metrics) + ncols - 1) // ncols
+
+    # Create a list to store axes for sharing
+    axes = []
+
+    # Plot each metric in its own subplot
+    for i, (metric, label) in enumerate(metrics.items()):
+        row = i // ncols
+        col = i % ncols
+
+        # For first row, create subplot normally
+        if row == 0:
+            ax = plt.subplot(nrows, ncols, i + 1)
+            # Store first row axes for sharing
+            axes.append(ax)
+        else:
+            # Share x axis with corresponding subplot from first row
+            ax = plt.subplot(nrows, ncols, i + 1, sharex=axes[col])
+
+        for llm, style in style_dict.items():
+            # Scores of the current metric and LLM
+            if llm not in plot_data.index.get_level_values('review_llm'):
+                continue
+            metric_data = plot_data.xs(llm, level='review_llm')[metric]
+
+            # Plot points
+            ax.scatter(
+                x=[researchers.index(r) for r in metric_data.index],
+                y=metric_data.values,
+                marker=style['marker'],
+                c=style['color'],
+                s=150,
+                alpha=0.8,
+                label=style['label']
+            )
+
+        # Customize x-axis
+        ax.set_xticks(range(len(researchers)))
+
+        # Only show x labels for bottom row
+        if row == nrows - 1:
+            ax.set_xticklabels(researchers, rotation=45, ha='right', fontsize=20, fontweight='bold')
+        else:
+            ax.set_xticklabels([])
+            ax.set_xlabel('')
+            ax.tick_params(axis='x', which='both', bottom=False, top=False, labelbottom=False)  # Hide x-axis tick marks and labels
+
+        # Add grid
+        ax.grid(True, linestyle='--', alpha=0.7)
+
+        # Set title and labels
+        ax.set_title(label, pad=20, fontsize=20, fontweight='bold')
+        if col == 0:  # Only add y-label for leftmost plots
+            ax.set_ylabel('Score', fontsize=25)
+
+        # Make y-axis ticks larger and bold
+        ax.tick_params(axis='y', labelsize=20)
+        plt.setp(ax.get_yticklabels(), fontweight='bold')
+
+        # Let y-axis adjust automatically to data range
+        ax.margins(y=0.1)
+
+    # Add a single legend to the right of all subplots
+    handles = [plt.Line2D([0], [0], marker=style['marker'], color=style['color'],
+                         label=style['label'], markersize=10, linestyle='None')
+              for llm, style in style_dict.items()]
+
+    # Place legend to the right of the subplots
+    legend = fig.legend(handles=handles,
+                       title='Review LLM',
+                       bbox_to_anchor=(0.98, 0.5),
+                       loc='center left',
+                       title_fontsize=12,
+                       fontsize=10,
+                       frameon=True,
+                       borderaxespad=1)
+
+    # Adjust layout while preserving space for legend
+    plt.tight_layout()
+    # Adjust subplot spacing to make room for legend
+    plt.subplots_adjust(right=0.92)
+
+    # Save the plot
+    plt.savefig(output_path,
+                dpi=300,
+                bbox_inches='tight',
+                facecolor='white',
+                edgecolor='none')
+    return fig
+
+if __name__ == "__main__":
+    render(load_aggregates())
+    plt.close()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Time the review statistics on a large synthetic review table.
+
+Compares the vectorized bootstrap with a per-group resampling loop (the way seaborn
+computes one bar's CI at a time) and times the inter-rater statistics.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from aoe_scientist.analysis import METRICS, bootstrap_ci, krippendorff_alpha, icc, rater_bias
+
+REVIEW_LLMS = ["openai", "anthropic", "deepseek"]
+
+def synthetic_reviews(num_rows, num_researchers=50, seed=0):
+    """Reviews of num_rows / 3 ideas by three review LLMs with different leniency."""
+    rng = np.random.default_rng(seed)
+    num_ideas = num_rows // len(REVIEW_LLMS)
+    quality = rng.normal(6, 1.5, num_ideas)
+    df = pd.DataFrame({
+        'researcher': np.repeat(rng.integers(0, num_researchers, num_ideas), len(REVIEW_LLMS)).astype(str),
+        'generate_llm': np.repeat(rng.choice(REVIEW_LLMS, num_ideas), len(REVIEW_LLMS)),
+        'title': np.repeat(np.arange(num_ideas), len(REVIEW_LLMS)).astype(str),
+        'review_llm': np.tile(REVIEW_LLMS, num_ideas)
+    })
+    bias = np.tile([0.0, -0.5, 1.0], num_ideas)
+    for metric in METRICS[:-1]:
+        noise = rng.normal(0, 1, len(df))
+        df[metric] = np.clip(np.round(np.repeat(quality, len(REVIEW_LLMS)) + bias + noise), 1, 10)
+    df['overall_score'] = df[METRICS[:-1]].mean(axis=1)
+    return df
+
+def loop_bootstrap(df, group_cols, metric, n_boot, seed=0):
+    """Reference implementation: resample each group separately."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for key, group in df.groupby(group_cols):
+        values = group[metric].to_numpy()
+        means = [rng.choice(values, len(values)).mean() for _ in range(n_boot)]
+        rows.append((key, *np.quantile(means, [0.025, 0.975])))
+    return rows
+
+def timed(label, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<55} {elapsed:8.2f}s")
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis module on synthetic reviews")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--n-boot", type=int, default=1000)
+    args = parser.parse_args()
+
+    df = synthetic_reviews(args.rows)
+    print(f"Synthetic review table: {len(df):,} rows, {df['researcher'].nunique()} researchers")
+    groups = ['researcher', 'review_llm']
+
+    vectorized = timed(f"bootstrap_ci, {len(METRICS)} metrics x 150 groups (vectorized)",
+                       lambda: bootstrap_ci(df, groups, n_boot=args.n_boot))
+    # The loop is too slow for the full table: time one metric on a 5% sample and scale up
+    sample = df.sample(frac=0.05, random_state=0)
+    loop = timed("per-group loop, 1 metric, 5% sample",
+                 lambda: loop_bootstrap(sample, groups, 'novelty', args.n_boot))
+    print(f"{'  estimated loop time for the full table':<55} {loop * 20 * len(METRICS):8.2f}s "
+          f"({loop * 20 * len(METRICS) / vectorized:.0f}x slower)")
+    timed("bootstrap_ci, continuous overall_score (index resampling)",
+          lambda: bootstrap_ci(df.assign(overall_score=df['overall_score'] + np.random.default_rng(0).normal(0, 1e-3, len(df))),
+                               groups, ['overall_score'], n_boot=100))
+    timed("krippendorff_alpha", lambda: krippendorff_alpha(df))
+    timed("icc", lambda: icc(df))
+    timed("rater_bias", lambda: rater_bias(df))
+
+if __name__ == "__main__":
+    main()
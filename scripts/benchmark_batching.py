@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Compare tokens and wall time per idea between single-item and batched prompts."""
+import argparse
+import time
+import pandas as pd
+from dotenv import load_dotenv
+from omegaconf import OmegaConf
+from langchain_core.callbacks import get_usage_metadata_callback
+from aoe_scientist.llm import create_client
+from aoe_scientist.idea_generator import generate_research_idea, generate_research_idea_batch
+from aoe_scientist.idea_reviewer import review_ideas
+
+def measure(label, num_items, fn):
+    """Run fn and return its token usage and wall time per item."""
+    with get_usage_metadata_callback() as cb:
+        start = time.perf_counter()
+        num_done = fn()
+        elapsed = time.perf_counter() - start
+    input_tokens = sum(u.get('input_tokens', 0) for u in cb.usage_metadata.values())
+    output_tokens = sum(u.get('output_tokens', 0) for u in cb.usage_metadata.values())
+    per_item = max(num_done, 1)
+    return {
+        'mode': label,
+        'items': f"{num_done}/{num_items}",
+        'input_tokens_per_item': input_tokens / per_item,
+        'output_tokens_per_item': output_tokens / per_item,
+        'seconds_per_item': elapsed / per_item
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--llm", default="deepseek")
+    parser.add_argument("--num-ideas", type=int, default=6)
+    parser.add_argument("--batch-size", type=int, default=3)
+    args = parser.parse_args()
+
+    load_dotenv()
+    cfg = OmegaConf.to_container(OmegaConf.load("config/default.yaml"))
+    cfg.update(generate_llm=args.llm, review_llm=args.llm, rag=False, researcher=None)
+    n, k = args.num_ideas, args.batch_size
+    results = []
+
+    # Generation without reflection rounds, so only the initial request differs
+    chat = create_client(args.llm, temperature=0.75)
+    results.append(measure("generate single", n, lambda: sum(
+        len(generate_research_idea(chat, cfg, num_reflections=1)) for _ in range(n)
+    )))
+    results.append(measure(f"generate batch={k}", n, lambda: sum(
+        len(generate_research_idea_batch(chat, cfg, min(k, n - start), num_reflections=1))
+        for start in range(0, n, k)
+    )))
+
+    chat = create_client(args.llm, temperature=0.25)
+    ideas = pd.read_csv("data/ideas.csv", index_col=False).head(n)
+    for batch_size in [1, k]:
+        batch_cfg = {**cfg, 'batch_size': batch_size}
+        label = "review single" if batch_size == 1 else f"review batch={k}"
+        results.append(measure(label, n, lambda: int(
+            (review_ideas(chat, batch_cfg, ideas)['overall_score'] > 0).sum()
+        )))
+
+    print("\nPer-idea cost, single vs batched prompts:")
+    print(pd.DataFrame(results).round(2).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
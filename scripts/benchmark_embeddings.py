@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Compare the embedding backends on paper abstracts: throughput and agreement with torch.
+
+Agreement is the cosine similarity between each text's torch and ONNX embeddings, and
+the overlap of every text's 5 nearest neighbours, which is what the diversity penalty
+in select_papers and idea similarity depend on.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from aoe_scientist.embeddings import DEFAULT_MODEL, TorchEncoder, OnnxEncoder
+
+def nearest_neighbours(embeddings, k=5):
+    similarity = embeddings @ embeddings.T
+    np.fill_diagonal(similarity, -np.inf)
+    return np.argsort(-similarity, axis=1)[:, :k]
+
+def benchmark(label, encoder, texts, reference=None):
+    encoder.encode(texts[:8])  # warm up
+    start = time.perf_counter()
+    embeddings = encoder.encode(texts)
+    elapsed = time.perf_counter() - start
+    row = {'backend': label, 'texts_per_s': len(texts) / elapsed, 'seconds': elapsed}
+    if reference is not None:
+        cosine = (embeddings * reference).sum(axis=1)
+        overlap = [len(set(a) & set(b)) / len(a)
+                   for a, b in zip(nearest_neighbours(embeddings), nearest_neighbours(reference))]
+        row.update({'mean_cosine': cosine.mean(), 'min_cosine': cosine.min(), 'top5_overlap': np.mean(overlap)})
+    return row, embeddings
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the torch and ONNX embedding backends")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--papers", default="data/paper_dump.csv")
+    parser.add_argument("--num-texts", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--cache-dir", default="data/onnx")
+    args = parser.parse_args()
+
+    papers = pd.read_csv(args.papers, usecols=['title', 'abstract', 'authors']).dropna(subset=['abstract'])
+    # The documents select_papers embeds
+    texts = (papers['title'] + ' ' + papers['abstract'] + ' ' + papers['authors']).tolist()
+    texts = (texts * (args.num_texts // max(len(texts), 1) + 1))[:args.num_texts]
+    print(f"Embedding {len(texts)} paper documents with {args.model}, threads={args.threads or 'default'}")
+
+    rows = []
+    row, reference = benchmark('torch', TorchEncoder(args.model, args.threads), texts)
+    rows.append(row)
+    for quantize in (False, True):
+        encoder = OnnxEncoder(args.model, args.threads, quantize=quantize, cache_dir=args.cache_dir)
+        rows.append(benchmark('onnx int8' if quantize else 'onnx fp32', encoder, texts, reference)[0])
+
+    report = pd.DataFrame(rows).set_index('backend')
+    report['speedup'] = report['texts_per_s'] / report.loc['torch', 'texts_per_s']
+    print(report.round(4).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare RAG generation with raw paper abstracts against distilled researcher personas.
+
+Generates the same number of ideas per researcher in both rag_context modes, reviews them
+with one review LLM, and reports per mode the mean review scores and the input tokens per
+idea. Persona distillation is done up front and reported separately, since it is paid
+once per researcher and paper set rather than per idea.
+
+Usage: python scripts/compare_personas.py --llm deepseek --review-llm openai --num-ideas 5
+"""
+import argparse
+import pandas as pd
+from dotenv import load_dotenv
+from omegaconf import OmegaConf
+from langchain_core.callbacks import get_usage_metadata_callback
+from aoe_scientist.llm import get_client
+from aoe_scientist.idea_generator import generate_research_idea
+from aoe_scientist.idea_reviewer import review_ideas, SCORE_FIELDS
+from aoe_scientist.personas import researcher_persona
+
+RESEARCHERS = ["Mehta", "Ha", "Lillicrap", "Hutter", "Funke", "Bonner"]
+MODES = ["papers", "persona"]
+
+def input_tokens(cb):
+    return sum(u.get('input_tokens', 0) for u in cb.usage_metadata.values())
+
+def compare(cfg, researchers, num_ideas, num_reflections=3):
+    """Generate and review ideas in both modes.
+
+    Returns:
+        tuple: (reviews DataFrame with a rag_context column, summary DataFrame per mode)
+    """
+    generate_chat = get_client(cfg['generate_llm'], temperature=0.75)
+    review_chat = get_client(cfg['review_llm'], temperature=0.25)
+
+    # One-time cost, not charged to the ideas
+    with get_usage_metadata_callback() as cb:
+        for researcher in researchers:
+            researcher_persona({**cfg, 'researcher': researcher}, researcher)
+    distill_tokens = input_tokens(cb)
+
+    ideas, costs = [], []
+    for mode in MODES:
+        for researcher in researchers:
+            run_cfg = {**cfg, 'researcher': researcher, 'rag': True,
+                       'rag_context': {**cfg['rag_context'], 'mode': mode}}
+            for _ in range(num_ideas):
+                with get_usage_metadata_callback() as cb:
+                    idea_df = generate_research_idea(generate_chat, run_cfg, num_reflections)
+                if not idea_df.empty:
+                    ideas.append(idea_df.assign(rag_context=mode))
+                    costs.append({'rag_context': mode, 'input_tokens_per_idea': input_tokens(cb)})
+
+    ideas_df = pd.concat(ideas, ignore_index=True)
+    reviews_df = review_ideas(review_chat, cfg, ideas_df)
+    reviews_df = reviews_df.merge(ideas_df[['title', 'rag_context']].drop_duplicates('title'), on='title')
+    reviewed = reviews_df[reviews_df['overall_score'] > 0]
+
+    summary = reviewed.groupby('rag_context')[SCORE_FIELDS + ['overall_score']].mean()
+    summary = summary.join(pd.DataFrame(costs).groupby('rag_context').mean())
+    summary['ideas'] = reviewed.groupby('rag_context').size()
+    summary.loc['persona', 'one_time_distill_tokens'] = distill_tokens
+    return reviews_df, summary.reindex(MODES)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare raw-abstract and persona RAG prompts")
+    parser.add_argument("--llm", default="deepseek", help="Generation LLM")
+    parser.add_argument("--review-llm", default="deepseek")
+    parser.add_argument("--researchers", nargs="+", default=RESEARCHERS)
+    parser.add_argument("--num-ideas", type=int, default=3, help="Ideas per researcher and mode")
+    parser.add_argument("--reflections", type=int, default=3)
+    parser.add_argument("--output", default="data/persona_comparison.csv")
+    args = parser.parse_args()
+
+    load_dotenv()
+    cfg = OmegaConf.to_container(OmegaConf.load("config/default.yaml"))
+    cfg.update(generate_llm=args.llm, review_llm=args.review_llm)
+    reviews_df, summary = compare(cfg, args.researchers, args.num_ideas, args.reflections)
+
+    reviews_df.to_csv(args.output, index=False)
+    print("\nRaw abstracts vs persona, mean review scores and input tokens per idea:")
+    print(summary.round(2).to_string())
+    print(f"Reviews saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
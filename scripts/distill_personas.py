@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Distill the persona of every researcher once, ahead of persona-mode RAG runs.
+
+Personas are otherwise distilled on first use. Existing personas whose papers are
+unchanged are reused, so rerunning after select_papers only redistills what changed.
+"""
+import argparse
+from dotenv import load_dotenv
+from omegaconf import OmegaConf
+from aoe_scientist.personas import researcher_persona
+
+RESEARCHERS = ["Mehta", "Ha", "Lillicrap", "Hutter", "Funke", "Bonner"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill researcher personas from data/scholar_papers.csv")
+    parser.add_argument("--llm", default="anthropic", help="LLM that writes the personas")
+    parser.add_argument("--researchers", nargs="+", default=RESEARCHERS)
+    args = parser.parse_args()
+
+    load_dotenv()
+    cfg = OmegaConf.to_container(OmegaConf.load("config/default.yaml"))
+    cfg['rag_context']['persona_llm'] = args.llm
+    for researcher in args.researchers:
+        persona, stats = researcher_persona(cfg, researcher)
+        print(f"{researcher}: {stats['tokens']} tokens from {stats['papers']} papers")
+
+if __name__ == "__main__":
+    main()
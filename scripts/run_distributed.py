@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Run the idea/review sweep through a shared work queue.
+
+On the coordinator:
+    python scripts/run_distributed.py enqueue-ideas
+    python scripts/run_distributed.py merge --kind generate
+    python scripts/run_distributed.py enqueue-reviews
+    python scripts/run_distributed.py merge --kind review
+On every worker machine (with its own API keys), pointing at the same queue file:
+    python scripts/run_distributed.py work --workers 4
+"""
+import argparse
+import multiprocessing
+import socket
+import pandas as pd
+from aoe_scientist.work_queue import WorkQueue, enqueue_generation, enqueue_reviews, run_worker, merge_partitions
+
+LLMS = ["deepseek", "openai", "anthropic"]
+RESEARCHERS = ["Mehta", "Ha", "Lillicrap", "Hutter", "Funke", "Bonner"]
+
+def sweep_configs(llms):
+    """The same configurations as scripts/run_ideas.py."""
+    configs = [[f"generate_llm={llm}", "rag=false"] for llm in llms]
+    configs += [[f"generate_llm={llm}", "rag=true", f"researcher={r}"] for llm in llms for r in RESEARCHERS]
+    return configs
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed generation/review sweep over a SQLite work queue")
+    parser.add_argument("command", choices=["enqueue-ideas", "enqueue-reviews", "work", "merge", "status"])
+    parser.add_argument("--queue", default="data/queue.sqlite")
+    parser.add_argument("--output-dir", default="data/partitions", help="Per-worker result partitions")
+    parser.add_argument("--llms", nargs="+", default=LLMS)
+    parser.add_argument("--num-ideas", type=int, default=1, help="Ideas per configuration")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes on this machine")
+    parser.add_argument("--idle-timeout", type=float, default=0.0, help="Seconds to wait for new tasks before exiting")
+    parser.add_argument("--kind", choices=["generate", "review"], default="generate")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.queue)
+    if args.command == "enqueue-ideas":
+        task_ids = enqueue_generation(queue, sweep_configs(args.llms), args.num_ideas)
+        print(f"Enqueued {len(task_ids)} generation tasks")
+    elif args.command == "enqueue-reviews":
+        ideas = pd.read_csv("data/ideas.csv", index_col=False)
+        task_ids = enqueue_reviews(queue, ideas, args.llms)
+        print(f"Enqueued {len(task_ids)} review tasks")
+    elif args.command == "work":
+        host = socket.gethostname()
+        workers = [
+            multiprocessing.Process(
+                target=run_worker,
+                args=(args.queue, f"{host}-{i}", args.output_dir),
+                kwargs={"idle_timeout_s": args.idle_timeout}
+            )
+            for i in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    elif args.command == "merge":
+        merged_df = merge_partitions(args.output_dir, args.kind)
+        print(f"Merged {len(merged_df)} new {args.kind} results")
+    print(f"Queue status: {queue.counts()}")
+    queue.close()
+
+if __name__ == "__main__":
+    main()
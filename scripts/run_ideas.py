@@ -1,23 +1,31 @@
 #!/usr/bin/env python3
-import subprocess
 from typing import Optional
+from omegaconf import OmegaConf
+from aoe_scientist.main import main as run_main
 
 def run_with_config(llm_name: str, rag: bool, researcher: Optional[str] = None):
-    """Run main.py with specified configuration"""
-    cmd = ["python", "-m", "aoe_scientist.main", 
-           "mode=generate",
-           f"generate_llm={llm_name}",
-           f"rag={str(rag).lower()}"]
+    """Run main.py with specified configuration.
+
+    Runs in-process rather than as a subprocess, so LLM clients and their pooled
+    connections are reused across configurations.
+    """
+    overrides = ["mode=generate",
+                 f"generate_llm={llm_name}",
+                 f"rag={str(rag).lower()}"]
     
     if researcher:
-        cmd.append(f"researcher={researcher}")
+        overrides.append(f"researcher={researcher}")
     
-    subprocess.run(cmd)
+    # A failed configuration should not stop the rest of the sweep
+    try:
+        run_main(overrides)
+    except Exception as e:
+        print(f"Run failed for {overrides}: {str(e)}")
 
 def main():
-    # Configure parameters here
-    llms = ["deepseek", "openai", "anthropic"]
-    researchers = ["Mehta", "Ha", "Lillicrap", "Hutter", "Funke", "Bonner"]
+    # The sweep matrix is configured under `sweep` (estimate it first with mode=plan)
+    sweep = OmegaConf.load("config/default.yaml").sweep
+    llms, researchers = sweep.llms, sweep.researchers
     
     # Run without RAG
     for llm in llms:
@@ -29,4 +37,4 @@ def main():
             run_with_config(llm, rag=True, researcher=researcher)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
@@ -1,20 +1,22 @@
 #!/usr/bin/env python3
-import subprocess
-from typing import Optional
+from omegaconf import OmegaConf
+from aoe_scientist.main import main as run_main
 
 def run_with_config(llm_name: str):
-    """Run main.py with specified configuration"""
-    cmd = ["python", "-m", "aoe_scientist.main", 
-           "mode=review",
-           f"review_llm={llm_name}"]
-    
-    subprocess.run(cmd)
+    """Run main.py with specified configuration, in-process to reuse pooled LLM clients"""
+    overrides = ["mode=review",
+                 f"review_llm={llm_name}"]
+    # A failed configuration should not stop the rest of the sweep
+    try:
+        run_main(overrides)
+    except Exception as e:
+        print(f"Run failed for {overrides}: {str(e)}")
 
 def main():
-    llms = ["deepseek", "openai", "anthropic"]
+    llms = OmegaConf.load("config/default.yaml").sweep.review_llms
     
     for llm in llms:
         run_with_config(llm)
     
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
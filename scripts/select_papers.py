@@ -1,65 +1,52 @@
+#!/usr/bin/env python3
+"""Select the RAG papers of every researcher in data/paper_dump.csv.
+
+Researchers are processed in parallel, and a manifest records a hash of each researcher's
+candidate papers and the selection parameters, so rerunning after the dump changes only
+reselects the researchers whose candidates changed.
+
+Usage: python scripts/select_papers.py [--workers N] [--force]
+"""
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from thefuzz import fuzz
-import re
-
-def normalize_name(name):
-    """Normalize a name by removing special chars, extra spaces, etc."""
-    if pd.isna(name):
-        return ""
-    # Convert to lowercase and remove special characters
-    name = re.sub(r'[^\w\s]', ' ', str(name).lower())
-    # Remove extra whitespace
-    name = ' '.join(name.split())
-    return name
-
-def is_name_match(name1, name2, threshold=80):
-    """
-    Check if two names match using various fuzzy matching techniques.
-    Returns True if any matching method succeeds.
-    """
-    if pd.isna(name1) or pd.isna(name2):
-        return False
-        
-    name1 = normalize_name(name1)
-    name2 = normalize_name(name2)
-    
-    # Direct matches
-    if name1 == name2:
-        return True
-    
-    # Check if one name is contained within the other
-    if name1 in name2 or name2 in name1:
-        return True
-    
-    # Fuzzy ratio matching
-    if fuzz.ratio(name1, name2) >= threshold:
-        return True
-        
-    # Token sort ratio (handles reordered names better)
-    if fuzz.token_sort_ratio(name1, name2) >= threshold:
-        return True
-    
-    # Token set ratio (handles partial matches better)
-    if fuzz.token_set_ratio(name1, name2) >= threshold:
-        return True
-    
-    # Handle initials
-    name1_parts = name1.split()
-    name2_parts = name2.split()
-    if len(name1_parts) > 1 and len(name2_parts) > 1:
-        # Compare last names
-        if fuzz.ratio(name1_parts[-1], name2_parts[-1]) >= threshold:
-            # Check if initials match
-            initials1 = ''.join(part[0] for part in name1_parts[:-1])
-            initials2 = ''.join(part[0] for part in name2_parts[:-1])
-            if initials1 == initials2:
-                return True
-    
-    return False
-
-def select_optimal_papers(df, researcher_name, n_papers=5, alpha=0.6, beta=0.4, penalty_weight=1.0):
+from aoe_scientist import embeddings
+from aoe_scientist.embeddings import encode
+from aoe_scientist.names import is_name_match
+from aoe_scientist.paper_store import PaperStore
+
+SELECTION_PARAMS = {'n_papers': 5, 'alpha': 0.6, 'beta': 0.4, 'penalty_weight': 1.0}
+MANIFEST_VERSION = 1
+
+def candidate_papers(df, researcher_name, current_year=None):
+    """Papers of the last 5 years with researcher_name as first or last author and an abstract."""
+    if current_year is None:
+        current_year = pd.Timestamp.now().year
+    five_years_ago = current_year - 5
+
+    # Fuzzy-match each distinct author name once instead of once per row
+    names = set(_distinct(df['first_author'])) | set(_distinct(df['last_author']))
+    matches = [name for name in names if is_name_match(name, researcher_name)]
+
+    # Papers loaded through PaperStore carry a has_abstract flag instead of the abstract
+    has_abstract = df['has_abstract'] if 'has_abstract' in df else ~pd.isna(df['abstract'])
+    return df[
+        (df['year'] >= five_years_ago) &
+        (df['first_author'].isin(matches) | df['last_author'].isin(matches)) &
+        has_abstract  # Remove papers with NaN abstracts
+    ].copy()
+
+def _distinct(names):
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        return names.cat.categories
+    return names.dropna().unique()
+
+def select_optimal_papers(df, researcher_name, n_papers=5, alpha=0.6, beta=0.4, penalty_weight=1.0,
+                          candidates=None):
     """
     Selects up to n_papers from df in which the given researcher_name
     is the first or last author within the last 5 years. We prioritize
@@ -73,25 +60,15 @@ def select_optimal_papers(df, researcher_name, n_papers=5, alpha=0.6, beta=0.4,
         alpha (float): Weight for recency score. Default is 0.7.
         beta (float): Weight for citation score. Default is 0.3.
         penalty_weight (float): Multiplier for similarity penalty. Increase for stricter diversity.
+        candidates (pd.DataFrame): Precomputed candidate_papers(df, researcher_name), if available.
 
     Returns:
         List of dictionaries with keys ['title', 'year', 'abstract', 'citations'].
     """
 
     current_year = pd.Timestamp.now().year
-
-    # Filter by last 5 years and first/last author
     five_years_ago = current_year - 5
-    
-    # Create mask for fuzzy name matching
-    first_author_mask = df['first_author'].apply(lambda x: is_name_match(x, researcher_name))
-    last_author_mask = df['last_author'].apply(lambda x: is_name_match(x, researcher_name))
-    
-    filtered_df = df[
-        (df['year'] >= five_years_ago) &
-        (first_author_mask | last_author_mask) &
-        (~pd.isna(df['abstract']))  # Remove papers with NaN abstracts
-    ].copy()
+    filtered_df = candidates.copy() if candidates is not None else candidate_papers(df, researcher_name, current_year)
 
     if filtered_df.empty:
         print(f"No papers found for {researcher_name} in the last {current_year - five_years_ago} years")
@@ -120,10 +97,8 @@ def select_optimal_papers(df, researcher_name, n_papers=5, alpha=0.6, beta=0.4,
         .fillna("")
     )
 
-    # use sentence transformer to generate embeddings
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    embeddings = model.encode(documents.tolist(), show_progress_bar=False)
-    embeddings = embeddings / np.linalg.norm(embeddings, axis=1)[:, np.newaxis]
+    # Normalized sentence embeddings; the model is loaded once per process
+    embeddings = encode(documents.tolist())
     similarity_matrix = np.dot(embeddings, embeddings.T)
 
     # Map from dataframe index to row in the similarity matrix
@@ -175,34 +150,117 @@ def select_optimal_papers(df, researcher_name, n_papers=5, alpha=0.6, beta=0.4,
             "first_author": str(paper["first_author"]),
             "last_author": str(paper["last_author"]),
             "abstract": str(paper["abstract"]),
+            # Recency/citation score after the diversity penalty, used to prioritize papers in prompts
+            "final_score": float(paper["final_score"]),
         })
 
     return papers_context
 
-def main():
-    # Load the paper dump
+def candidates_hash(candidates, current_year, params=SELECTION_PARAMS):
+    """Hash of a researcher's candidate rows and everything else their selection depends on."""
+    # The embedding backend changes the similarity penalty, so it is a selection parameter too
+    backend = {k: v for k, v in embeddings.settings().items() if k in ('backend', 'quantize')}
+    h = hashlib.sha256(json.dumps({'version': MANIFEST_VERSION, 'year': current_year, **backend, **params},
+                                  sort_keys=True).encode())
+    columns = sorted(candidates.columns)
+    h.update(json.dumps(columns).encode())
+    h.update(pd.util.hash_pandas_object(candidates[columns], index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+# Paper metadata and store of a worker process, set once by _init_worker rather than pickled with every task
+_papers = None
+_store = None
+
+def _init_worker(df, store, embedding_settings):
+    global _papers, _store
+    _papers, _store = df, store
+    embeddings.configure(**embedding_settings)
+
+def select_researcher(researcher, previous_hash=None, current_year=None):
+    """Select one researcher's papers in a worker, unless their candidates are unchanged.
+
+    Returns:
+        tuple: (researcher, hash, papers) where papers is None if previous_hash still matches
+    """
+    if current_year is None:
+        current_year = pd.Timestamp.now().year
+    candidates = candidate_papers(_papers, researcher, current_year)
+    # Abstracts and author lists are only read for the candidates
+    candidates = candidates.drop(columns='has_abstract').join(_store.text(candidates.index))
+    digest = candidates_hash(candidates, current_year)
+    if digest == previous_hash:
+        return researcher, digest, None
+    return researcher, digest, select_optimal_papers(_papers, researcher, candidates=candidates, **SELECTION_PARAMS)
+
+def load_manifest(manifest_path, output_path):
+    """Per-researcher hashes of the last run; empty if its output is missing."""
+    if not (os.path.exists(manifest_path) and os.path.exists(output_path)):
+        return {}
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return manifest.get('researchers', {}) if manifest.get('version') == MANIFEST_VERSION else {}
+
+def select_all(input_path="data/paper_dump.csv", output_path="data/scholar_papers.csv", manifest_path=None,
+               cache_dir=None, workers=None, force=False):
+    """Select papers for every researcher in input_path, reusing unchanged slices of output_path.
+
+    Returns:
+        list: researchers whose papers were reselected
+    """
+    manifest_path = manifest_path or os.path.splitext(output_path)[0] + ".manifest.json"
+    store = PaperStore(input_path, cache_dir or os.path.join(os.path.dirname(input_path), "paper_cache"))
     print("Loading paper dump...")
-    df = pd.read_csv("data/paper_dump.csv")
-    
+    df = store.metadata()
+
     # Get unique researchers
     researchers = df['researcher'].dropna().unique()
     print(f"Found {len(researchers)} unique researchers")
-    
-    # Process papers for each researcher
-    all_selected_papers = []
-    for i, researcher in enumerate(researchers, 1):
-        print(f"Processing researcher {i}/{len(researchers)}: {researcher}")
-        selected_papers = select_optimal_papers(df, researcher)
-        all_selected_papers.extend(selected_papers)
-        
-        # Print progress
-        if selected_papers:
-            print(f"  Selected {len(selected_papers)} papers")
-        
-    # Convert final results to DataFrame and save
-    final_df = pd.DataFrame(all_selected_papers)
-    final_df.to_csv("data/scholar_papers.csv", index=False)
-    print(f"\nCompleted! Saved {len(all_selected_papers)} papers from {len(researchers)} researchers to data/scholar_papers.csv")
+
+    previous = {} if force else load_manifest(manifest_path, output_path)
+    current_year = pd.Timestamp.now().year
+    hashes, selections = {}, {}
+    if embeddings.settings()['backend'] == 'onnx':
+        # Export the model here once, rather than in every worker at the same time
+        embeddings.get_encoder(**embeddings.settings())
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df, store, embeddings.settings())) as pool:
+        futures = [pool.submit(select_researcher, researcher, previous.get(researcher), current_year)
+                   for researcher in researchers]
+        for i, future in enumerate(futures, 1):
+            researcher, digest, papers = future.result()
+            hashes[researcher] = digest
+            if papers is None:
+                continue
+            selections[researcher] = papers
+            print(f"Selected {len(papers)} papers for researcher {i}/{len(researchers)}: {researcher}")
+
+    # Rewrite only the slices of researchers that were reselected, keeping the dump's researcher order
+    kept = pd.read_csv(output_path) if previous and os.path.exists(output_path) else pd.DataFrame()
+    slices = []
+    for researcher in researchers:
+        if researcher in selections:
+            slices.append(pd.DataFrame(selections[researcher]))
+        elif not kept.empty:
+            slices.append(kept[kept['researcher'] == researcher])
+    final_df = pd.concat(slices, ignore_index=True) if slices else pd.DataFrame()
+    final_df.to_csv(output_path, index=False)
+    with open(manifest_path, 'w') as f:
+        json.dump({'version': MANIFEST_VERSION, 'researchers': hashes}, f, indent=2)
+
+    print(f"\nCompleted! Reselected {len(selections)} of {len(researchers)} researchers; "
+          f"saved {len(final_df)} papers to {output_path}")
+    return list(selections)
+
+def main():
+    parser = argparse.ArgumentParser(description="Select the RAG papers of every researcher")
+    parser.add_argument("--input", default="data/paper_dump.csv")
+    parser.add_argument("--output", default="data/scholar_papers.csv")
+    parser.add_argument("--workers", type=int, default=None, help="Parallel selection processes")
+    parser.add_argument("--force", action="store_true", help="Reselect every researcher")
+    parser.add_argument("--embedding-backend", choices=embeddings.BACKENDS, default="torch")
+    parser.add_argument("--threads", type=int, default=None, help="Embedding threads per process")
+    args = parser.parse_args()
+    embeddings.configure(backend=args.embedding_backend, threads=args.threads)
+    select_all(args.input, args.output, workers=args.workers, force=args.force)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+import argparse
+from aoe_scientist.idea_reviewer import SCORE_FIELDS
+from aoe_scientist.surrogate import SurrogateReviewer, load_training_data
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the surrogate reviewer on past LLM reviews")
+    parser.add_argument("--review-llm", default=None, help="Learn one review LLM's scores (default: average)")
+    parser.add_argument("--output", default="data/surrogate.joblib")
+    args = parser.parse_args()
+
+    train_df = load_training_data(review_llm=args.review_llm)
+    print(f"Training surrogate on {len(train_df)} reviewed ideas")
+
+    surrogate = SurrogateReviewer()
+    report = surrogate.cross_validate(train_df['title'], train_df['details'], train_df[SCORE_FIELDS])
+    print("Cross-validated surrogate vs LLM agreement:")
+    print(report.round(3).to_string())
+
+    surrogate.fit(train_df['title'], train_df['details'], train_df[SCORE_FIELDS])
+    surrogate.save(args.output)
+    print(f"Surrogate saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
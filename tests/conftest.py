@@ -0,0 +1,26 @@
+from concurrent.futures import Future
+import pytest
+
+
+class InlinePool:
+    """Stand-in for ProcessPoolExecutor that runs submitted work immediately, so tests need no subprocesses"""
+
+    def __init__(self, max_workers=None, initializer=None, initargs=()):
+        if initializer is not None:
+            initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+@pytest.fixture
+def inline_pool():
+    return InlinePool
@@ -0,0 +1,50 @@
+import itertools
+import numpy as np
+import pandas as pd
+from aoe_scientist.analysis import bootstrap_ci, krippendorff_alpha, icc, rater_bias
+
+RATERS = ['openai', 'anthropic', 'deepseek']
+
+
+def make_reviews(num_ideas=40, bias=(0.0, 0.0, 1.0), noise=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    quality = rng.integers(3, 8, num_ideas)
+    rows = [
+        {'researcher': f"r{i % 4}", 'generate_llm': 'openai', 'title': f"idea {i}", 'review_llm': rater,
+         'novelty': float(np.clip(round(quality[i] + b + rng.normal(0, noise)), 1, 10))}
+        for i in range(num_ideas) for rater, b in zip(RATERS, bias)
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_bootstrap_ci_matches_percentile_bootstrap():
+    df = make_reviews()
+    ci = bootstrap_ci(df, ['review_llm'], ['novelty'], n_boot=4000).set_index('review_llm')
+    rng = np.random.default_rng(1)
+    for rater, group in df.groupby('review_llm'):
+        values = group['novelty'].to_numpy()
+        means = rng.choice(values, (4000, len(values))).mean(axis=1)
+        low, high = np.quantile(means, [0.025, 0.975])
+        assert ci.loc[rater, 'mean'] == values.mean()
+        assert abs(ci.loc[rater, 'ci_low'] - low) < 0.1 and abs(ci.loc[rater, 'ci_high'] - high) < 0.1
+
+
+def test_krippendorff_alpha_matches_pairwise_definition():
+    df = make_reviews(num_ideas=12).drop(index=[0, 4])  # some ideas with only two reviews
+    alpha = krippendorff_alpha(df, metrics=['novelty'])['alpha'][0]
+
+    units = [g['novelty'].to_numpy() for _, g in df.groupby('title')]
+    pooled = np.concatenate(units)
+    n = len(pooled)
+    observed = sum(sum((a - b) ** 2 for a, b in itertools.permutations(u, 2)) / (len(u) - 1) for u in units) / n
+    expected = sum((a - b) ** 2 for a, b in itertools.permutations(pooled, 2)) / (n * (n - 1))
+    assert np.isclose(alpha, 1 - observed / expected)
+
+
+def test_agreement_and_bias():
+    perfect = make_reviews(bias=(0.0, 0.0, 0.0), noise=0.0)
+    assert np.isclose(krippendorff_alpha(perfect, metrics=['novelty'])['alpha'][0], 1.0)
+    assert np.isclose(icc(perfect, metrics=['novelty'])['icc2_1'][0], 1.0)
+
+    bias = rater_bias(make_reviews(bias=(0.0, 0.0, 2.0), noise=0.0), metrics=['novelty']).set_index('review_llm')
+    assert bias.loc['deepseek', 'bias'] > 1.5 and bias.loc['openai', 'bias'] < 0
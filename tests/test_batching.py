@@ -0,0 +1,113 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import AIMessage
+from aoe_scientist.batching import MicroBatchingChat
+from aoe_scientist.idea_generator import parse_idea_batch
+from aoe_scientist.idea_reviewer import parse_batch_reviews
+
+IDEA = {"Thought": "t", "Name": "n", "Title": "A title", "Details": "Three sentences."}
+REVIEW = {"technical_merit": 4, "novelty": 5, "feasibility": 6, "impact": 3, "clarity": 7, "justification": "j"}
+
+
+def test_parse_idea_batch_keeps_complete_items():
+    """Incomplete or truncated ideas are dropped without losing the rest of the batch"""
+    content = "```json\n" + json.dumps([IDEA, {"Name": "missing_fields"}, IDEA])[:-30]
+    ideas, num_failed = parse_idea_batch(content)
+    assert ideas == [IDEA]
+    assert num_failed == 2
+
+
+def test_parse_batch_reviews_partial_failure():
+    """Invalid reviews leave a gap for their idea only"""
+    raw = AIMessage(content="", tool_calls=[{
+        "name": "BatchReviewOutput",
+        "id": "call_1",
+        "args": {"reviews": [
+            {**REVIEW, "idea_id": 3},
+            {**REVIEW, "novelty": 42, "idea_id": 2},  # out of range score
+            {**REVIEW, "idea_id": 9},  # unknown idea
+        ]},
+    }])
+    reviews = parse_batch_reviews({"raw": raw, "parsed": None}, 3)
+    assert reviews[0] is None and reviews[1] is None
+    assert reviews[2] == REVIEW
+
+
+class RecordingModel:
+    """Stand-in for a local server client that records the size of every dispatched batch"""
+
+    def __init__(self, suffix=""):
+        self.batch_sizes = []
+        self.suffix = suffix
+
+    def with_structured_output(self, schema, **kwargs):
+        return RecordingModel(suffix=f":{schema.get('title') if isinstance(schema, dict) else schema}")
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        self.batch_sizes.append(len(inputs))
+        return [ValueError("bad prompt") if x == "bad" else x.upper() + self.suffix for x in inputs]
+
+
+def test_micro_batching_groups_concurrent_requests():
+    """Concurrent invokes are dispatched together and errors only reach their own caller"""
+    model = RecordingModel()
+    chat = MicroBatchingChat(model, max_batch_size=4, batch_window_ms=200)
+    prompts = ["a", "b", "bad", "c"]
+
+    def call(prompt):
+        try:
+            return chat.invoke(prompt)
+        except ValueError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(call, prompts))
+    assert results == ["A", "B", "bad prompt", "C"]
+    assert model.batch_sizes == [4]
+
+
+def test_structured_variants_share_one_dispatcher():
+    """Review and comparison chains reuse the wrapper's thread, and their requests batch together"""
+    chat = MicroBatchingChat(RecordingModel(), max_batch_size=4, batch_window_ms=200)
+    threads = threading.active_count()
+    review = chat.with_structured_output("review", method="function_calling")
+    for _ in range(5):
+        assert chat.with_structured_output("review", method="function_calling") is review
+    compare = chat.with_structured_output("compare", method="function_calling")
+    assert threading.active_count() == threads
+
+    calls = [(chat, "a"), (review, "b"), (compare, "c"), (review, "d")]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda call: call[0].invoke(call[1]), calls))
+    assert results == ["A", "B:review", "C:compare", "D:review"]
+    assert review.runnable.batch_sizes == [2]
+    # JSON-schema dicts cannot be cache keys but still get a working variant
+    schema_chat = chat.with_structured_output({'title': 'schema', 'type': 'object'})
+    assert schema_chat.invoke("e") == "E:schema" and schema_chat.dispatcher is chat.dispatcher
+
+
+class BlockingModel(RecordingModel):
+    """Holds batches containing "slow" until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.started, self.release = threading.Event(), threading.Event()
+
+    def batch(self, inputs, config=None, return_exceptions=False):
+        if "slow" in inputs:
+            self.started.set()
+            self.release.wait(5)
+        return super().batch(inputs, config, return_exceptions)
+
+
+def test_requests_do_not_wait_for_a_batch_in_flight():
+    model = BlockingModel()
+    chat = MicroBatchingChat(model, max_batch_size=4, batch_window_ms=10)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        slow = pool.submit(chat.invoke, "slow")
+        assert model.started.wait(5)
+        # The first batch is still running, yet the next request is dispatched and answered
+        assert chat.invoke("fast") == "FAST" and not slow.done()
+        model.release.set()
+        assert slow.result() == "SLOW"
@@ -0,0 +1,58 @@
+import json
+import threading
+import numpy as np
+from langchain_core.messages import AIMessage
+from aoe_scientist import idea_generator
+from aoe_scientist.idea_generator import refine_idea_beam, novelty_scores, create_idea_parser
+
+IDEA = {'Thought': 'start', 'Name': 'seed', 'Title': 'Seed idea', 'Details': 'Search cells with a predictor'}
+
+
+def title_encode(texts):
+    # One-hot on the length of the title, so novelty is decided by the title alone
+    vectors = np.zeros((len(texts), 64), dtype=np.float32)
+    for row, text in enumerate(texts):
+        vectors[row, len(text.split('.')[0]) % 64] = 1
+    return vectors
+
+
+def test_novelty_against_reference(monkeypatch):
+    monkeypatch.setattr(idea_generator, 'encode', title_encode)
+    ideas = [{'Title': 'abc', 'Details': ''}, {'Title': 'abcd', 'Details': ''}]
+    assert list(novelty_scores(ideas, None)) == [1, 1]
+    assert list(novelty_scores(ideas, title_encode(['xyz']))) == [0, 1]
+
+
+class ScriptedChat:
+    """Answers reflection prompts with ideas whose titles grow by one letter per call"""
+
+    def __init__(self, done=False):
+        self.calls, self.done = 0, done
+        self.lock = threading.Lock()
+
+    def invoke(self, messages):
+        # Beam branches run on a thread pool, so each call takes its number under the lock
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        idea = {'Thought': 'I am done' if self.done else 'refined', 'Name': f'idea_{call}',
+                'Title': 'x' * call, 'Details': 'details'}
+        return AIMessage(content=f"```json\n{json.dumps(idea)}\n```")
+
+
+def test_beam_keeps_most_novel_refinements(monkeypatch):
+    monkeypatch.setattr(idea_generator, 'encode', title_encode)
+    chat = ScriptedChat()
+    # Titles of length 1-3 repeat earlier work, so round 2 keeps 'xxxx' and 'xxxxx'
+    reference = title_encode(['x', 'xx', 'xxx'])
+    best = refine_idea_beam(chat, IDEA, create_idea_parser(), num_reflections=3, beam_width=2, branching=5,
+                            reference=reference)
+    # Round 2 expands the seed, round 3 both ideas kept in the beam
+    assert chat.calls == 5 + 2 * 5
+    assert len(best['Title']) > 3 and all(best.get(k) for k in idea_generator.IDEA_FIELDS)
+
+
+def test_beam_stops_when_all_refinements_are_done():
+    chat = ScriptedChat(done=True)
+    refine_idea_beam(chat, IDEA, create_idea_parser(), num_reflections=4, beam_width=2, branching=2)
+    assert chat.calls == 2
@@ -0,0 +1,28 @@
+from langchain_core.messages import HumanMessage
+from aoe_scientist.budget import Budget, start_budget, run_within_budget
+from aoe_scientist.llm import create_client
+
+
+def test_usage_is_charged_to_active_budget():
+    budget = start_budget({'budget': {'max_usd': 1.0, 'prices': {'mock': [1000.0, 1000.0]}}})
+    try:
+        create_client("mock", temperature=0.0).invoke([HumanMessage(content="Propose an idea")])
+        report = budget.report()
+        assert report['tokens'] > 0 and report['usd']['mock'] > 0
+    finally:
+        start_budget({})
+
+
+def test_budget_degrades_then_stops_scheduling():
+    budget = Budget(max_tokens=100, degrade_after=0.5)
+    assert budget.reflections(3) == 3 and budget.concurrency(8) == 8
+    budget.record("mock", 50, 25)
+    assert budget.reflections(3) == 2 and budget.concurrency(8) == 4
+
+    def call(i):
+        budget.record("mock", 10, 0)
+        return i
+
+    # Only calls started before the limit is hit run; their results are kept
+    assert run_within_budget(call, range(10), max_workers=1, budget=budget) == [0, 1, 2]
+    assert budget.exhausted()
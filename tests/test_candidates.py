@@ -0,0 +1,54 @@
+import numpy as np
+from langchain_core.messages import HumanMessage
+from aoe_scientist import idea_generator
+from aoe_scientist.budget import start_budget
+from aoe_scientist.idea_generator import sample_candidates, select_diverse_ideas, generate_research_idea_candidates
+from aoe_scientist.llm import create_client
+
+CFG = {'rag': False, 'researcher': None, 'topic': 'NAS', 'generate_llm': 'mock'}
+
+
+class CountingChat:
+    """A client without n > 1 support"""
+
+    def __init__(self, chat):
+        self.chat, self.calls = chat, 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return self.chat.invoke(messages)
+
+
+def test_candidates_share_one_request_when_supported():
+    chat = create_client('mock', temperature=0.75)
+    budget = start_budget({'budget': {'max_tokens': 10**9}})
+    contents = sample_candidates(chat, [HumanMessage(content="Generate an idea")], 4)
+    assert len(set(contents)) == 4
+    # The prompt and the completions are charged once, not once per candidate
+    assert budget.tokens == len("Generate an idea".split()) + sum(len(c.split()) for c in contents)
+
+    fallback = CountingChat(chat)
+    assert len(sample_candidates(fallback, [HumanMessage(content="Generate an idea")], 3)) == 3 and fallback.calls == 3
+    start_budget({})
+
+
+def test_diverse_selection_spans_clusters(monkeypatch):
+    # Two tight clusters of three ideas each, plus one outlier
+    centers = {'a': [1, 0, 0], 'b': [0, 1, 0], 'c': [0, 0, 1]}
+    ideas = [{'Title': f"{c} {i}", 'Details': ''} for c, n in [('a', 3), ('b', 3), ('c', 1)] for i in range(n)]
+
+    def fake_encode(texts):
+        rng = np.random.default_rng(0)
+        vectors = np.array([centers[t[0]] for t in texts], dtype=float) + rng.normal(0, 0.05, (len(texts), 3))
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    monkeypatch.setattr(idea_generator, 'encode', fake_encode)
+    assert sorted(i['Title'][0] for i in select_diverse_ideas(ideas, 3)) == ['a', 'b', 'c']
+    assert select_diverse_ideas(ideas[:2], 3) == ideas[:2]
+
+
+def test_generate_candidates_keeps_valid_diverse_ideas(monkeypatch):
+    monkeypatch.setattr(idea_generator, 'encode', lambda texts: np.eye(len(texts), dtype=np.float32))
+    chat = create_client('mock', temperature=0.75)
+    idea_df = generate_research_idea_candidates(chat, CFG, num_ideas=2, num_candidates=5, num_reflections=1)
+    assert len(idea_df) == 2 and idea_df['title'].nunique() == 2
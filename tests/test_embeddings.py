@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from aoe_scientist import embeddings
+from aoe_scientist.embeddings import length_batches
+
+WORDS = ['neural', 'architecture', 'search', 'evolution', 'idea', 'review', 'paper', 'model', 'learning', 'graph']
+
+
+def test_length_batches_bound_padded_tokens():
+    lengths = np.array([5, 120, 7, 60, 6, 118, 64, 3])
+    batches = length_batches(lengths, max_batch_tokens=128)
+    # Sorted by length, each batch holds at most 128 padded tokens
+    assert batches == [[7, 0, 4, 2], [3, 6], [5], [1]]
+
+
+@pytest.fixture
+def tiny_model(tmp_path):
+    """A small random BERT saved locally, loaded by sentence-transformers with mean pooling"""
+    transformers = pytest.importorskip('transformers')
+    vocab = tmp_path / 'vocab.txt'
+    vocab.write_text('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + WORDS))
+    tokenizer = transformers.BertTokenizerFast(str(vocab))
+    config = transformers.BertConfig(vocab_size=len(WORDS) + 5, hidden_size=32, num_hidden_layers=2,
+                                     num_attention_heads=2, intermediate_size=64)
+    transformers.BertModel(config).save_pretrained(tmp_path / 'model')
+    tokenizer.save_pretrained(tmp_path / 'model')
+    return str(tmp_path / 'model')
+
+
+@pytest.mark.parametrize('quantize', [False, True])
+def test_onnx_backend_agrees_with_torch(tmp_path, tiny_model, quantize):
+    pytest.importorskip('onnxruntime')
+    rng = np.random.default_rng(0)
+    texts = [' '.join(rng.choice(WORDS, rng.integers(1, 40))) for _ in range(30)]
+
+    reference = embeddings.TorchEncoder(tiny_model).encode(texts)
+    onnx = embeddings.OnnxEncoder(tiny_model, threads=1, quantize=quantize, max_batch_tokens=64,
+                                  cache_dir=str(tmp_path / 'onnx'))
+    encoded = onnx.encode(texts)
+    assert encoded.shape == reference.shape and encoded.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(encoded, axis=1), 1.0, atol=1e-5)
+    cosine = (encoded * reference).sum(axis=1)
+    assert cosine.min() > (0.99 if quantize else 0.9999)
+
+
+def test_export_leaves_only_the_complete_model(tmp_path, tiny_model):
+    pytest.importorskip('onnxruntime')
+    model_dir = tmp_path / 'onnx'
+    model_path = embeddings.export_onnx(tiny_model, str(model_dir), quantize=True)
+    assert model_path == str(model_dir / 'model-int8.onnx')
+    # The staging directory is gone and the encoder files sit next to the model
+    assert not [p for p in model_dir.iterdir() if p.name.startswith('.export-')]
+    assert {'model.onnx', 'encoder.json', 'tokenizer.json'} <= {p.name for p in model_dir.iterdir()}
+
+
+def test_encoder_interface_is_abstract():
+    with pytest.raises(TypeError):
+        embeddings.Encoder()
@@ -0,0 +1,42 @@
+import numpy as np
+from aoe_scientist.evolution import (
+    non_dominated_sort,
+    crowding_distance,
+    select_survivors,
+    tournament_select,
+)
+
+
+def test_non_dominated_sort_fronts():
+    """Individuals are ranked into successive Pareto fronts"""
+    scores = np.array([
+        [9, 1],  # front 0
+        [1, 9],  # front 0
+        [5, 5],  # front 0
+        [4, 4],  # dominated by [5, 5]
+        [3, 3],  # dominated by [4, 4]
+        [5, 5],  # duplicate of a front 0 point does not dominate it
+    ])
+    ranks = non_dominated_sort(scores)
+    assert ranks.tolist() == [0, 0, 0, 1, 2, 0]
+
+
+def test_crowding_distance_prefers_extremes():
+    """Boundary points are infinite and interior points are normalized gap sums"""
+    scores = np.array([[0, 4], [1, 3], [3, 1], [4, 0]], dtype=float)
+    ranks = np.zeros(4, dtype=int)
+    distance = crowding_distance(scores, ranks)
+    assert np.isinf(distance[0]) and np.isinf(distance[3])
+    np.testing.assert_allclose(distance[1:3], [1.5, 1.5])
+
+
+def test_select_survivors_and_tournament():
+    """Survivors are ordered by front first, then by crowding distance"""
+    ranks = np.array([1, 0, 0, 2])
+    crowding = np.array([np.inf, 0.5, np.inf, np.inf])
+    assert select_survivors(ranks, crowding, 3).tolist() == [2, 1, 0]
+
+    rng = np.random.default_rng(0)
+    winners = tournament_select(ranks, crowding, 1000, rng)
+    # The worst individual can only win a tournament against itself
+    assert (winners == 3).mean() < 0.1
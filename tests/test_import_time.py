@@ -0,0 +1,29 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# Dependencies that only specific code paths need and must not load at startup
+HEAVY_MODULES = ["torch", "transformers", "sentence_transformers", "sklearn", "thefuzz",
+                 "langchain_openai", "langchain_anthropic"]
+IMPORT_BUDGET_SECONDS = 2.0
+
+
+def import_times(module):
+    """Cumulative import time in microseconds of every module loaded by `import module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parents[1]
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            times[parts[2].strip()] = int(parts[1])
+    return times
+
+
+def test_main_cold_start():
+    """Importing the CLI entry point stays light and under the startup budget"""
+    times = import_times("aoe_scientist.main")
+    assert [m for m in HEAVY_MODULES if m in times] == []
+    assert times["aoe_scientist.main"] / 1e6 < IMPORT_BUDGET_SECONDS
@@ -0,0 +1,27 @@
+from aoe_scientist import llm
+from aoe_scientist.llm import get_client, _shared_http_clients
+
+
+def test_clients_are_cached_and_share_one_transport(monkeypatch):
+    for env in ("OPENAI_API_KEY", "DEEPSEEK_API_KEY", "ANTHROPIC_API_KEY"):
+        monkeypatch.setenv(env, "test-key")
+    monkeypatch.setattr(llm, '_clients', {})
+    openai = get_client('openai', temperature=0.25)
+    assert get_client('openai', temperature=0.25) is openai
+    assert get_client('openai', temperature=0.75) is not openai
+
+    http_client, http_async_client = _shared_http_clients(32, True)
+    deepseek, anthropic = get_client('deepseek', temperature=0.25), get_client('anthropic', temperature=0.25)
+    assert openai.root_client._client is http_client and deepseek.root_client._client is http_client
+    assert openai.root_async_client._client is http_async_client
+    # Fails if a langchain-anthropic release stops building its clients in _client/_async_client
+    assert anthropic._client._client is http_client and anthropic._async_client._client is http_async_client
+
+
+def test_pool_settings_are_part_of_the_client_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, '_clients', {})
+    default = get_client('openai', temperature=0.25)
+    small_pool = get_client('openai', temperature=0.25, max_connections=4)
+    assert small_pool is not default and get_client('openai', temperature=0.25, max_connections=4) is small_pool
+    assert small_pool.root_client._client is _shared_http_clients(4, True)[0]
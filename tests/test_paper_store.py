@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+from aoe_scientist import paper_store
+from aoe_scientist.paper_store import PaperStore, CATEGORY_COLUMNS
+
+
+def make_dump(path, num_papers=25):
+    rows = [
+        {'researcher': f"R{i % 3}", 'title': f"paper {i}", 'year': 2020 + i % 5, 'venue': f"venue {i % 4}",
+         'citations': i, 'authors': f"A{i}, B{i}", 'first_author': f"A{i}", 'last_author': f"R{i % 3}",
+         'author_count': 2, 'abstract': None if i % 7 == 0 else f"abstract {i}", 'url': f"http://{i}"}
+        for i in range(num_papers)
+    ]
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+@pytest.mark.parametrize('arrow', [False, True])
+def test_metadata_and_text_match_full_read(tmp_path, monkeypatch, arrow):
+    if arrow:
+        pytest.importorskip('pyarrow')
+    else:
+        monkeypatch.setattr(paper_store, '_has_pyarrow', lambda: False)
+    full = make_dump(tmp_path / 'dump.csv')
+    store = PaperStore(str(tmp_path / 'dump.csv'), str(tmp_path / 'cache'), chunk_rows=4)
+
+    meta = store.metadata()
+    assert 'abstract' not in meta and 'url' not in meta
+    assert all(isinstance(meta[c].dtype, pd.CategoricalDtype) for c in CATEGORY_COLUMNS)
+    assert meta['has_abstract'].tolist() == full['abstract'].notna().tolist()
+    assert meta['title'].astype(object).tolist() == full['title'].tolist()
+
+    rows = [21, 3, 4, 13]
+    text = store.text(rows)
+    assert text.index.tolist() == sorted(rows)
+    assert text['authors'].astype(object).tolist() == full.loc[sorted(rows), 'authors'].tolist()
+    assert (tmp_path / 'cache' / 'dump.parquet').exists() == arrow
+
+
+def test_parquet_cache_follows_the_csv(tmp_path):
+    pytest.importorskip('pyarrow')
+    make_dump(tmp_path / 'dump.csv')
+    assert len(PaperStore(str(tmp_path / 'dump.csv'), str(tmp_path / 'cache')).metadata()) == 25
+    make_dump(tmp_path / 'dump.csv', num_papers=30)
+    assert len(PaperStore(str(tmp_path / 'dump.csv'), str(tmp_path / 'cache')).metadata()) == 30
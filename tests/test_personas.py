@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from langchain_core.messages import AIMessage
+from aoe_scientist.personas import load_or_distill_persona
+from aoe_scientist.idea_generator import build_idea_messages
+
+
+class CountingChat:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=f"Persona {self.calls}")
+
+
+def make_papers(n=3):
+    return pd.DataFrame({'title': [f"Paper {i}" for i in range(n)], 'year': [2024] * n,
+                         'abstract': [f"Abstract {i}" for i in range(n)]})
+
+
+def test_persona_is_distilled_once_per_paper_set(tmp_path):
+    chat = CountingChat()
+    with ThreadPoolExecutor(8) as pool:
+        records = list(pool.map(lambda _: load_or_distill_persona(lambda: chat, "Ada", make_papers(), str(tmp_path)),
+                                range(8)))
+    assert chat.calls == 1 and {r['persona'] for r in records} == {"Persona 1"}
+
+    # Same papers in another order reuse the stored persona; new papers are redistilled
+    assert load_or_distill_persona(lambda: chat, "Ada", make_papers()[::-1], str(tmp_path))['persona'] == "Persona 1"
+    assert load_or_distill_persona(lambda: chat, "Ada", make_papers(4), str(tmp_path))['persona'] == "Persona 2"
+
+
+def test_persona_mode_replaces_abstracts_in_prompt(tmp_path):
+    cfg = {'rag': True, 'researcher': 'Hutter', 'topic': 'NAS', 'generate_llm': 'mock',
+           'rag_context': {'mode': 'persona', 'persona_llm': 'mock', 'persona_dir': str(tmp_path),
+                           'max_tokens': 3000, 'max_abstract_tokens': 300}}
+    system = build_idea_messages(cfg, "")[0].content
+    assert "Research profile distilled from the researcher's" in system
+    papers_system = build_idea_messages({**cfg, 'rag_context': {**cfg['rag_context'], 'mode': 'papers'}}, "")[0].content
+    assert len(system) < len(papers_system)
+    assert len(list(tmp_path.iterdir())) == 1
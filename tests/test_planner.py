@@ -0,0 +1,44 @@
+import pandas as pd
+from aoe_scientist.planner import plan_sweep
+from aoe_scientist.utils import setup_config
+
+
+def plan(tmp_path, *overrides):
+    cfg = setup_config(overrides=["mode=plan", "sweep.llms=[mock,openai]", "sweep.researchers=[]",
+                                  "sweep.review_llms=[openai]", "num_ideas=4", *overrides])
+    return plan_sweep(cfg, metrics_path=str(tmp_path / "run_metrics.csv"),
+                      ideas_path=str(tmp_path / "ideas.csv")).set_index(['stage', 'provider'])
+
+
+def test_plan_counts_calls_and_uses_history(tmp_path):
+    pd.DataFrame({'provider': ['mock'] * 3, 'stage': ['generate'] * 3, 'duration': [1.0, 2.0, 3.0],
+                  'output_tokens': [100, 200, 300], 'aborted': False}).to_csv(tmp_path / "run_metrics.csv")
+    plan_df = plan(tmp_path, "concurrency=2")
+
+    mock = plan_df.loc[('generate', 'mock')]
+    # 4 ideas x (1 initial + 2 reflections), in 2 waves of 2 concurrent 3-call chains
+    assert mock['calls'] == 12 and mock['output_tokens'] == 12 * 200 and mock['wall_time_s'] == 2 * 3 * 2.0
+    assert mock['usd'] == 0 and mock['history_calls'] == 3
+    # Without history the defaults apply
+    assert plan_df.loc[('generate', 'openai'), 'output_tokens'] == 12 * 400
+    assert plan_df.loc[('generate', 'openai'), 'usd'] > 0
+    # Each of the 8 new ideas gets an initial and a reflection review
+    assert plan_df.loc[('review', 'openai'), 'calls'] == 16
+
+
+def test_batching_and_candidates_reduce_prompt_tokens(tmp_path):
+    single = plan(tmp_path).loc[('generate', 'mock')]
+    batched = plan(tmp_path, "batch_size=4").loc[('generate', 'mock')]
+    assert batched['calls'] == 1 + 4 * 2 and batched['input_tokens'] < single['input_tokens']
+    # The mock provider returns all candidates of a request from one call
+    candidates = plan(tmp_path, "candidates.per_request=4", "candidates.keep=2").loc[('generate', 'mock')]
+    assert candidates['calls'] == 2 + 4 * 2 and candidates['output_tokens'] == (2 * 4 + 4 * 2) * 400
+
+
+def test_history_includes_streams_stopped_at_complete_json(tmp_path):
+    # With stream=true every generation call stops once the idea JSON is complete, before its usage arrives
+    pd.DataFrame({'provider': ['mock'] * 2, 'stage': ['generate'] * 2, 'duration': [4.0, 6.0],
+                  'output_tokens': None, 'output_chunks': [100, 300],
+                  'aborted': True}).to_csv(tmp_path / "run_metrics.csv")
+    mock = plan(tmp_path).loc[('generate', 'mock')]
+    assert mock['history_calls'] == 2 and mock['output_tokens'] == 12 * 200
@@ -0,0 +1,52 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'plotters'))
+import plot_all  # noqa: E402
+import aggregates  # noqa: E402
+from aggregates import METRICS  # noqa: E402
+
+
+def make_reviews(seed=0):
+    rng = np.random.default_rng(seed)
+    llms = ['openai', 'anthropic', 'deepseek']
+    rows = [
+        {'researcher': r, 'generate_llm': g, 'title': f"{r} {g} {i}", 'review_llm': v,
+         **{m: rng.integers(1, 11) for m in METRICS}}
+        for r in ['Ha', 'Hutter'] for g in llms for i in range(3) for v in llms
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_only_changed_figures_rerender(tmp_path, monkeypatch, inline_pool):
+    rendered = []
+    monkeypatch.setattr(plot_all, 'ProcessPoolExecutor', inline_pool)
+    monkeypatch.setattr(plot_all, 'render_figure', lambda name, agg, path: rendered.append(name) or open(path, 'w').close())
+    reviews_path = tmp_path / 'reviews.csv'
+    kwargs = dict(cache_dir=str(tmp_path / 'cache'), output_dir=str(tmp_path / 'imgs'))
+
+    make_reviews().to_csv(reviews_path, index=False)
+    assert len(plot_all.plot_all(str(reviews_path), **kwargs)) == len(plot_all.FIGURE_MODULES)
+    assert plot_all.plot_all(str(reviews_path), **kwargs) == []
+
+    # New reviews by openai of openai ideas only change the figures built from per-LLM-pair means/variances
+    df = make_reviews()
+    df.loc[(df.generate_llm == 'openai') & (df.review_llm == 'openai'), 'novelty'] += 1
+    df.to_csv(reviews_path, index=False)
+    rendered.clear()
+    plot_all.plot_all(str(reviews_path), **kwargs)
+    assert 'heatmap_plot_scores' in rendered and 'bar_plot' not in rendered
+
+
+def test_stale_cache_version_is_recomputed(tmp_path, monkeypatch):
+    reviews_path, cache_path = tmp_path / 'reviews.csv', tmp_path / 'cache' / 'aggregates.pkl'
+    make_reviews().to_csv(reviews_path, index=False)
+    cached = aggregates.load_aggregates(str(reviews_path), str(cache_path))
+
+    # A cache written by older aggregates code for the same reviews is not reused
+    monkeypatch.setattr(aggregates, 'AGGREGATES_VERSION', aggregates.AGGREGATES_VERSION + 1)
+    monkeypatch.setattr(aggregates, 'compute_aggregates', lambda df: {'recomputed': True})
+    assert aggregates.load_aggregates(str(reviews_path), str(cache_path)) == {'recomputed': True}
+    assert set(cached) >= {'llm_means', 'researcher_ci'}
@@ -0,0 +1,33 @@
+from aoe_scientist.progress import Progress, live_progress, tracker
+
+
+def test_progress_rates_and_prometheus_text():
+    progress = Progress()
+    progress.expect('review', 'openai', 10)
+    progress.item_done('review', 'openai', n=4, failed=1)
+    progress.llm_started('openai')
+    progress.llm_started('openai')
+    progress.llm_finished('openai', error=True)
+
+    row, = progress.snapshot()
+    assert (row['done'], row['expected'], row['failed'], row['in_flight']) == (4, 10, 1, 1)
+    assert row['per_min'] > 0 and row['eta_s'] is not None and row['llm_error_rate'] == 1.0
+    text = progress.prometheus_text()
+    assert 'aoe_items_done_total{stage="review",provider="openai"} 4' in text
+    assert 'aoe_llm_in_flight{provider="openai"} 1' in text
+
+
+def test_live_progress_writes_metrics_file(tmp_path):
+    metrics_path = tmp_path / "progress.prom"
+    cfg = {'progress': {'metrics_path': str(metrics_path), 'refresh_s': 0.05}}
+    with live_progress(cfg, str(tmp_path / "run.log")):
+        tracker.expect('generate', 'mock', 1)
+        tracker.item_done('generate', 'mock')
+    assert 'aoe_items_done_total{stage="generate",provider="mock"}' in metrics_path.read_text()
+
+
+def test_live_progress_metrics_file_in_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with live_progress({'progress': {'metrics_path': "progress.prom"}}, "run.log"):
+        tracker.expect('review', 'mock', 1)
+    assert 'aoe_items_expected{stage="review",provider="mock"}' in (tmp_path / "progress.prom").read_text()
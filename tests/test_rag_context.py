@@ -0,0 +1,27 @@
+import pandas as pd
+from aoe_scientist.rag_context import TokenCounter, build_rag_context
+
+
+def make_papers():
+    return pd.DataFrame([
+        {'title': f"Paper {i}", 'year': 2020 + i, 'abstract': ' '.join(f"word{j}" for j in range(40 * (i + 1))),
+         'final_score': score}
+        for i, score in enumerate([0.2, 0.9, 0.5, 0.7])
+    ])
+
+
+def test_context_fits_budget_in_priority_order():
+    counter = TokenCounter('gpt-4o')
+    context, stats = build_rag_context(make_papers(), max_tokens=400, max_abstract_tokens=120, model='gpt-4o')
+    assert counter.count(context) <= 400 and stats['tokens'] <= 400
+    titles = [line.split(' (')[0][2:] for line in context.splitlines()]
+    assert titles == ['Paper 1', 'Paper 3', 'Paper 2', 'Paper 0'][:len(titles)]
+    assert stats['papers'] == len(titles) and stats['papers'] + stats['dropped'] == 4
+    assert stats['truncated'] >= 1 and '…' in context
+
+
+def test_small_papers_are_kept_whole():
+    papers = make_papers().assign(abstract='A short abstract.')
+    context, stats = build_rag_context(papers, max_tokens=3000)
+    assert stats == {'tokens': stats['tokens'], 'papers': 4, 'truncated': 0, 'dropped': 0}
+    assert context.splitlines()[0] == '- Paper 1 (2021): A short abstract.'
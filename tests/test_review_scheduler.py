@@ -0,0 +1,69 @@
+import pandas as pd
+from aoe_scientist.budget import start_budget
+from aoe_scientist.review_scheduler import budget_cut, promote, schedule_reviews
+
+STAGES = [{'review_llm': 'mock', 'promote_fraction': 0.5}, {'review_llm': 'mock', 'reflection': True}]
+
+
+def make_ideas(n):
+    return pd.DataFrame({'name': [f"idea_{i}" for i in range(n)], 'title': [f"Idea {i}" for i in range(n)],
+                         'details': ['A method evaluated on a benchmark'] * n, 'researcher': None,
+                         'rag': False, 'generate_llm': 'mock'})
+
+
+def test_schedule_keeps_finished_reviews_when_budget_runs_out():
+    cfg = {'topic': 'NAS', 'review_schedule': STAGES, 'budget': {'max_tokens': 2500}}
+    start_budget(cfg)
+    try:
+        reviews_df = schedule_reviews(cfg, make_ideas(8))
+    finally:
+        start_budget({})
+    assert 0 < len(reviews_df) < 8 + 4
+    # Every review is attached to the idea it was made for
+    assert (reviews_df['name'].str.split('_').str[1] == reviews_df['title'].str.split(' ').str[1]).all()
+    assert 'idea_id' not in reviews_df
+
+
+def scored(scores):
+    """Ideas with one stage of reviews giving them these overall scores."""
+    ideas = make_ideas(len(scores)).assign(idea_id=range(len(scores)))
+    return ideas, pd.DataFrame({'idea_id': range(len(scores)), 'overall_score': scores})
+
+
+def test_promote_rounds_up_and_caps():
+    ideas, reviews = scored([1, 5, 3, 4, 2])
+    # ceil(0.5 * 5) = 3 best ideas
+    assert sorted(promote(ideas, reviews, 0.5)['idea_id']) == [1, 2, 3]
+    assert list(promote(ideas, reviews, 0.5, max_ideas=1)['idea_id']) == [1]
+    # At least one idea goes on, however small the fraction
+    assert list(promote(ideas, reviews, 0.01)['idea_id']) == [1]
+
+
+def test_promote_averages_stages_and_breaks_ties_by_order():
+    ideas, reviews = scored([4, 4, 4, 2])
+    assert sorted(promote(ideas, reviews, 0.5)['idea_id']) == [0, 1]
+    # A second reviewer lifts idea 3 above the tied ones on the mean over stages
+    reviews = pd.concat([reviews, pd.DataFrame({'idea_id': [0, 1, 2, 3], 'overall_score': [4, 4, 4, 10]})])
+    assert list(promote(ideas, reviews, 0.25)['idea_id']) == [3]
+
+
+def test_schedule_reviews_with_mock():
+    cfg = {'topic': 'NAS', 'review_schedule': [
+        {'review_llm': 'mock', 'promote_fraction': 0.5},
+        {'review_llm': 'mock', 'reflection': True, 'promote_fraction': 0.5, 'max_ideas': 2}]}
+    reviews_df = schedule_reviews(cfg, make_ideas(6))
+    assert list(reviews_df.groupby('stage').size()) == [6, 2]
+    assert reviews_df['overall_score'].between(1, 10).all()
+    # The reflection stage keeps the initial scores next to the final ones
+    assert reviews_df.loc[reviews_df['stage'] == 1, 'initial_novelty'].notna().all()
+
+
+def test_first_stage_budget_does_not_cut_by_file_order():
+    ideas = make_ideas(8)
+    # Screened ideas keep the best predicted ones, in file order
+    screened = ideas.assign(surrogate_overall_score=[1, 9, 2, 8, 3, 7, 4, 6])
+    assert list(budget_cut(screened, 3)['name']) == ['idea_1', 'idea_3', 'idea_5']
+    # Otherwise a seeded random sample
+    sampled = budget_cut(ideas, 3)
+    assert len(sampled) == 3 and sampled.index.is_monotonic_increasing
+    assert list(sampled['name']) == list(budget_cut(ideas, 3)['name']) != ['idea_0', 'idea_1', 'idea_2']
@@ -0,0 +1,64 @@
+import time
+from aoe_scientist.router import RoutedChat, provider_health, track_served, served_columns
+
+
+class FakeChat:
+    """Provider stand-in with a fixed delay that answers with its name or raises"""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def invoke(self, input, config=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(f"{self.name} is down")
+        return self.name
+
+
+def test_hedged_request_returns_first_answer():
+    """A slow primary is hedged to the fallback, whose answer wins and is recorded"""
+    slow, fast = FakeChat("slow_primary", delay=1.0), FakeChat("fast_fallback")
+    chat = RoutedChat([("slow_primary", slow), ("fast_fallback", fast)], hedge_after_s=0.05)
+    with track_served() as served:
+        start = time.monotonic()
+        assert chat.invoke("prompt") == "fast_fallback"
+        assert time.monotonic() - start < 0.5
+    assert served == ["fast_fallback"]
+    assert served_columns(served, 'review_llm', 'slow_primary') == {
+        'review_llm': 'fast_fallback', 'routed_from': 'slow_primary'}
+
+
+def test_circuit_breaker_skips_failing_provider():
+    """Errors fail over immediately, and after the threshold the provider is no longer tried"""
+    down, backup = FakeChat("down_primary", fail=True), FakeChat("backup")
+    chat = RoutedChat([("down_primary", down), ("backup", backup)],
+                      hedge_after_s=10.0, failure_threshold=2, cooldown_s=60.0)
+    for _ in range(4):
+        assert chat.invoke("prompt") == "backup"
+    assert down.calls == 2
+    assert not provider_health("down_primary").available()
+
+
+def test_half_open_circuit_lets_one_trial_through():
+    """After the cooldown a single request probes the provider; its outcome reopens or closes the circuit"""
+    from concurrent.futures import ThreadPoolExecutor
+    flaky, backup = FakeChat("flaky_primary", delay=0.2, fail=True), FakeChat("steady_backup")
+    chat = RoutedChat([("flaky_primary", flaky), ("steady_backup", backup)],
+                      hedge_after_s=10.0, failure_threshold=1, cooldown_s=0.1)
+    assert chat.invoke("prompt") == "steady_backup" and flaky.calls == 1
+
+    time.sleep(0.15)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert set(pool.map(chat.invoke, ["prompt"] * 4)) == {"steady_backup"}
+    # Only the trial reached the still broken provider, and its failure reopened the circuit
+    assert flaky.calls == 2 and provider_health("flaky_primary").state() == 'open'
+
+    flaky.fail, flaky.delay = False, 0.0
+    time.sleep(0.15)
+    assert chat.invoke("prompt") == "flaky_primary"
+    assert provider_health("flaky_primary").state() == 'closed'
+    assert chat.invoke("prompt") == "flaky_primary" and flaky.calls == 4
@@ -0,0 +1,60 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+import select_papers  # noqa: E402
+
+YEAR = pd.Timestamp.now().year
+
+
+def make_dump(extra=()):
+    rows = [
+        {'researcher': r, 'title': f"{r} paper {i}", 'year': YEAR - i % 4, 'venue': 'NeurIPS', 'citations': 10 * i,
+         'authors': f"{r}, Someone Else", 'first_author': r, 'last_author': 'Someone Else', 'author_count': 2,
+         'abstract': f"Abstract {i} of {r}", 'url': ''}
+        for r in ['Ada Lovelace', 'Alan Turing', 'Grace Hopper'] for i in range(8)
+    ]
+    return pd.DataFrame(rows + list(extra))
+
+
+def test_only_changed_researchers_are_reselected(tmp_path, monkeypatch, inline_pool):
+    monkeypatch.setattr(select_papers, 'ProcessPoolExecutor', inline_pool)
+    monkeypatch.setattr(select_papers, 'encode',
+                        lambda texts: np.eye(len(texts), 8, dtype=np.float32) if texts else np.zeros((0, 8)))
+    dump_path, output_path = tmp_path / 'paper_dump.csv', tmp_path / 'scholar_papers.csv'
+
+    make_dump().to_csv(dump_path, index=False)
+    assert len(select_papers.select_all(str(dump_path), str(output_path))) == 3
+    first = pd.read_csv(output_path)
+    assert first.groupby('researcher').size().to_dict() == {'Ada Lovelace': 5, 'Alan Turing': 5, 'Grace Hopper': 5}
+    assert select_papers.select_all(str(dump_path), str(output_path)) == []
+
+    new_paper = {'researcher': 'Alan Turing', 'title': 'Computing Machinery', 'year': YEAR, 'venue': 'Mind',
+                 'citations': 10000, 'authors': 'Alan Turing', 'first_author': 'Alan Turing',
+                 'last_author': 'Alan Turing', 'author_count': 1, 'abstract': 'Can machines think?', 'url': ''}
+    make_dump([new_paper]).to_csv(dump_path, index=False)
+    assert select_papers.select_all(str(dump_path), str(output_path)) == ['Alan Turing']
+    second = pd.read_csv(output_path)
+    assert 'Computing Machinery' in second['title'].tolist()
+    unchanged = second['researcher'] != 'Alan Turing'
+    pd.testing.assert_frame_equal(second[unchanged].reset_index(drop=True),
+                                  first[first['researcher'] != 'Alan Turing'].reset_index(drop=True))
+
+
+def test_onnx_model_is_exported_before_the_workers_start(tmp_path, monkeypatch, inline_pool):
+    events = []
+
+    class RecordingPool(inline_pool):
+        def __init__(self, *args, **kwargs):
+            events.append('pool')
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(select_papers, 'ProcessPoolExecutor', RecordingPool)
+    monkeypatch.setattr(select_papers, 'encode', lambda texts: np.eye(len(texts), 8, dtype=np.float32))
+    monkeypatch.setattr(select_papers.embeddings, 'get_encoder', lambda **settings: events.append('export'))
+    monkeypatch.setitem(select_papers.embeddings._settings, 'backend', 'onnx')
+    make_dump().to_csv(tmp_path / 'paper_dump.csv', index=False)
+    select_papers.select_all(str(tmp_path / 'paper_dump.csv'), str(tmp_path / 'scholar_papers.csv'))
+    assert events == ['export', 'pool']
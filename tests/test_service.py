@@ -0,0 +1,50 @@
+import threading
+import time
+import pytest
+from aoe_scientist.utils import setup_config
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+from aoe_scientist.service import create_app
+
+CFG = setup_config(overrides=["mode=generate", "generate_llm=mock", "review_llm=mock", "rag=false",
+                              "service.max_concurrency=2"])
+
+
+def test_generate_review_and_cache():
+    with TestClient(create_app(CFG)) as client:
+        idea = client.post("/generate", json={"num_reflections": 1}).json()
+        assert idea['generate_llm'] == 'mock' and idea['title']
+
+        request = {"title": idea['title'], "details": idea['details'], "reflection": False}
+        first = client.post("/review", json=request).json()
+        assert 1 <= first['overall_score'] <= 10
+        assert client.post("/review", json=request).json() == first
+        assert client.get("/health").json()['cache_hits'] == 1
+        assert client.post("/review", json={"title": "x"}).status_code == 422
+
+
+def test_requests_wait_for_a_concurrency_slot():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_review(title, details):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.2)
+        with lock:
+            active[0] -= 1
+        return {'title': title, 'overall_score': 5.0}
+
+    with TestClient(create_app(CFG)) as client:
+        client.app.state.service.review_chains = {True: slow_review, False: slow_review}
+        responses = []
+        threads = [threading.Thread(target=lambda i=i: responses.append(
+            client.post("/review", json={"title": f"Idea {i}", "details": "d"}))) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert len(responses) == 6 and all(r.status_code == 200 for r in responses)
+    assert peak[0] == 2
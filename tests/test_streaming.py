@@ -0,0 +1,40 @@
+import pandas as pd
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from aoe_scientist.metrics import get_run_metrics
+from aoe_scientist.progress import ProgressCallback, tracker
+from aoe_scientist.streaming import json_fields_complete, stream_text
+
+FIELDS = ["Thought", "Name", "Title", "Details"]
+
+
+def test_json_fields_complete():
+    """Fields only count as complete once their value can no longer grow"""
+    assert not json_fields_complete('```json\n{"Thought": "a", "Name": "n", "Title": "t", "Details": "d', FIELDS)
+    assert json_fields_complete('```json\n{"Thought": "a", "Name": "n", "Title": "t", "Details": "d"}', FIELDS)
+    assert json_fields_complete('{"Thought": "a", "Name": "n", "Title": "t", "Details": "d", "Extra": "x', FIELDS)
+
+
+def test_stream_text_stops_after_required_fields():
+    """The stream is abandoned after the JSON answer and TTFT is recorded"""
+    answer = '```json\n{"Thought": "a b", "Name": "n", "Title": "t", "Details": "d e"}\n```'
+    chat = GenericFakeChatModel(messages=iter([AIMessage(content=answer + "\nSome trailing commentary")]))
+    response = stream_text(chat, "prompt", "generate", required_fields=FIELDS, echo=False)
+    assert "commentary" not in response.content
+    assert response.content.rstrip().endswith("}")
+
+    record = get_run_metrics().iloc[-1]
+    assert record['stage'] == "generate" and record['aborted']
+    assert 0 <= record['ttft'] <= record['duration']
+    # No usage arrives before the abort: the chunk count is kept apart from the token count
+    assert pd.isna(record['output_tokens']) and pd.isna(record['tokens_per_sec']) and record['output_chunks'] > 0
+
+
+def test_aborted_stream_leaves_in_flight_count():
+    """Closing the stream early ends the call for the progress tracker without counting an error"""
+    answer = '{"Thought": "a", "Name": "n", "Title": "t", "Details": "d"} and more text'
+    chat = GenericFakeChatModel(messages=iter([AIMessage(content=answer)]),
+                                callbacks=[ProgressCallback("aborting")])
+    stream_text(chat, "prompt", "generate", required_fields=FIELDS, echo=False)
+    assert tracker.in_flight["aborting"] == 0
+    assert (tracker.llm_calls["aborting"], tracker.llm_errors["aborting"]) == (1, 0)
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import aoe_scientist.surrogate as surrogate_module
+from aoe_scientist.idea_reviewer import SCORE_FIELDS
+from aoe_scientist.surrogate import SurrogateReviewer, screen_ideas
+
+
+def fake_encode(texts, model_name=None):
+    """Deterministic stand-in for the sentence transformer: the first feature encodes quality"""
+    return np.array([[float(t.split()[1]), len(t) % 7] for t in texts], dtype=np.float32)
+
+
+def test_surrogate_screening(monkeypatch):
+    """The surrogate learns a linear signal and screening keeps the top fraction"""
+    monkeypatch.setattr(surrogate_module, "encode", fake_encode)
+    titles = [f"idea {q}" for q in range(1, 11)]
+    details = ["details"] * 10
+    scores = pd.DataFrame({k: np.arange(1, 11) for k in SCORE_FIELDS})
+
+    surrogate = SurrogateReviewer(alphas=(1e-3,)).fit(titles, details, scores)
+    report = surrogate.cross_validate(titles, details, scores)
+    assert (report['pearson'] > 0.9).all()
+
+    ideas = pd.DataFrame({'name': titles, 'title': titles, 'details': details})
+    screened = screen_ideas(ideas, surrogate, 0.3)
+    assert screened['title'].tolist() == ["idea 10", "idea 9", "idea 8"]
+    assert 'surrogate_overall_score' in screened.columns
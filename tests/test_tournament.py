@@ -0,0 +1,107 @@
+import math
+import os
+import numpy as np
+import pandas as pd
+from aoe_scientist import tournament
+from aoe_scientist.tournament import update_ratings, swiss_pairs, rank_ideas, save_ratings, MU, SIGMA
+from aoe_scientist.llm import create_client
+from aoe_scientist.analysis import METRICS, icc, krippendorff_alpha
+
+CFG = {'topic': 'NAS', 'review_llm': 'mock', 'concurrency': 4}
+
+
+def make_ideas(n):
+    return pd.DataFrame({'name': [f"idea_{i}" for i in range(n)], 'title': [f"Idea {i}" for i in range(n)],
+                         'details': ['details'] * n, 'researcher': None, 'rag': False, 'generate_llm': 'mock'})
+
+
+def test_update_moves_winner_up_and_shrinks_uncertainty():
+    mu, sigma = np.full(2, MU), np.full(2, SIGMA)
+    update_ratings(mu, sigma, 0, 1)
+    assert mu[0] > MU > mu[1] and (sigma < SIGMA).all()
+
+
+def test_swiss_pairs_avoid_rematches():
+    mu, sigma = np.full(8, MU), np.full(8, SIGMA)
+    played = set()
+    for _ in range(3):
+        pairs = swiss_pairs(mu, sigma, played)
+        assert len(pairs) == 4 and sorted(i for p in pairs for i in p) == list(range(8))
+        assert not played & {tuple(sorted(p)) for p in pairs}
+        played |= {tuple(sorted(p)) for p in pairs}
+    # An odd idea out sits the round out
+    assert len(swiss_pairs(np.full(5, MU), np.full(5, SIGMA), set())) == 2
+
+
+def test_ranking_recovers_quality_in_n_log_n_comparisons(monkeypatch):
+    # The judge prefers the idea with the higher number, but sees it only 90% of the time
+    rng = np.random.default_rng(1)
+    calls = []
+
+    def create_chain(chat, topic):
+        def compare(idea_1, idea_2):
+            calls.append(1)
+            better = int(int(idea_2['name'].split('_')[1]) > int(idea_1['name'].split('_')[1]))
+            return better if rng.random() < 0.9 else 1 - better
+        return compare
+
+    monkeypatch.setattr(tournament, 'create_comparison_chain', create_chain)
+    n = 64
+    ratings_df = rank_ideas(None, CFG, make_ideas(n))
+    assert len(calls) == (math.ceil(math.log2(n)) + 1) * n // 2
+    quality = ratings_df['name'].str.split('_').str[1].astype(int)
+    assert np.corrcoef(quality, -ratings_df['rank'])[0, 1] > 0.8
+
+
+def test_rank_with_mock_and_save_per_judge(tmp_path):
+    ratings_df = rank_ideas(create_client('mock', temperature=0.25), CFG, make_ideas(5))
+    assert sorted(ratings_df['rank']) == [1, 2, 3, 4, 5] and ratings_df['comparisons'].sum() > 0
+
+    path = str(tmp_path / 'ratings.csv')
+    save_ratings(ratings_df, path)
+    save_ratings(ratings_df.assign(rating_llm='openai'), path)
+    save_ratings(ratings_df.assign(rating=0.0), path)
+    saved = pd.read_csv(path)
+    # Each judge keeps one row per idea; re-ranking with a judge replaces only its ratings
+    assert len(saved) == 10 and sorted(saved['rating_llm'].unique()) == ['mock', 'openai']
+    assert (saved.loc[saved['rating_llm'] == 'mock', 'rating'] == 0).all()
+    assert (saved.loc[saved['rating_llm'] == 'openai', 'rating'] != 0).any()
+
+
+def test_save_ratings_leaves_review_statistics_unchanged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ideas = make_ideas(4)
+    rng = np.random.default_rng(0)
+    reviews = pd.concat([ideas.drop(columns='details').assign(review_llm=llm) for llm in ['openai', 'deepseek']],
+                        ignore_index=True)
+    for metric in METRICS:
+        reviews[metric] = rng.integers(1, 11, len(reviews)).astype(float)
+    os.makedirs('data')
+    reviews.to_csv('data/reviews.csv', index=False)
+    before = pd.read_csv('data/reviews.csv')
+
+    save_ratings(rank_ideas(create_client('mock', temperature=0.25), CFG, make_ideas(6)))
+    after = pd.read_csv('data/reviews.csv')
+    pd.testing.assert_frame_equal(icc(after), icc(before))
+    pd.testing.assert_frame_equal(krippendorff_alpha(after), krippendorff_alpha(before))
+
+
+def test_failed_comparisons_do_not_use_up_their_pairing(monkeypatch):
+    seen_played = []
+
+    def recording_pairs(mu, sigma, played, rng=None):
+        seen_played.append(set(played))
+        return swiss_pairs(mu, sigma, played, rng)
+
+    def create_chain(chat, topic):
+        def compare(idea_1, idea_2):
+            if len(seen_played) == 1:
+                raise TimeoutError("transient")
+            return 0
+        return compare
+
+    monkeypatch.setattr(tournament, 'swiss_pairs', recording_pairs)
+    monkeypatch.setattr(tournament, 'create_comparison_chain', create_chain)
+    ratings_df = rank_ideas(None, {**CFG, 'tournament': {'rounds': 2}}, make_ideas(4))
+    # Every comparison of round 1 failed, so round 2 may still draw any pair
+    assert seen_played[1] == set() and ratings_df['comparisons'].sum() == 4
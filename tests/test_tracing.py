@@ -0,0 +1,23 @@
+import json
+from aoe_scientist.idea_generator import generate_research_idea
+from aoe_scientist.llm import create_client
+from aoe_scientist.tracing import start_tracing, save_trace
+from aoe_scientist.utils import setup_config
+
+
+def test_generation_trace_nests_llm_calls(tmp_path):
+    cfg = setup_config(overrides=["mode=generate", "generate_llm=mock", "rag=false"])
+    start_tracing()
+    generate_research_idea(create_client("mock", temperature=0.0), cfg)
+    trace_path = tmp_path / "trace.json"
+    save_trace(str(trace_path))
+
+    events = json.loads(trace_path.read_text())['traceEvents']
+    spans = {}
+    for e in events:
+        if e['ph'] == 'X':
+            spans.setdefault(e['name'], e)
+    assert {'build_prompt', 'initial_generation', 'parse', 'llm:mock'} <= spans.keys()
+    outer, inner = spans['initial_generation'], spans['llm:mock']
+    assert outer['tid'] == inner['tid']
+    assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
@@ -0,0 +1,66 @@
+import multiprocessing
+import pandas as pd
+from aoe_scientist import work_queue
+from aoe_scientist.work_queue import WorkQueue, enqueue_generation, enqueue_reviews, run_worker, merge_partitions
+
+
+def run_workers(queue_path, output_dir, num_workers=3):
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=run_worker, args=(queue_path, f"w{i}", output_dir)) for i in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=120)
+    assert all(worker.exitcode == 0 for worker in workers)
+
+
+def test_enqueue_is_idempotent(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    first = enqueue_generation(queue, [["generate_llm=mock"]], num_ideas=2)
+    second = enqueue_generation(queue, [["generate_llm=mock"]], num_ideas=2)
+    assert first == second and len(set(first)) == 2
+    assert queue.counts() == {'pending': 2}
+    task = queue.claim("w0")
+    queue.fail(task['task_id'], "rate limited")
+    assert queue.counts() == {'pending': 2}
+
+
+def test_workers_generate_and_review(tmp_path):
+    """Several worker processes drain the queue; merged results hold each task exactly once"""
+    queue_path, output_dir = str(tmp_path / "queue.sqlite"), str(tmp_path / "partitions")
+    ideas_path, reviews_path = str(tmp_path / "ideas.csv"), str(tmp_path / "reviews.csv")
+    queue = WorkQueue(queue_path)
+    task_ids = enqueue_generation(queue, [["generate_llm=mock", "rag=false"]], num_ideas=6)
+
+    run_workers(queue_path, output_dir)
+    assert queue.counts() == {'done': 6}
+    ideas = merge_partitions(output_dir, 'generate', ideas_path)
+    assert sorted(ideas['task_id']) == sorted(task_ids)
+    assert merge_partitions(output_dir, 'generate', ideas_path).empty
+
+    enqueue_reviews(queue, pd.read_csv(ideas_path), ["mock"])
+    run_workers(queue_path, output_dir)
+    reviews = merge_partitions(output_dir, 'review', reviews_path)
+    assert len(reviews) == 6
+    assert (reviews['review_llm'] == 'mock').all() and (reviews['overall_score'] > 0).all()
+
+
+def test_claim_fails_expired_tasks_out_of_attempts(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), lease_s=0.0, max_attempts=1)
+    enqueue_generation(queue, [["generate_llm=mock"]])
+    assert queue.claim("w0") is not None
+    # The worker died holding the last attempt: the next claim marks the task failed
+    assert queue.claim("w1") is None
+    assert queue.counts() == {'failed': 1}
+
+
+def test_placeholder_only_review_counts_as_failure(tmp_path, monkeypatch):
+    queue_path, output_dir = str(tmp_path / "queue.sqlite"), str(tmp_path / "partitions")
+    queue = WorkQueue(queue_path)
+    enqueue_reviews(queue, pd.DataFrame([{'name': 'a', 'title': 'A', 'details': 'd'}]), ["mock"])
+    placeholder = pd.DataFrame([{'name': 'a', 'title': 'A', 'review_llm': 'mock',
+                                 'justification': "Failed to review: timeout", 'overall_score': 0}])
+    monkeypatch.setattr(work_queue, 'run_task', lambda task, base_overrides=None: placeholder)
+    assert run_worker(queue_path, "w0", output_dir) == 0
+    assert queue.counts() == {'failed': 1}
+    assert merge_partitions(output_dir, 'review', str(tmp_path / "reviews.csv")).empty